@@ -0,0 +1,89 @@
+import argparse
+import sys
+from pathlib import Path
+
+from .suite import COMMAND_CASES, compare, load_results, run_suite, save
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--min-exponent",
+        type=int,
+        default=3,
+        help="smallest buffer size as a power of ten",
+    )
+    parser.add_argument(
+        "--max-exponent",
+        type=int,
+        default=5,
+        help="largest buffer size as a power of ten (up to 7)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--case",
+        action="append",
+        choices=[*COMMAND_CASES, "yaex", "construct"],
+        help="run only this case, may be given many times",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("benchmarks/results.json"),
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=Path("benchmarks/baseline.json"),
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed growth over the baseline, 0.25 means 25%%",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as the new baseline",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    sizes = [10**e for e in range(args.min_exponent, args.max_exponent + 1)]
+
+    measurements = []
+    for measurement in run_suite(sizes, args.repeat, args.case):
+        sys.stdout.write(
+            f"{measurement.key:<28} {measurement.seconds * 1000:>12.3f} ms"
+            f" {measurement.peak_bytes / 1024:>12.1f} KiB\n",
+        )
+        measurements.append(measurement)
+
+    save(args.output, measurements)
+    if args.save_baseline:
+        save(args.baseline, measurements)
+        return 0
+
+    if not args.baseline.exists():
+        sys.stdout.write(f"No baseline at {args.baseline}, skipping check.\n")
+        return 0
+
+    regressions = compare(
+        load_results(args.baseline),
+        measurements,
+        args.threshold,
+    )
+    for regression in regressions:
+        sys.stdout.write(
+            f"REGRESSION {regression.key} {regression.metric}:"
+            f" {regression.baseline:g} -> {regression.current:g}"
+            f" ({regression.ratio:.2f}x)\n",
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
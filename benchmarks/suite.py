@@ -0,0 +1,228 @@
+import gc
+import json
+import platform
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from yaex import (
+    Command,
+    Context,
+    append,
+    compile,
+    delete,
+    go_to,
+    insert,
+    search,
+    substitute,
+)
+
+Setup = Callable[[int], tuple[Context, Command]]
+Run = Callable[[], object]
+
+
+@dataclass(frozen=True)
+class Measurement:
+    case: str
+    size: int
+    seconds: float
+    peak_bytes: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}/{self.size}"
+
+
+@dataclass(frozen=True)
+class Regression:
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def make_lines(size: int) -> list[str]:
+    return [f"line {i} of the benchmark buffer\n" for i in range(size)]
+
+
+def _at(position: str) -> Callable[[int], int]:
+    positions = {
+        "head": lambda size: 1,
+        "middle": lambda size: size // 2,
+        "tail": lambda size: size,
+    }
+    return positions[position]
+
+
+def _edit_at(
+    make_command: Callable[[str], Command],
+    position: str,
+) -> Setup:
+    line_at = _at(position)
+
+    def setup(size: int) -> tuple[Context, Command]:
+        context = Context(line_at(size), make_lines(size))
+        return context, make_command("new line\n")
+
+    return setup
+
+
+def _search(reverse: bool) -> Setup:
+    def setup(size: int) -> tuple[Context, Command]:
+        if reverse:
+            context = Context(size, make_lines(size))
+            return context, search(r"^line 0 ").in_reverse()
+        context = Context(1, make_lines(size))
+        return context, search(rf"^line {size - 1} ")
+
+    return setup
+
+
+def _delete_range(size: int) -> tuple[Context, Command]:
+    begin, end = size // 4 + 1, size * 3 // 4
+    return Context(1, make_lines(size)), delete().from_range(begin, end)
+
+
+def _substitute_range(size: int) -> tuple[Context, Command]:
+    command = substitute(r"buffer", "text").from_range(1, size)
+    return Context(1, make_lines(size)), command
+
+
+COMMAND_CASES: dict[str, Setup] = {
+    **{
+        f"{name}_{position}": _edit_at(make_command, position)
+        for name, make_command in (("append", append), ("insert", insert))
+        for position in ("head", "middle", "tail")
+    },
+    "search_forward": _search(reverse=False),
+    "search_reverse": _search(reverse=True),
+    "delete_range": _delete_range,
+    "substitute_range": _substitute_range,
+}
+
+
+def _end_to_end_commands(size: int) -> list[Command]:
+    return [
+        substitute(r"buffer", "text").from_range(1, size),
+        search(r"^line 0 ").in_reverse(),
+        delete().from_range(go_to(2), go_to(size // 2)),
+        append("last line\n"),
+    ]
+
+
+def _end_to_end(size: int) -> Run:
+    text = "".join(make_lines(size))
+    program = compile(*_end_to_end_commands(size))
+    return lambda: program.run(text)
+
+
+def _construct(size: int) -> Run:
+    """Build the commands of the end to end case once per hundred lines."""
+    count = max(size // 100, 1)
+
+    def run() -> None:
+        for _ in range(count):
+            compile(*_end_to_end_commands(size))
+
+    return run
+
+
+def _command_run(setup: Setup, size: int) -> Run:
+    context, command = setup(size)
+    return lambda: command(context)
+
+
+def iter_runs(
+    sizes: Iterable[int],
+) -> Iterator[tuple[str, int, Callable[[], Run]]]:
+    for size in sizes:
+        for case, setup in COMMAND_CASES.items():
+            yield case, size, partial(_command_run, setup, size)
+        yield "yaex", size, partial(_end_to_end, size)
+        yield "construct", size, partial(_construct, size)
+
+
+def measure(
+    case: str,
+    size: int,
+    prepare: Callable[[], Run],
+    repeat: int = 3,
+) -> Measurement:
+    """Time the best of ``repeat`` runs and trace the memory of one more."""
+    seconds = min(_time(prepare()) for _ in range(repeat))
+
+    run = prepare()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(case, size, seconds, peak_bytes)
+
+
+def _time(run: Run) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def run_suite(
+    sizes: Iterable[int],
+    repeat: int = 3,
+    cases: Iterable[str] | None = None,
+) -> list[Measurement]:
+    selected = None if cases is None else set(cases)
+    return [
+        measure(case, size, prepare, repeat)
+        for case, size, prepare in iter_runs(sizes)
+        if selected is None or case in selected
+    ]
+
+
+def to_json(measurements: Iterable[Measurement]) -> dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {m.key: asdict(m) for m in measurements},
+    }
+
+
+def save(path: Path, measurements: Iterable[Measurement]) -> None:
+    path.write_text(json.dumps(to_json(measurements), indent=2) + "\n")
+
+
+def load_results(path: Path) -> dict[str, dict[str, Any]]:
+    results: dict[str, dict[str, Any]] = json.loads(path.read_text())["results"]
+    return results
+
+
+def compare(
+    baseline: dict[str, dict[str, Any]],
+    measurements: Iterable[Measurement],
+    threshold: float,
+) -> list[Regression]:
+    """Return every metric that grew past ``threshold`` over the baseline."""
+    regressions = []
+    for measurement in measurements:
+        previous = baseline.get(measurement.key)
+        if previous is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            before = previous[metric]
+            after = getattr(measurement, metric)
+            if before > 0 and after > before * (1 + threshold):
+                regressions.append(
+                    Regression(measurement.key, metric, before, after),
+                )
+    return regressions
@@ -145,3 +145,26 @@ def _run_pytest(c: Context, pytest_options: list[str]) -> None:
 def coverage(c):
     # type: (Context) -> None
     c.run("coverage report")
+
+
+@task
+def bench(
+    c,
+    min_exponent=3,
+    max_exponent=5,
+    repeat=3,
+    threshold=0.25,
+    save_baseline=False,
+):
+    # type: (Context, int, int, int, float, bool) -> None
+    options = [
+        f"--min-exponent={min_exponent}",
+        f"--max-exponent={max_exponent}",
+        f"--repeat={repeat}",
+        f"--threshold={threshold}",
+    ]
+    if save_baseline:
+        options.append("--save-baseline")
+
+    cmd = " ".join(["python", "-m", "benchmarks", *options])
+    c.run(cmd)
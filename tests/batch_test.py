@@ -0,0 +1,75 @@
+from pathlib import Path
+
+import pytest
+
+from yaex import InvalidOperation, Program, compile, delete, run_batch, search
+from yaex.batch import apply_program
+
+
+@pytest.fixture
+def program() -> Program:
+    return compile(search("second"), delete())
+
+
+@pytest.fixture
+def paths(tmp_path: Path) -> list[Path]:
+    texts = ["first line\nsecond line\n", "a line\n", "second line\n"]
+    paths = [tmp_path / f"file{i}.txt" for i in range(len(texts))]
+    for path, text in zip(paths, texts):
+        path.write_text(text)
+    return paths
+
+
+def test_should_apply_a_program_to_a_file(
+    program: Program,
+    paths: list[Path],
+) -> None:
+    result = apply_program(program, paths[0])
+
+    assert result.ok
+    assert result.changed
+    assert paths[0].read_text() == "first line\n"
+
+
+def test_should_report_a_failing_file(
+    program: Program,
+    paths: list[Path],
+) -> None:
+    result = apply_program(program, paths[1])
+
+    assert not result.ok
+    assert isinstance(result.error, InvalidOperation)
+    assert paths[1].read_text() == "a line\n"
+
+
+def test_should_apply_a_program_to_many_files(
+    program: Program,
+    paths: list[Path],
+) -> None:
+    results = run_batch(program, paths, max_workers=2, chunksize=1)
+
+    assert [result.path for result in results] == paths
+    assert [result.ok for result in results] == [True, False, True]
+    assert [path.read_text() for path in paths] == [
+        "first line\n",
+        "a line\n",
+        "",
+    ]
+    assert sorted(path.name for path in paths[0].parent.iterdir()) == [
+        "file0.txt",
+        "file1.txt",
+        "file2.txt",
+    ]
+
+
+def test_should_keep_the_newlines_of_a_file(
+    program: Program,
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "crlf.txt"
+    path.write_bytes(b"first line\r\nsecond line\r\nthird line\r\n")
+
+    result = apply_program(program, path)
+
+    assert result.changed
+    assert path.read_bytes() == b"first line\r\nthird line\r\n"
@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+from benchmarks.__main__ import main
+from benchmarks.suite import Measurement, compare, run_suite
+
+
+def test_should_measure_every_case() -> None:
+    measurements = run_suite([10], repeat=1)
+
+    cases = {measurement.case for measurement in measurements}
+    assert "yaex" in cases
+    assert "construct" in cases
+    assert "substitute_range" in cases
+    assert all(measurement.seconds >= 0 for measurement in measurements)
+
+
+def test_should_report_regressions_past_the_threshold() -> None:
+    baseline = {
+        "delete_range/10": {"seconds": 1.0, "peak_bytes": 100},
+        "yaex/10": {"seconds": 1.0, "peak_bytes": 100},
+    }
+    measurements = [
+        Measurement("delete_range", 10, 1.1, 100),
+        Measurement("yaex", 10, 1.0, 200),
+        Measurement("search_forward", 10, 5.0, 500),
+    ]
+
+    regressions = compare(baseline, measurements, threshold=0.25)
+
+    assert [(r.key, r.metric) for r in regressions] == [
+        ("yaex/10", "peak_bytes"),
+    ]
+
+
+def test_should_fail_against_a_faster_baseline(tmp_path: Path) -> None:
+    output = tmp_path / "results.json"
+    baseline = tmp_path / "baseline.json"
+    options = [
+        "--min-exponent=1",
+        "--max-exponent=1",
+        "--repeat=1",
+        "--case=delete_range",
+        f"--output={output}",
+        f"--baseline={baseline}",
+    ]
+
+    assert main([*options, "--save-baseline"]) == 0
+    data = json.loads(baseline.read_text())
+    data["results"]["delete_range/10"]["seconds"] = 1e-12
+    baseline.write_text(json.dumps(data))
+
+    assert main(options) == 1
+    assert output.exists()
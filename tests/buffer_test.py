@@ -0,0 +1,177 @@
+import random
+
+import pytest
+
+from yaex import (
+    Context,
+    InternedLineBuffer,
+    LineBuffer,
+    append,
+    delete,
+    go_to,
+    insert,
+    substitute,
+    yaex,
+)
+
+
+@pytest.fixture
+def buffer(lines: list[str]) -> LineBuffer:
+    return LineBuffer(lines)
+
+
+def test_should_behave_like_a_list(
+    buffer: LineBuffer, lines: list[str]
+) -> None:
+    assert len(buffer) == len(lines)
+    assert buffer == lines
+    assert buffer[2] == lines[2]
+    assert buffer[-1] == lines[-1]
+    assert buffer[1:4] == lines[1:4]
+    assert list(reversed(buffer)) == lines[::-1]
+
+
+def test_should_splice_lines(buffer: LineBuffer, lines: list[str]) -> None:
+    lines[1:3] = ["a\n", "b\n", "c\n"]
+
+    buffer[1:3] = ["a\n", "b\n", "c\n"]
+
+    assert buffer == lines
+
+
+def test_should_delete_lines(buffer: LineBuffer, lines: list[str]) -> None:
+    del lines[2:5]
+
+    del buffer[2:5]
+
+    assert buffer == lines
+
+
+def test_should_keep_order_across_many_chunks() -> None:
+    lines = [f"{i}\n" for i in range(5000)]
+    buffer = LineBuffer(lines)
+
+    buffer[2500:2500] = ["middle\n"]
+    del buffer[10:20]
+    lines[2500:2500] = ["middle\n"]
+    del lines[10:20]
+
+    assert buffer == lines
+    assert buffer[4000] == lines[4000]
+
+
+def test_should_merge_chunks_left_almost_empty() -> None:
+    lines = [f"{i}\n" for i in range(5000)]
+    buffer = LineBuffer(lines)
+
+    for index in range(len(lines) // 600 + 1):
+        begin, end = index + 1, index + 600
+        del buffer[begin:end]
+        del lines[begin:end]
+
+    assert buffer == lines
+    assert len(buffer._chunks) == 1
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_should_give_the_lines_of_a_list_through_any_edit(seed: int) -> None:
+    generator = random.Random(seed)
+    lines = [f"{i}\n" for i in range(3000)]
+    buffer = LineBuffer(lines)
+
+    for edit in range(100):
+        begin = generator.randrange(len(lines) + 1)
+        end = min(len(lines), begin + generator.choice([0, 1, 700]))
+        new_lines = [
+            f"{edit}.{i}\n" for i in range(generator.choice([0, 2, 900]))
+        ]
+        buffer[begin:end] = new_lines
+        lines[begin:end] = new_lines
+        index = generator.randrange(len(lines))
+
+        assert buffer[index] == lines[index]
+
+    assert buffer == lines
+
+
+def test_should_raise_error_when_index_is_out_of_range(
+    buffer: LineBuffer,
+) -> None:
+    with pytest.raises(IndexError):
+        buffer[6]
+
+
+def test_should_run_commands_on_a_line_buffer(lines: list[str]) -> None:
+    context = Context(2, LineBuffer(lines))
+    lines.insert(1, "a line\n")
+
+    result = insert("a line")(context)
+
+    assert result == Context(2, lines)
+
+
+def test_should_join_a_line_buffer_into_the_output() -> None:
+    buffer = yaex(
+        append("first line\nsecond line\nthird line\n"),
+        delete(),
+        buffer_type=LineBuffer,
+    )
+
+    assert buffer == "first line\nsecond line\n"
+
+
+def test_should_share_equal_lines_in_an_interned_buffer() -> None:
+    word = "line"
+    lines = [f"{word}\n" for _ in range(4)] + ["other\n"]
+    buffer = InternedLineBuffer(lines)
+
+    buffer[4:4] = [f"{word}\n"]
+
+    assert buffer == lines[:4] + ["line\n", "other\n"]
+    assert len({id(line) for line in lines}) == 5
+    assert len({id(line) for line in buffer}) == 2
+    assert buffer.distinct_lines == 2
+    assert buffer.dedup_ratio == 3.0
+
+
+def test_should_evict_lines_no_longer_in_an_interned_buffer(
+    lines: list[str],
+) -> None:
+    buffer = InternedLineBuffer(iter(lines + lines))
+    assert buffer == lines + lines
+
+    del buffer[: len(lines)]
+    buffer[0] = "a line\n"
+    del buffer[1:]
+
+    assert buffer == ["a line\n"]
+    assert buffer.distinct_lines == 1
+    del buffer[0]
+    assert buffer.dedup_ratio == 1.0
+
+
+def test_should_keep_the_table_of_a_forked_interned_buffer(
+    lines: list[str],
+) -> None:
+    buffer = InternedLineBuffer(lines)
+    forked = buffer.fork()
+
+    del forked[1:]
+    buffer[0] = lines[1]
+
+    assert isinstance(forked, InternedLineBuffer)
+    assert forked == lines[:1]
+    assert forked.distinct_lines == 1
+    assert buffer.distinct_lines == len(set(lines)) - 1
+    assert buffer[0] is buffer[1]
+
+
+def test_should_run_commands_on_an_interned_buffer() -> None:
+    result = yaex(
+        append("a\nb\na\n"),
+        go_to(2),
+        substitute("b", "a"),
+        buffer_type=InternedLineBuffer,
+    )
+
+    assert result == "a\na\na\n"
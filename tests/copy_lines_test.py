@@ -0,0 +1,65 @@
+import pytest
+
+from yaex import Context, InvalidOperation, copy_lines, go_to_last_line, move
+
+
+def test_should_copy_the_current_line(
+    context: Context,
+    lines: list[str],
+) -> None:
+    command = copy_lines(3)
+
+    result = command(context)
+
+    assert result == Context(4, [*lines[:3], lines[0], *lines[3:]])
+
+
+def test_should_copy_lines_before_the_first_one(
+    context: Context,
+    lines: list[str],
+) -> None:
+    command = copy_lines(0).from_range(5, go_to_last_line())
+
+    result = command(context)
+
+    assert result == Context(2, [*lines[4:], *lines])
+
+
+def test_should_copy_lines_after_themselves(
+    context: Context,
+    lines: list[str],
+) -> None:
+    command = copy_lines(move(1)).from_range(1, 2)
+
+    result = command(context)
+
+    assert result == Context(4, [*lines[:2], *lines[:2], *lines[2:]])
+
+
+def test_should_keep_the_line_objects(context: Context) -> None:
+    command = copy_lines(go_to_last_line()).from_range(1, 2)
+
+    result = command(context)
+
+    assert result.lines[-2] is result.lines[0]
+
+
+@pytest.mark.parametrize(
+    "destination, begin, end",
+    [(7, 1, 1), (-1, 1, 1), (0, 3, 2), (0, 5, 7)],
+)
+def test_should_reject_invalid_lines(
+    context: Context,
+    destination: int,
+    begin: int,
+    end: int,
+) -> None:
+    command = copy_lines(destination).from_range(begin, end)
+
+    with pytest.raises(InvalidOperation):
+        command(context)
+
+
+def test_should_not_copy_from_an_empty_buffer(empty_context: Context) -> None:
+    with pytest.raises(InvalidOperation):
+        copy_lines(0)(empty_context)
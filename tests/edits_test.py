@@ -0,0 +1,141 @@
+import difflib
+import random
+
+import pytest
+
+from yaex import (
+    Hunk,
+    append,
+    compile,
+    delete,
+    global_,
+    go_to,
+    insert,
+    substitute,
+)
+from yaex.commands import Context, replace_lines
+from yaex.edits import EditRecorder
+
+TEXT = "".join(f"line {number}\n" for number in range(1, 41))
+
+
+def apply_hunks(lines: list[str], hunks: list[Hunk]) -> list[str]:
+    result = list(lines)
+    for hunk in reversed(hunks):
+        replaced = slice(hunk.begin, hunk.end)
+        assert result[replaced] == hunk.old_lines
+        result[replaced] = hunk.new_lines
+    return result
+
+
+def test_should_record_nothing_when_nothing_changes() -> None:
+    edits = compile(go_to(3)).run_edits(TEXT)
+
+    assert edits.hunks == []
+    assert edits.unified_diff() == ""
+
+
+def test_should_record_a_substitution() -> None:
+    edits = compile(go_to(5), substitute("line", "row")).run_edits(TEXT)
+
+    assert edits.hunks == [Hunk(4, ["line 5\n"], ["row 5\n"])]
+
+
+def test_should_merge_edits_to_the_same_lines() -> None:
+    program = compile(
+        go_to(5),
+        substitute("line", "row"),
+        append("new\n"),
+        go_to(5),
+        delete(),
+        go_to(6),
+        substitute("line", "row"),
+    )
+
+    edits = program.run_edits(TEXT)
+
+    assert edits.hunks == [
+        Hunk(4, ["line 5\n", "line 6\n"], ["new\n", "row 6\n"]),
+    ]
+
+
+def test_should_split_the_compacted_deletions_of_a_global_command() -> None:
+    edits = compile(global_("line [123]?5$", delete())).run_edits(TEXT)
+
+    assert edits.hunks == [
+        Hunk(4, ["line 5\n"]),
+        Hunk(14, ["line 15\n"]),
+        Hunk(24, ["line 25\n"]),
+        Hunk(34, ["line 35\n"]),
+    ]
+
+
+def test_should_keep_the_positions_of_separate_insertions() -> None:
+    program = compile(go_to(10), insert("a\nb"), go_to(30), append("c"))
+
+    edits = program.run_edits(TEXT)
+
+    assert edits.hunks == [Hunk(9, [], ["a\n", "b\n"]), Hunk(28, [], ["c\n"])]
+
+
+def test_should_render_the_same_diff_as_difflib() -> None:
+    program = compile(
+        go_to(2),
+        substitute("line", "row"),
+        go_to(8),
+        delete(),
+        go_to(20),
+        append("new\n"),
+        go_to(40),
+        delete(),
+    )
+
+    edits = program.run_edits(TEXT)
+
+    expected = difflib.unified_diff(
+        TEXT.splitlines(keepends=True),
+        program.run(TEXT).splitlines(keepends=True),
+        "old",
+        "new",
+    )
+    assert edits.unified_diff("old", "new") == "".join(expected)
+
+
+@pytest.mark.parametrize("context_lines", [0, 1, 5])
+def test_should_render_the_requested_context(context_lines: int) -> None:
+    program = compile(go_to(1), insert("first\n"), go_to(12), delete())
+
+    edits = program.run_edits(TEXT)
+
+    expected = difflib.unified_diff(
+        TEXT.splitlines(keepends=True),
+        program.run(TEXT).splitlines(keepends=True),
+        "a",
+        "b",
+        n=context_lines,
+    )
+    assert edits.unified_diff(n=context_lines) == "".join(expected)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_should_rebuild_the_result_from_any_sequence_of_edits(
+    seed: int,
+) -> None:
+    generator = random.Random(seed)
+    original = [f"{number}\n" for number in range(30)]
+    context = Context(0, list(original))
+    recorder = EditRecorder()
+    context.observers.append(recorder)
+
+    for edit in range(10):
+        begin = generator.randrange(len(context.lines) + 1)
+        end = generator.randrange(begin, min(begin + 4, len(context.lines)) + 1)
+        new_lines = [
+            f"{edit}.{line}\n" for line in range(generator.randrange(4))
+        ]
+        replace_lines(context, begin, end, new_lines)
+
+    hunks = recorder.hunks()
+    assert apply_hunks(original, hunks) == context.lines
+    assert all(hunk.old_lines != hunk.new_lines for hunk in hunks)
+    assert [hunk.begin for hunk in hunks] == sorted(h.begin for h in hunks)
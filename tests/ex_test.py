@@ -0,0 +1,209 @@
+import weakref
+
+import pytest
+
+from yaex import (
+    Context,
+    InvalidOperation,
+    LineBuffer,
+    compile,
+    compile_script,
+    parse_script,
+)
+from yaex.ex import _parse_script
+from yaex.program import run_commands
+
+
+@pytest.fixture
+def text(lines: list[str]) -> str:
+    return "".join(lines)
+
+
+@pytest.mark.parametrize(
+    "script, expected_indexes",
+    [
+        ("d", [0, 1, 2, 3, 4]),
+        ("1d", [1, 2, 3, 4, 5]),
+        ("2,4d", [0, 4, 5]),
+        ("%d", []),
+        ("$-1d", [0, 1, 2, 3, 5]),
+        ("/second/,/fifth/d", [0, 5]),
+        ("3|.,+1d", [0, 1, 4, 5]),
+        ("2|?first?+1d", [0, 2, 3, 4, 5]),
+        ("g/ir/d", [1, 3, 4, 5]),
+        ("v/ir/d", [0, 2]),
+        ("2,$g/f/d", [0, 1, 2, 5]),
+        ("1d\n1d | 1d", [3, 4, 5]),
+    ],
+)
+def test_should_run_address_and_delete_scripts(
+    script: str,
+    expected_indexes: list[int],
+    text: str,
+    lines: list[str],
+) -> None:
+    buffer = compile_script(script).run(text)
+
+    assert buffer == "".join(lines[i] for i in expected_indexes)
+
+
+@pytest.mark.parametrize(
+    "script, expected_first_line",
+    [
+        ("1s/line/row/", "first row\n"),
+        ("1,$s/i/I/g", "fIrst lIne\n"),
+        ("1s/(\\w+) line/[&] \\1 \\&/", "[first line] first &\n"),
+        ("1s,line,a/b,", "first a/b\n"),
+        ("1s/l\\/*ine/x/", "first x\n"),
+        ("1s/LINE/row/i", "first row\n"),
+        ("1s/ line//", "first\n"),
+    ],
+)
+def test_should_substitute(
+    script: str,
+    expected_first_line: str,
+    text: str,
+) -> None:
+    buffer = compile_script(script).run(text)
+
+    assert buffer.splitlines(keepends=True)[0] == expected_first_line
+
+
+def test_should_append_and_insert_text_blocks(text: str) -> None:
+    script = "1a\nnew one\nnew two\n.\n$i\nbefore last\n."
+
+    buffer = compile_script(script).run(text).splitlines()
+
+    assert buffer[:4] == ["first line", "new one", "new two", "second line"]
+    assert buffer[-2:] == ["before last", "sixth line"]
+
+
+@pytest.mark.parametrize(
+    "script, expected_indexes",
+    [
+        ("1t$", [0, 1, 2, 3, 4, 5, 0]),
+        ("2,3co0", [1, 2, 0, 1, 2, 3, 4, 5]),
+        ("1m$", [1, 2, 3, 4, 5, 0]),
+        ("5,$mo1", [0, 4, 5, 1, 2, 3]),
+        ("g/^/m0", [5, 4, 3, 2, 1, 0]),
+        ("g/ir/t.", [0, 0, 1, 2, 2, 3, 4, 5]),
+    ],
+)
+def test_should_copy_and_move_lines(
+    script: str,
+    expected_indexes: list[int],
+    text: str,
+    lines: list[str],
+) -> None:
+    buffer = compile_script(script).run(text)
+
+    assert buffer == "".join(lines[i] for i in expected_indexes)
+
+
+def test_should_move_the_cursor_to_a_bare_address(text: str) -> None:
+    buffer = compile_script("/fourth/\n-1\nd").run(text)
+
+    assert "third line" not in buffer
+
+
+def test_should_cache_parsed_scripts() -> None:
+    script = "1,$s/cached/value/g"
+    parse_script(script)
+    hits = _parse_script.cache_info().hits
+
+    parse_script(script)
+
+    assert _parse_script.cache_info().hits == hits + 1
+
+
+def test_should_build_new_commands_for_a_cached_script(text: str) -> None:
+    script = "/line/d"
+    first = parse_script(script)
+    second = parse_script(script)
+
+    assert all(a is not b for a, b in zip(first, second))
+    first[0].from_range(1, 6)  # type: ignore[attr-defined]
+    assert compile(*second).run(text) == text.replace("first line\n", "")
+
+
+@pytest.mark.parametrize(
+    "script, expected_indexes",
+    [
+        ("1|/line/d", [0, 2, 3, 4, 5]),
+        ("$|/line/d", [1, 2, 3, 4, 5]),
+        ("2|?line?d", [1, 2, 3, 4, 5]),
+        ("1|?line?d", [0, 1, 2, 3, 4]),
+        ("2|/line/,/line/d", [0, 1, 3, 4, 5]),
+    ],
+)
+def test_should_search_addresses_from_the_next_line_like_ex(
+    script: str,
+    expected_indexes: list[int],
+    text: str,
+    lines: list[str],
+) -> None:
+    buffer = compile_script(script).run(text)
+
+    assert buffer == "".join(lines[i] for i in expected_indexes)
+
+
+@pytest.mark.parametrize(
+    "script, expected_lines",
+    [
+        ("1s/line/row|2d", ["first row\n", "third line\n"]),
+        ("1s/line/row/|2d", ["first row\n", "third line\n"]),
+        ("1s/line/a\\|b/|2d", ["first a|b\n", "third line\n"]),
+        ("1s/line|first/x/g|2d", ["x x\n", "third line\n"]),
+    ],
+)
+def test_should_end_an_open_replacement_at_a_bar(
+    script: str,
+    expected_lines: list[str],
+    lines: list[str],
+) -> None:
+    buffer = compile_script(script).run("".join(lines[:3]))
+
+    assert buffer.splitlines(keepends=True) == expected_lines
+
+
+def test_should_not_keep_the_buffer_of_a_cached_script() -> None:
+    buffer = LineBuffer()
+    buffer[:] = ["a line\n", "other line\n"]
+    commands = parse_script("g/a/s/line/text/\n1,$s/text/word/g\n/word/")
+
+    run_commands(Context(cursor=0, lines=buffer), commands)
+    reference = weakref.ref(buffer)
+    del buffer
+
+    assert reference() is None
+
+
+@pytest.mark.parametrize(
+    "script, message",
+    [
+        ("x", "Unknown command 'x'"),
+        ("1,3", None),
+        ("/open", "Expected a closing '/'"),
+        ("s", "Expected a pattern delimiter"),
+        ("g/a/g/b/d", "Cannot nest global commands"),
+        ("a text", "Expected the text of 'a' on next lines"),
+        ("a\nno end", "Expected a line with a single '.'"),
+        ("1d x", "Unexpected 'x'"),
+        ("//d", "Empty patterns are not supported"),
+        (",", None),
+        ("1t", "Expected a destination address"),
+        ("s|a|b|", "Expected a pattern delimiter"),
+        ("g|a|d", "Expected a pattern delimiter"),
+        ("s/a/b|c/", "Unknown command 'c'"),
+    ],
+)
+def test_should_reject_invalid_scripts(
+    script: str,
+    message: str | None,
+) -> None:
+    if message is None:
+        parse_script(script)
+        return
+
+    with pytest.raises(InvalidOperation, match=message):
+        parse_script(script)
@@ -0,0 +1,159 @@
+import random
+from collections.abc import Callable
+
+import pytest
+
+from yaex import (
+    Command,
+    Context,
+    InvalidOperation,
+    append,
+    delete,
+    find_line,
+    go_to,
+    index_lines,
+    search,
+    substitute,
+)
+from yaex.commands import find_observer, replace_lines
+from yaex.indexes import ExactLineIndex
+
+
+@pytest.fixture(params=[False, True], ids=["scan", "index"])
+def context(request: pytest.FixtureRequest, context: Context) -> Context:
+    if request.param:
+        return index_lines()(context)
+    return context
+
+
+def test_should_find_a_line(context: Context, lines: list[str]) -> None:
+    result = find_line("fourth line")(context)
+
+    assert result == Context(4, lines)
+
+
+def test_should_find_the_current_line(context: Context) -> None:
+    context.cursor = 2
+
+    result = find_line("second line")(context)
+
+    assert result.cursor == 2
+
+
+def test_should_wrap_around(context: Context) -> None:
+    context = append("first line")(go_to(3)(context))
+
+    assert find_line("first line")(context).cursor == 4
+    assert find_line("first line")(go_to(5)(context)).cursor == 1
+
+
+def test_should_find_a_line_in_reverse(context: Context) -> None:
+    context = append("third line")(go_to(5)(context))
+    command = find_line("third line").in_reverse()
+
+    assert command(go_to(6)(context)).cursor == 3
+    assert command(go_to(3)(context)).cursor == 6
+
+
+def test_should_follow_the_buffer_changes(context: Context) -> None:
+    context = substitute("second", "new")(go_to(2)(context))
+    context = delete().from_range(4, 5)(context)
+
+    assert find_line("new line")(context).cursor == 2
+    assert find_line("sixth line")(context).cursor == 4
+    with pytest.raises(InvalidOperation):
+        find_line("fourth line")(context)
+    with pytest.raises(InvalidOperation):
+        find_line("second line")(context)
+
+
+def test_should_resolve_a_range(context: Context, lines: list[str]) -> None:
+    command = delete().from_range(find_line("second line"), 3)
+
+    result = command(context)
+
+    assert result == Context(2, [lines[0], *lines[3:]])
+
+
+def test_should_only_match_whole_lines(context: Context) -> None:
+    with pytest.raises(InvalidOperation):
+        find_line("line")(context)
+    with pytest.raises(InvalidOperation):
+        find_line("first line.")(context)
+
+
+def test_should_find_lines_without_a_newline() -> None:
+    context = index_lines()(Context(1, ["a\n", "b", "b\n"]))
+
+    assert find_line("b")(context).cursor == 2
+    assert search("^b$").in_reverse()(context).cursor == 3
+
+
+def make_edit(generator: random.Random) -> Command:
+    line = generator.randrange(1, 7)
+    factories: list[Callable[[], Command]] = [
+        lambda: append(generator.choice(["a", "b", "a\nb"])),
+        delete,
+        lambda: substitute("[ab]", generator.choice(["a", "b", "c"])),
+        lambda: go_to(line),
+    ]
+    return generator.choice(factories)()
+
+
+def find_cursor(command: Command, context: Context) -> int | None:
+    cursor = context.cursor
+    try:
+        return command(context).cursor
+    except InvalidOperation:
+        return None
+    finally:
+        context.cursor = cursor
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_should_give_the_results_of_a_scan(seed: int) -> None:
+    generator = random.Random(seed)
+    lines = [generator.choice(["a\n", "b\n", "c\n"]) for _ in range(8)]
+    scanned = Context(1, list(lines))
+    indexed = index_lines()(Context(1, list(lines)))
+
+    for _ in range(30):
+        edit = make_edit(generator)
+        for context in (scanned, indexed):
+            try:
+                edit(context)
+            except InvalidOperation:
+                pass
+        command = find_line(generator.choice("abc"))
+        if generator.random() < 0.5:
+            command.in_reverse()
+
+        assert scanned == indexed
+        assert find_cursor(command, scanned) == find_cursor(command, indexed)
+
+
+def test_should_update_the_index_in_place_for_equal_sizes() -> None:
+    context = index_lines()(Context(1, ["a\n", "b\n", "a\n"]))
+    index = find_observer(context, ExactLineIndex)
+    assert index is not None
+    assert index.positions("a") == [0, 2]
+
+    replace_lines(context, 1, 2, ["a\n"])
+    replace_lines(context, 3, 3, ["b\n"])
+
+    assert index._positions == {"a\n": [0, 1, 2], "b\n": 3}
+
+
+def test_should_shift_the_index_after_a_line_count_change() -> None:
+    context = index_lines()(Context(1, ["a\n", "b\n", "a\n", "c\n"]))
+    index = find_observer(context, ExactLineIndex)
+    assert index is not None
+    assert index.positions("a") == [0, 2]
+
+    replace_lines(context, 1, 1, ["d\n", "e\n"])
+    replace_lines(context, 0, 1, [])
+    positions = index._positions
+
+    assert positions == {"d\n": 0, "e\n": 1, "b\n": 2, "a\n": 3, "c\n": 4}
+    assert index.positions("c") == (4,)
+    assert index._positions is positions
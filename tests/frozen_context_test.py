@@ -0,0 +1,84 @@
+from yaex import (
+    Context,
+    FrozenContext,
+    LineBuffer,
+    PieceTable,
+    append,
+    delete,
+    go_to,
+    substitute,
+)
+
+
+def test_should_apply_commands_without_editing_the_base(
+    lines: list[str],
+) -> None:
+    base = FrozenContext.from_lines(lines)
+
+    variant = base.apply(go_to(3), delete(), append("new line\n"))
+
+    assert base == FrozenContext(1, LineBuffer(lines))
+    assert variant.cursor == 4
+    assert list(variant.lines) == [
+        *lines[:2],
+        lines[3],
+        "new line\n",
+        *lines[4:],
+    ]
+
+
+def test_should_fork_many_variants_from_one_base() -> None:
+    base = FrozenContext.from_text("".join(f"{i}\n" for i in range(5000)))
+
+    variants = [base.apply(go_to(i * 1000 + 1), delete()) for i in range(5)]
+
+    assert len(base.lines) == 5000
+    for i, variant in enumerate(variants):
+        assert len(variant.lines) == 4999
+        assert f"{i * 1000}\n" not in variant.lines
+        assert f"{i * 1000 + 1}\n" in variant.lines
+
+
+def test_should_chain_applications(lines: list[str]) -> None:
+    base = FrozenContext.from_lines(lines)
+    first = base.apply(substitute("line", "row").from_range(1, 6))
+
+    second = first.apply(delete().from_range(1, 3))
+
+    assert first.text == "".join(line.replace("line", "row") for line in lines)
+    assert second.text == "".join(lines[3:]).replace("line", "row")
+    assert base.text == "".join(lines)
+
+
+def test_should_thaw_into_a_mutable_context(lines: list[str]) -> None:
+    base = FrozenContext.from_lines(lines, cursor=2)
+
+    context = delete()(base.thaw())
+
+    assert context == Context(2, [lines[0], *lines[2:]])
+    assert list(base.lines) == lines
+
+
+def test_should_share_unchanged_chunks_between_forks() -> None:
+    buffer = LineBuffer(f"{i}\n" for i in range(5000))
+
+    forked = buffer.fork()
+    forked[0] = "changed\n"
+    del forked[4000:4001]
+
+    assert buffer[0] == "0\n"
+    assert len(buffer) == 5000
+    assert forked[0] == "changed\n"
+    assert len(forked) == 4999
+    shared_chunks = set(map(id, buffer._chunks)) & set(map(id, forked._chunks))
+    assert len(shared_chunks) == len(buffer._chunks) - 2
+
+
+def test_should_fork_piece_tables(lines: list[str]) -> None:
+    table = PieceTable(lines)
+
+    forked = table.fork()
+    del forked[1:3]
+
+    assert table == lines
+    assert forked == [lines[0], *lines[3:]]
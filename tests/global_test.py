@@ -0,0 +1,141 @@
+import random
+
+import pytest
+
+from yaex import (
+    Context,
+    InvalidOperation,
+    append,
+    delete,
+    global_,
+    substitute,
+    vglobal,
+)
+from yaex.commands import LineMarks, replace_lines
+
+
+@pytest.fixture
+def lines() -> list[str]:
+    return [
+        "first line\n",
+        "\n",
+        "third line\n",
+        "\n",
+        "fifth line\n",
+        "sixth line\n",
+    ]
+
+
+def test_should_delete_every_matching_line(
+    context: Context,
+    lines: list[str],
+) -> None:
+    expected_lines = [line for line in lines if line != "\n"]
+    command = global_("^$", delete())
+
+    result = command(context)
+
+    assert result == Context(3, expected_lines)
+
+
+def test_should_delete_every_line_that_does_not_match(
+    context: Context,
+) -> None:
+    command = vglobal("line", delete())
+
+    result = command(context)
+
+    assert result == Context(
+        3,
+        ["first line\n", "third line\n", "fifth line\n", "sixth line\n"],
+    )
+
+
+def test_should_substitute_on_every_matching_line(
+    context: Context,
+    lines: list[str],
+) -> None:
+    expected_lines = [line.replace("line", "LINE") for line in lines]
+    command = global_("line", substitute("line", "LINE"))
+
+    result = command(context)
+
+    assert result == Context(6, expected_lines)
+
+
+def test_should_follow_the_marked_lines_when_lines_are_added(
+    context: Context,
+) -> None:
+    command = global_("^$", append("---"))
+
+    result = command(context)
+
+    assert result == Context(
+        6,
+        [
+            "first line\n",
+            "\n",
+            "---\n",
+            "third line\n",
+            "\n",
+            "---\n",
+            "fifth line\n",
+            "sixth line\n",
+        ],
+    )
+
+
+def test_should_skip_marked_lines_removed_by_the_command(
+    context: Context,
+) -> None:
+    command = global_("line", delete().from_range(1, 2))
+
+    result = command(context)
+
+    assert result == Context(1, [])
+
+
+def test_should_run_only_inside_a_range(
+    context: Context,
+    lines: list[str],
+) -> None:
+    del lines[3]
+    command = global_("^$", delete()).from_range(3, 6)
+
+    result = command(context)
+
+    assert result == Context(4, lines)
+
+
+def test_should_raise_error_when_no_line_matches(context: Context) -> None:
+    command = global_("unknown", delete())
+
+    with pytest.raises(InvalidOperation):
+        command(context)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_should_follow_the_marked_lines_through_any_edit(seed: int) -> None:
+    generator = random.Random(seed)
+    lines = [f"{number}\n" for number in range(40)]
+    marked = set(generator.sample(lines, 15))
+    context = Context(0, list(lines))
+    line_marks = LineMarks(
+        index for index, line in enumerate(lines) if line in marked
+    )
+    context.observers.append(line_marks)
+
+    for edit in range(30):
+        begin = generator.randrange(len(context.lines) + 1)
+        end = generator.randrange(begin, min(begin + 3, len(context.lines)) + 1)
+        count = generator.choice([n for n in range(4) if n != end - begin])
+        new_lines = [f"{edit}.{line}\n" for line in range(count)]
+        replace_lines(context, begin, end, new_lines)
+
+        pending = [
+            index for index, line in enumerate(context.lines) if line in marked
+        ]
+        mark = line_marks.pop()
+        assert mark == (pending[0] if pending else None)
+        if mark is not None:
+            marked.remove(context.lines[mark])
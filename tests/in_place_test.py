@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import pytest
+
+from yaex import (
+    append,
+    delete,
+    edit_file,
+    go_to,
+    go_to_last_line,
+    search,
+    substitute,
+)
+
+TEXT = "".join(f"line {number}\n" for number in range(1, 101))
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> Path:
+    path = tmp_path / "file.txt"
+    path.write_text(TEXT)
+    return path
+
+
+def test_should_write_the_tail_in_place_when_edits_are_near_the_end(
+    path: Path,
+) -> None:
+    inode = path.stat().st_ino
+
+    commands = (go_to(95), delete(), go_to_last_line(), append("x"))
+
+    changed = edit_file(path, *commands)
+
+    expected = TEXT.replace("line 95\n", "") + "x\n"
+    assert changed
+    assert path.read_text() == expected
+    assert path.stat().st_ino == inode
+
+
+def test_should_replace_the_file_when_edits_are_near_the_start(
+    path: Path,
+) -> None:
+    inode = path.stat().st_ino
+
+    changed = edit_file(path, go_to(2), substitute("line", "row"))
+
+    assert changed
+    assert path.read_text() == TEXT.replace("line 2\n", "row 2\n")
+    assert path.stat().st_ino != inode
+    assert [child.name for child in path.parent.iterdir()] == ["file.txt"]
+
+
+def test_should_shrink_the_file_when_the_tail_gets_shorter(
+    path: Path,
+) -> None:
+    changed = edit_file(path, go_to(91), delete().from_range(91, 100))
+
+    assert changed
+    assert path.read_text() == TEXT.split("line 91\n")[0]
+
+
+def test_should_not_write_a_file_left_unchanged(path: Path) -> None:
+    stat = path.stat()
+
+    assert not edit_file(path, search("line 50"))
+    assert not edit_file(path, go_to(99), substitute("line", "line"))
+    assert not edit_file(path, go_to(1), substitute("line", "line"))
+    assert path.stat().st_ino == stat.st_ino
+    assert path.stat().st_mtime_ns == stat.st_mtime_ns
+
+
+def test_should_end_the_last_line_before_appending(tmp_path: Path) -> None:
+    path = tmp_path / "file.txt"
+    path.write_text("first\nlast")
+
+    changed = edit_file(path, append("new"), rewrite_ratio=1)
+
+    assert changed
+    assert path.read_text() == "first\nlast\nnew\n"
+
+
+def test_should_keep_the_newlines_of_a_replaced_file(tmp_path: Path) -> None:
+    path = tmp_path / "crlf.txt"
+    path.write_bytes(b"a\r\nb\r\nc\r\n")
+
+    changed = edit_file(path, go_to(1), delete(), rewrite_ratio=0)
+
+    assert changed
+    assert path.read_bytes() == b"b\r\nc\r\n"
+
+
+def test_should_edit_an_empty_file(tmp_path: Path) -> None:
+    path = tmp_path / "file.txt"
+    path.touch()
+
+    assert edit_file(path, append("new"))
+    assert path.read_text() == "new\n"
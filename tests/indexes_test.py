@@ -0,0 +1,126 @@
+import random
+
+import pytest
+
+from yaex import (
+    Context,
+    InvalidOperation,
+    append,
+    delete,
+    index_trigrams,
+    search,
+    substitute,
+)
+from yaex.commands import find_observer, replace_lines
+from yaex.indexes import TrigramIndex, trigrams
+
+
+@pytest.fixture
+def context(context: Context) -> Context:
+    return index_trigrams()(context)
+
+
+def test_should_split_a_text_in_trigrams() -> None:
+    assert trigrams("line") == {"lin", "ine"}
+    assert trigrams("li") == set()
+
+
+def test_should_find_candidate_lines(lines: list[str]) -> None:
+    index = TrigramIndex(lines)
+
+    assert index.candidates("ird") == {"third line\n"}
+    assert index.candidates("line") == set(lines)
+    assert index.candidates("unknown") == set()
+    assert index.candidates("li") is None
+
+
+def test_should_attach_a_single_index(context: Context) -> None:
+    context = index_trigrams()(context)
+
+    indexes = [o for o in context.observers if isinstance(o, TrigramIndex)]
+    assert len(indexes) == 1
+
+
+def test_should_follow_the_buffer_changes(context: Context) -> None:
+    context = append("seventh line")(context)
+    context = search("second")(context)
+    context = delete()(context)
+    context = substitute("third", "3rd")(context)
+
+    index = find_observer(context, TrigramIndex)
+    assert index is not None
+    assert index.candidates("ven") == {"seventh line\n"}
+    assert index.candidates("sec") == set()
+    assert index.candidates("3rd") == {"3rd line\n"}
+    assert index.candidates("thi") == set()
+
+
+def test_should_find_the_positions_of_candidate_lines(
+    context: Context,
+) -> None:
+    index = find_observer(context, TrigramIndex)
+    assert index is not None
+    assert index.candidate_positions("th l") == [3, 4, 5]
+
+    replace_lines(context, 1, 1, ["new line\n", "\n"])
+    replace_lines(context, 4, 5, [])
+
+    assert index.candidate_positions("th l") == [4, 5, 6]
+    assert index.candidate_positions("line") == [0, 1, 3, 4, 5, 6]
+    assert index.candidate_positions("unknown") == []
+    assert index.candidate_positions("li") is None
+
+
+def test_should_search_with_the_index(
+    context: Context,
+    lines: list[str],
+) -> None:
+    context.cursor = 5
+    command = search("second").in_reverse()
+
+    result = command(context)
+
+    assert result == Context(2, lines)
+
+
+def test_should_raise_error_when_no_line_is_a_candidate(
+    context: Context,
+) -> None:
+    command = search("unknown")
+
+    with pytest.raises(InvalidOperation):
+        command(context)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_should_give_the_results_of_a_scan(seed: int) -> None:
+    generator = random.Random(seed)
+    words = ["line", "lines", "other", "liner"]
+    lines = [f"{generator.choice(words)}\n" for _ in range(20)]
+    scanned = Context(1, list(lines))
+    indexed = index_trigrams()(Context(1, list(lines)))
+
+    for _ in range(20):
+        begin = generator.randrange(len(scanned.lines) + 1)
+        end = generator.randrange(begin, len(scanned.lines) + 1)
+        new_lines = [
+            f"{generator.choice(words)}\n"
+            for _ in range(generator.randrange(3))
+        ]
+        for context in (scanned, indexed):
+            replace_lines(context, begin, end, new_lines)
+        cursor = generator.randrange(len(scanned.lines) + 1)
+        command = search(generator.choice(["lin[er]", "oth", "^line$"]))
+        if generator.random() < 0.5:
+            command.in_reverse()
+
+        results: list[int | None] = []
+        for context in (scanned, indexed):
+            context.cursor = cursor
+            try:
+                results.append(command(context).cursor)
+            except InvalidOperation:
+                results.append(None)
+
+        assert scanned == indexed
+        assert results[0] == results[1]
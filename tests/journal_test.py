@@ -0,0 +1,119 @@
+import pytest
+
+from yaex import (
+    Context,
+    InvalidOperation,
+    Journal,
+    LineBuffer,
+    append,
+    atomic,
+    delete,
+    global_,
+    go_to,
+    substitute,
+    yaex,
+)
+
+
+def test_should_keep_the_edits_when_every_command_succeeds(
+    context: Context,
+    lines: list[str],
+) -> None:
+    command = atomic(delete(), append("new line\n"))
+
+    result = command(context)
+
+    assert result == Context(2, [lines[1], "new line\n", *lines[2:]])
+    assert result.observers == []
+
+
+def test_should_restore_the_buffer_when_a_command_fails(
+    context: Context,
+    lines: list[str],
+) -> None:
+    command = atomic(
+        go_to(3),
+        substitute("line", "row"),
+        delete().from_range(2, 4),
+        delete().from_range(10, 12),
+    )
+
+    with pytest.raises(InvalidOperation):
+        command(context)
+
+    assert context == Context(1, lines)
+    assert context.observers == []
+
+
+def test_should_continue_after_a_failure_when_errors_are_ignored(
+    context: Context,
+    lines: list[str],
+) -> None:
+    command = atomic(delete(), delete().from_range(10, 12)).ignore_errors()
+
+    result = command(context)
+
+    assert result == Context(1, lines)
+
+
+def test_should_rollback_only_the_failing_nested_block(
+    context: Context,
+    lines: list[str],
+) -> None:
+    command = atomic(
+        delete(),
+        atomic(delete(), go_to(100)).ignore_errors(),
+        append("new line\n"),
+    )
+
+    result = command(context)
+
+    assert result == Context(2, [lines[1], "new line\n", *lines[2:]])
+
+
+def test_should_restore_the_buffer_after_global_edits(
+    lines: list[str],
+) -> None:
+    context = Context(1, LineBuffer(lines))
+    command = atomic(global_("i", delete()), go_to(100))
+
+    with pytest.raises(InvalidOperation):
+        command(context)
+
+    assert context == Context(1, lines)
+
+
+def test_should_rollback_to_the_last_checkpoint(
+    context: Context,
+    lines: list[str],
+) -> None:
+    journal = Journal()
+    context.observers.append(journal)
+    journal.checkpoint(context)
+    context = delete()(context)
+    journal.checkpoint(context)
+    context = delete().from_range(1, 3)(context)
+
+    journal.rollback(context)
+
+    assert context == Context(1, lines[1:])
+    journal.rollback(context)
+    assert context == Context(1, lines)
+
+
+def test_should_forget_the_edits_once_released(context: Context) -> None:
+    journal = Journal()
+    context.observers.append(journal)
+    journal.checkpoint(context)
+    context = delete()(context)
+
+    journal.release()
+    journal.checkpoint(context)
+    journal.rollback(context)
+
+    assert len(context.lines) == 5
+
+
+def test_should_run_atomic_from_yaex() -> None:
+    with pytest.raises(InvalidOperation):
+        yaex(atomic(append("a\n"), delete().from_range(5, 6)))
@@ -0,0 +1,73 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from yaex.__main__ import main
+
+
+@pytest.fixture
+def path(tmp_path: Path, lines: list[str]) -> Path:
+    path = tmp_path / "lines.txt"
+    path.write_text("".join(lines))
+    return path
+
+
+def test_should_edit_the_standard_input(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.setattr("sys.stdin", io.StringIO("a\nb\nc\n"))
+
+    status = main(["-e", "2d", "-e", "%s/$/!/"])
+
+    assert status == 0
+    assert capsys.readouterr().out == "a!\nc!\n"
+
+
+def test_should_print_the_edited_files(
+    path: Path,
+    lines: list[str],
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    status = main(["-e", "2,$d", str(path), str(path)])
+
+    assert status == 0
+    assert capsys.readouterr().out == lines[0] * 2
+    assert path.read_text() == "".join(lines)
+
+
+def test_should_edit_files_in_place(
+    path: Path,
+    tmp_path: Path,
+    lines: list[str],
+) -> None:
+    script_path = tmp_path / "script.ex"
+    script_path.write_text("/second/,/fifth/d\n")
+
+    status = main(["-f", str(script_path), "-i", str(path)])
+
+    assert status == 0
+    assert path.read_text() == lines[0] + lines[5]
+
+
+def test_should_keep_the_newlines_of_files_edited_in_place(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "crlf.txt"
+    path.write_bytes(b"a\r\nb\r\nc\r\n")
+
+    status = main(["-e", "2d", "-i", str(path)])
+
+    assert status == 0
+    assert path.read_bytes() == b"a\r\nc\r\n"
+
+
+def test_should_report_errors(
+    path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    status = main(["-e", "/missing/d", str(path)])
+
+    assert status == 1
+    assert capsys.readouterr().err == "yaex: Pattern not found.\n"
@@ -0,0 +1,81 @@
+import re
+
+import pytest
+
+from yaex.matchers import LiteralMatcher, Matcher, RegexMatcher, make_matcher
+from yaex.patterns import literal_text
+
+
+@pytest.mark.parametrize(
+    "pattern, text",
+    [("line", "line"), (r"a\.b", "a.b"), ("first line", "first line")],
+)
+def test_should_find_the_text_of_a_literal_pattern(
+    pattern: str,
+    text: str,
+) -> None:
+    assert literal_text(re.compile(pattern)) == text
+
+
+@pytest.mark.parametrize("pattern", ["a.b", "^line", "(?i)line", "a+"])
+def test_should_not_find_the_text_of_a_regex_pattern(pattern: str) -> None:
+    assert literal_text(re.compile(pattern)) is None
+
+
+def test_should_make_a_literal_matcher() -> None:
+    assert isinstance(make_matcher("line"), LiteralMatcher)
+    assert isinstance(make_matcher("a.b", literal=True), LiteralMatcher)
+    assert isinstance(make_matcher("a.b"), RegexMatcher)
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 5])
+@pytest.mark.parametrize("replacement", ["X", "", r"\n"])
+def test_should_substitute_like_a_regex(count: int, replacement: str) -> None:
+    line = "a.b a.b a.b\n"
+    literal_matcher = LiteralMatcher("a.b")
+    regex_matcher = RegexMatcher(re.compile(r"a\.b"))
+
+    result = literal_matcher.subn(replacement, line, count)
+
+    assert result == regex_matcher.subn(replacement, line, count)
+
+
+@pytest.mark.parametrize(
+    "matcher",
+    [LiteralMatcher("ab"), RegexMatcher(re.compile("a+b"))],
+)
+def test_should_find_the_last_match(matcher: Matcher) -> None:
+    text = "ab\n" * 5000 + "xx\n"
+
+    assert matcher.rfind(text, 0, len(text)) == 3 * 4999
+    assert matcher.rfind(text, 3 * 5000, len(text)) == -1
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [r"^ *key *= *\d+", r"(?<!x)key\b", r"key = (\d+)$", r"\s*key\s*=", "y\nk"],
+)
+def test_should_match_like_the_regex_without_the_literal(pattern: str) -> None:
+    lines = ["key = 1\n", "  key=2\n", "xkey = 3\n", "keys\n", "none\n"] * 3
+    text = "".join(lines)
+    matcher = RegexMatcher(re.compile(pattern))
+    regex_matcher = RegexMatcher(re.compile(pattern))
+    regex_matcher.required_literal = None
+
+    assert matcher.required_literal is not None
+    for line in lines:
+        assert matcher.matches(line) == regex_matcher.matches(line)
+        assert matcher.subn("X", line, 0) == regex_matcher.subn("X", line, 0)
+    for pos in range(0, len(text), 7):
+        assert matcher.find(text, pos, len(text)) == regex_matcher.find(
+            text, pos, len(text)
+        )
+        assert matcher.rfind(text, 0, pos) == regex_matcher.rfind(text, 0, pos)
+
+
+def test_should_share_the_matchers_of_a_pattern() -> None:
+    matcher = make_matcher(r"a+b")
+
+    assert make_matcher(r"a+b") is matcher
+    assert make_matcher(r"a+b", raw=True) is not matcher
+    assert make_matcher(r"a+b", literal=True) is not matcher
@@ -0,0 +1,87 @@
+import pytest
+
+from yaex import (
+    Context,
+    InvalidOperation,
+    Journal,
+    global_,
+    go_to_last_line,
+    move_lines,
+)
+
+
+def test_should_move_the_current_line_down(
+    context: Context,
+    lines: list[str],
+) -> None:
+    command = move_lines(3)
+
+    result = command(context)
+
+    assert result == Context(3, [*lines[1:3], lines[0], *lines[3:]])
+
+
+def test_should_move_lines_up(context: Context, lines: list[str]) -> None:
+    command = move_lines(1).from_range(4, go_to_last_line())
+
+    result = command(context)
+
+    assert result == Context(4, [lines[0], *lines[3:], *lines[1:3]])
+
+
+def test_should_move_lines_to_the_top(
+    context: Context,
+    lines: list[str],
+) -> None:
+    command = move_lines(0).from_range(6, 6)
+
+    result = command(context)
+
+    assert result == Context(1, [lines[5], *lines[:5]])
+
+
+@pytest.mark.parametrize("destination", [1, 3])
+def test_should_leave_lines_moved_next_to_themselves(
+    context: Context,
+    lines: list[str],
+    destination: int,
+) -> None:
+    command = move_lines(destination).from_range(2, 3)
+
+    result = command(context)
+
+    assert result == Context(3, lines)
+
+
+def test_should_not_move_lines_into_themselves(context: Context) -> None:
+    command = move_lines(3).from_range(2, 4)
+
+    with pytest.raises(InvalidOperation):
+        command(context)
+
+
+def test_should_move_lines_with_observers(
+    context: Context,
+    lines: list[str],
+) -> None:
+    journal = Journal()
+    context.observers.append(journal)
+    journal.checkpoint(context)
+    command = move_lines(5).from_range(1, 2)
+
+    result = command(context)
+
+    assert result == Context(5, [*lines[2:5], *lines[:2], lines[5]])
+    journal.rollback(result)
+    assert result == Context(1, lines)
+
+
+def test_should_keep_the_marks_of_a_global_command(
+    context: Context,
+    lines: list[str],
+) -> None:
+    command = global_("ir", move_lines(go_to_last_line()))
+
+    result = command(context)
+
+    assert result.lines == [*lines[1:2], *lines[3:], lines[0], lines[2]]
@@ -0,0 +1,157 @@
+import random
+from collections.abc import Callable
+
+import pytest
+
+from yaex import (
+    Command,
+    InvalidOperation,
+    Program,
+    append,
+    compile,
+    delete,
+    go_to,
+    go_to_first_line,
+    go_to_last_line,
+    insert,
+    move,
+    search,
+    substitute,
+    yaex,
+)
+from yaex.output import join_lines
+
+TEXT = "".join(f"line {number}\n" for number in range(1, 11))
+
+
+def run(program: Program) -> tuple[str, int] | type[Exception]:
+    try:
+        context = program.execute(program.load(TEXT))
+    except Exception as error:
+        return type(error)
+    return join_lines(context.lines), context.cursor
+
+
+def test_should_fuse_consecutive_appends() -> None:
+    program = compile(go_to(2), append("a"), append("b\nc"), append("d"))
+
+    assert len(program.optimized().commands) == 2
+    assert program.explain() == (
+        "go_to(2)\n"
+        "append('a', 'b\\nc', 'd')  # from append('a'); append('b\\nc');"
+        " append('d')\n"
+    )
+
+
+def test_should_fuse_consecutive_inserts() -> None:
+    program = compile(go_to(2), insert("a"), insert("b\nc"), insert("d"))
+
+    assert len(program.optimized().commands) == 2
+    assert run(program.optimized()) == run(program)
+
+
+def test_should_merge_adjacent_deletes() -> None:
+    program = compile(
+        delete().from_range(4, 5),
+        delete().from_range(3, 4),
+        delete(),
+        go_to(1),
+        delete(),
+        delete(),
+    )
+
+    assert program.explain().splitlines() == [
+        "delete().from_range(go_to(3), go_to(7))"
+        "  # from delete().from_range(go_to(4), go_to(5));"
+        " delete().from_range(go_to(3), go_to(4)); delete()",
+        "go_to(1)",
+        "delete().from_range(move(0), move(1))  # from delete(); delete()",
+    ]
+    assert run(program.optimized()) == run(program)
+
+
+def test_should_drop_overwritten_moves_that_cannot_fail() -> None:
+    program = compile(
+        go_to_last_line(),
+        go_to_first_line(),
+        go_to(2),
+        go_to(5),
+        search("line 7"),
+        move(0),
+        go_to_last_line(),
+    )
+
+    assert program.explain().splitlines() == [
+        "go_to(5)  # from go_to_last_line(); go_to_first_line(); go_to(2);"
+        " go_to(5)",
+        "search('line 7')  # from search('line 7'); move(0)",
+        "go_to_last_line()",
+    ]
+
+
+def test_should_keep_moves_that_can_fail() -> None:
+    program = compile(go_to(20), go_to_last_line(), delete(), move(0))
+
+    assert program.optimized().commands == program.commands
+    with pytest.raises(InvalidOperation):
+        program.optimized().run(TEXT)
+
+
+def test_should_not_merge_a_delete_with_a_reversed_range() -> None:
+    program = compile(delete().from_range(3, 4), delete().from_range(3, 2))
+
+    assert program.optimized().commands == program.commands
+    with pytest.raises(InvalidOperation):
+        program.optimized().run(TEXT)
+
+
+def test_should_optimize_inside_yaex() -> None:
+    commands = (append("a"), append("b"), go_to(1), delete(), delete())
+
+    assert yaex(*commands, optimize=True) == ""
+    assert yaex(*commands[:-1], optimize=True) == "b\n"
+
+
+def make_command(generator: random.Random) -> Command:
+    line = generator.randrange(-1, 12)
+    other = generator.randrange(-1, 12)
+    factories: list[Callable[[], Command]] = [
+        lambda: go_to(line),
+        go_to_first_line,
+        go_to_last_line,
+        lambda: move(generator.randrange(-1, 2)),
+        lambda: search(f"line {line}"),
+        lambda: substitute("line", "row"),
+        lambda: append(generator.choice(["", "a", "b\nc"])),
+        lambda: insert(generator.choice(["", "a", "b\nc"])),
+        delete,
+        lambda: delete().from_range(line, other),
+        lambda: delete().from_range(move(0), move(generator.randrange(-1, 3))),
+    ]
+    return generator.choice(factories)()
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_should_give_the_results_of_the_original_commands(seed: int) -> None:
+    generator = random.Random(seed)
+    commands = [make_command(generator) for _ in range(8)]
+    program = compile(*commands)
+
+    assert run(program.optimized()) == run(program)
+
+
+def make_delete(generator: random.Random) -> Command:
+    begin = generator.randrange(0, 6)
+    end = begin + generator.randrange(-1, 3)
+    if generator.random() < 0.3:
+        return delete().from_range(move(begin - 3), move(end - 3))
+    return delete().from_range(begin, end)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_should_give_the_results_of_the_original_deletes(seed: int) -> None:
+    generator = random.Random(seed)
+    commands = [go_to(5)] + [make_delete(generator) for _ in range(4)]
+    program = compile(*commands)
+
+    assert run(program.optimized()) == run(program)
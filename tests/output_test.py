@@ -0,0 +1,85 @@
+import io
+import os
+from collections.abc import Sequence
+from pathlib import Path
+
+import pytest
+
+from yaex import append, compile, delete, iter_chunks, yaex, yaex_to
+from yaex.output import write_buffers, write_lines
+
+
+def test_should_join_lines_into_chunks() -> None:
+    lines = [f"{i:03}\n" for i in range(10)]
+
+    chunks = list(iter_chunks(lines, chunk_size=8))
+
+    assert chunks == [
+        "000\n001\n",
+        "002\n003\n",
+        "004\n005\n",
+        "006\n007\n",
+        "008\n009\n",
+    ]
+    assert list(iter_chunks([])) == []
+
+
+def test_should_stream_the_result_to_a_text_stream(lines: list[str]) -> None:
+    stream = io.StringIO()
+
+    yaex_to(stream, append("".join(lines)), delete())
+
+    assert stream.getvalue() == yaex(append("".join(lines)), delete())
+
+
+def test_should_stream_the_result_to_a_file_descriptor(
+    tmp_path: Path,
+) -> None:
+    text = "".join(f"line {i} ü\n" for i in range(5000))
+    path = tmp_path / "output.txt"
+
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT)
+    try:
+        yaex_to(descriptor, append(text))
+    finally:
+        os.close(descriptor)
+
+    assert path.read_text(encoding="utf-8") == text
+
+
+def test_should_run_a_program_to_a_stream(lines: list[str]) -> None:
+    stream = io.StringIO()
+    program = compile(delete().from_range(1, 2))
+
+    program.run_to(stream, "".join(lines))
+
+    assert stream.getvalue() == "".join(lines[2:])
+
+
+def test_should_finish_partial_writes(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    writev = os.writev
+
+    def write_some(descriptor: int, buffers: Sequence[bytes]) -> int:
+        return writev(descriptor, [bytes(buffers[0])[:7]])
+
+    monkeypatch.setattr(os, "writev", write_some)
+    buffers = [b"first buffer", b"", b"second buffer"]
+    path = tmp_path / "output.bin"
+
+    with open(path, "wb") as file:
+        write_buffers(file.fileno(), buffers)
+
+    assert path.read_bytes() == b"first buffersecond buffer"
+
+
+def test_should_write_lines_to_a_text_file(tmp_path: Path) -> None:
+    path = tmp_path / "output.txt"
+    lines = ["a\n", "b\n"]
+
+    with open(path, "w") as file:
+        write_lines(file, lines)
+
+    assert path.read_text() == "a\nb\n"
@@ -0,0 +1,62 @@
+import re
+
+import pytest
+
+from yaex.patterns import exact_line_text, is_line_local, required_literal
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["line", "^first", r"line$", r"\w+ line", "a.b", r"(?<!a)b", r"\bab\b"],
+)
+def test_should_be_line_local(pattern: str) -> None:
+    assert is_line_local(re.compile(pattern))
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["^$", "x*", r"\s", "[^x]", r"\n", r"a\Z", r"\Aa", "(?s)a.", r"a(?=\n)"],
+)
+def test_should_not_be_line_local(pattern: str) -> None:
+    assert not is_line_local(re.compile(pattern))
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        (r"^key = 1$", "key = 1"),
+        (re.escape("a.b [c]").join("^$"), "a.b [c]"),
+        ("^$", ""),
+        ("^a.$", None),
+        ("a$", None),
+        (r"^a\Z", None),
+        ("(?i)^a$", None),
+        ("(?m)^a$", None),
+    ],
+)
+def test_should_find_exact_line_text(
+    pattern: str,
+    expected: str | None,
+) -> None:
+    assert exact_line_text(re.compile(pattern)) == expected
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        (r"^\s*timeout\s*=\s*\d+", "timeout"),
+        ("a(bc)d", "abcd"),
+        (r"\bkey\b = ", "key = "),
+        ("x(ab)+y", "ab"),
+        ("abc|abd", "ab"),
+        ("a(?i:b)c", "a"),
+        ("ab|cd", None),
+        ("a*", None),
+        ("(?i)key", None),
+    ],
+)
+def test_should_find_the_required_literal(
+    pattern: str,
+    expected: str | None,
+) -> None:
+    assert required_literal(re.compile(pattern)) == expected
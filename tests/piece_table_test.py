@@ -0,0 +1,216 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from yaex import (
+    Context,
+    PieceTable,
+    append,
+    delete,
+    go_to,
+    go_to_first_line,
+    go_to_last_line,
+    insert,
+    search,
+    substitute,
+    yaex,
+    yaex_file,
+    yaex_file_to,
+)
+from yaex.commands import TEXT_BLOCK_SIZE, split_input, split_lines
+from yaex.piece_table import MappedLines, TextLines, index_lines
+from yaex.program import BufferType
+
+
+@pytest.fixture
+def data(lines: list[str]) -> bytes:
+    return "".join(lines).encode()
+
+
+@pytest.fixture
+def table(data: bytes) -> PieceTable:
+    return PieceTable(MappedLines(data))
+
+
+def test_should_index_line_offsets() -> None:
+    assert list(index_lines(b"")) == [0]
+    assert list(index_lines(b"a\nbc\n")) == [0, 2, 5]
+    assert list(index_lines(b"a\nbc")) == [0, 2, 4]
+    assert list(index_lines("ü\nbc")) == [0, 2, 4]
+
+
+def test_should_decode_mapped_lines(data: bytes, lines: list[str]) -> None:
+    mapped_lines = MappedLines(data)
+
+    assert len(mapped_lines) == len(lines)
+    assert mapped_lines[3] == lines[3]
+    assert list(mapped_lines) == lines
+
+
+def test_should_add_a_new_line_to_the_last_mapped_line() -> None:
+    mapped_lines = MappedLines(b"first line\nsecond line")
+
+    assert list(mapped_lines) == ["first line\n", "second line\n"]
+
+
+def test_should_splice_pieces(table: PieceTable, lines: list[str]) -> None:
+    lines[1:3] = ["a\n", "b\n", "c\n"]
+    del lines[5]
+
+    table[1:3] = ["a\n", "b\n", "c\n"]
+    del table[5]
+
+    assert table == lines
+    assert table[2] == lines[2]
+    assert table[4:] == lines[4:]
+
+
+def test_should_run_commands_on_a_piece_table(
+    table: PieceTable,
+    lines: list[str],
+) -> None:
+    context = Context(6, table)
+    lines.append("a line\n")
+
+    result = append("a line")(context)
+
+    assert result == Context(7, lines)
+
+
+def test_should_edit_a_file(tmp_path: Path, data: bytes) -> None:
+    path = tmp_path / "lines.txt"
+    path.write_bytes(data)
+
+    buffer = yaex_file(path, search("second"), delete())
+
+    assert buffer == data.decode().replace("second line\n", "")
+
+
+def test_should_stream_an_edited_file(tmp_path: Path, data: bytes) -> None:
+    path = tmp_path / "lines.txt"
+    path.write_bytes(data)
+    stream = io.StringIO()
+
+    yaex_file_to(stream, path, search("second"), delete())
+
+    assert stream.getvalue() == yaex_file(path, search("second"), delete())
+
+
+def test_should_substitute_a_range_of_an_edited_file(tmp_path: Path) -> None:
+    path = tmp_path / "lines.txt"
+    path.write_bytes(b"a 1\nb 2\n")
+
+    buffer = yaex_file(
+        path,
+        append("c 3\nd 4"),
+        substitute(r"\s(\d)", r"_\1").from_range(
+            go_to_first_line(), go_to_last_line()
+        ),
+    )
+
+    assert buffer == "a_1\nb_2\nc_3\nd_4\n"
+
+
+def test_should_keep_lines_set_one_after_the_other_in_one_piece(
+    table: PieceTable,
+    lines: list[str],
+) -> None:
+    for index, line in enumerate(lines):
+        table[index] = line.upper()
+
+    assert table == [line.upper() for line in lines]
+    assert len(table._pieces) == 1
+    assert table._get_starts() == [0, len(lines)]
+
+
+def test_should_not_extend_the_lines_a_table_was_made_of(
+    lines: list[str],
+) -> None:
+    original = lines.copy()
+    table = PieceTable(original)
+
+    table.append("a line\n")
+
+    assert original == lines
+    assert table == [*lines, "a line\n"]
+
+
+def test_should_edit_an_empty_file(tmp_path: Path) -> None:
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+
+    buffer = yaex_file(path, append("a line"))
+
+    assert buffer == "a line\n"
+
+
+@pytest.fixture
+def big_text() -> str:
+    line_count = TEXT_BLOCK_SIZE // 8
+    return "".join(f"{i:07}\n" for i in range(line_count))
+
+
+@pytest.mark.parametrize("text", ["", "a", "a\n", "a\n\nb", "\n\n"])
+def test_should_split_text_lines_like_split_lines(text: str) -> None:
+    text_lines = TextLines(text)
+    expected_lines = split_lines(text)
+
+    assert len(text_lines) == len(expected_lines)
+    assert list(text_lines) == expected_lines
+    assert text_lines[:] == expected_lines
+    assert "".join(text_lines.iter_text(0, len(text_lines))) == "".join(
+        expected_lines,
+    )
+
+
+def test_should_keep_large_input_as_one_block(big_text: str) -> None:
+    input_lines = split_input(big_text)
+
+    assert isinstance(input_lines, TextLines)
+    assert input_lines[1:3] == ["0000001\n", "0000002\n"]
+    assert list(input_lines) == split_lines(big_text)
+
+
+def test_should_split_large_input_with_other_line_boundaries(
+    big_text: str,
+) -> None:
+    text = big_text + "a\r\nb"
+
+    input_lines = split_input(text)
+
+    assert input_lines == split_lines(text)
+
+
+def test_should_write_an_untouched_block_verbatim(big_text: str) -> None:
+    buffer = yaex(append(big_text), buffer_type=PieceTable)
+
+    assert buffer is big_text
+
+
+def test_should_edit_inside_a_block(big_text: str) -> None:
+    lines = split_lines(big_text)
+    lines[3:5] = ["new line\n"]
+    lines.insert(1, "first\n")
+
+    buffer = yaex(
+        append(big_text),
+        go_to(4),
+        delete().from_range(4, 5),
+        insert("new line"),
+        go_to(2),
+        insert("first"),
+        buffer_type=PieceTable,
+    )
+
+    assert buffer == "".join(lines)
+
+
+@pytest.mark.parametrize("buffer_type", [list, PieceTable])
+def test_should_insert_a_large_input(
+    big_text: str,
+    buffer_type: BufferType,
+) -> None:
+    buffer = yaex(append("a\nb"), insert(big_text), buffer_type=buffer_type)
+
+    assert buffer == "a\n" + big_text + "b\n"
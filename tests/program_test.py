@@ -0,0 +1,105 @@
+import dataclasses
+from collections.abc import Callable
+
+import pytest
+
+from yaex import (
+    Context,
+    InvalidOperation,
+    Program,
+    atomic,
+    compile,
+    delete,
+    global_,
+    go_to_first_line,
+    go_to_last_line,
+    search,
+    substitute,
+    yaex,
+)
+from yaex.commands import Command
+
+
+@pytest.fixture
+def program() -> Program:
+    return compile(
+        search("second"),
+        delete(),
+        substitute("line", "LINE").from_range(
+            go_to_first_line(),
+            go_to_last_line(),
+        ),
+    )
+
+
+def test_should_run_a_program_on_a_text(program: Program) -> None:
+    result = program.run("first line\nsecond line\nthird line\n")
+
+    assert result == "first LINE\nthird LINE\n"
+
+
+def test_should_run_a_program_on_many_texts(program: Program) -> None:
+    texts = ["second line\na line\n", "a line\nsecond line\n"]
+
+    results = list(program.run_many(texts))
+
+    assert results == ["a LINE\n", "a LINE\n"]
+
+
+def test_should_run_a_program_without_text() -> None:
+    assert compile().run() == yaex()
+
+
+def test_should_not_change_a_program(program: Program) -> None:
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        program.commands = ()  # type: ignore[misc]
+
+
+def test_should_raise_error_when_compiling_something_else() -> None:
+    command: Command = "delete"  # type: ignore[assignment]
+
+    with pytest.raises(TypeError):
+        compile(command)
+
+
+@pytest.mark.parametrize(
+    "make_command",
+    [
+        lambda: delete,
+        lambda: delete().from_range(
+            go_to_first_line,  # type: ignore[arg-type]
+            2,
+        ),
+        lambda: global_("line", delete),  # type: ignore[arg-type]
+        lambda: atomic(delete(), "delete"),  # type: ignore[arg-type]
+    ],
+)
+def test_should_raise_error_when_compiling_a_command_type(
+    make_command: Callable[[], Command],
+) -> None:
+    with pytest.raises(TypeError):
+        compile(make_command())
+
+
+def test_should_run_a_program_again_from_one_of_its_commands() -> None:
+    inner_results: list[str] = []
+
+    def run_inner(context: Context) -> Context:
+        if context.lines[context.cursor - 1] == "first line\n":
+            inner_results.append(reentrant.run("inner line\n"))
+        return context
+
+    reentrant = compile(
+        global_("line", run_inner),
+        substitute("line", "LINE").from_range(1, go_to_last_line()),
+    )
+
+    result = reentrant.run("first line\nsecond line\n")
+
+    assert result == "first LINE\nsecond LINE\n"
+    assert inner_results == ["inner LINE\n"]
+
+
+def test_should_raise_error_when_a_command_fails(program: Program) -> None:
+    with pytest.raises(InvalidOperation):
+        program.run("first line\n")
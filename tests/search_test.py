@@ -1,6 +1,8 @@
+import re
+
 import pytest
 
-from yaex import Context, InvalidOperation, search
+from yaex import Context, InvalidOperation, search, substitute
 
 
 @pytest.fixture
@@ -103,3 +105,83 @@ def test_should_raise_error_when_pattern_not_found(
 
     with pytest.raises(InvalidOperation):
         command(empty_context)
+
+
+@pytest.mark.parametrize("pattern", [r"th\w+d", r"^\s*third", r"(?s)third.*"])
+def test_should_find_the_same_line_with_any_kind_of_pattern(
+    context: Context,
+    lines: list[str],
+    pattern: str,
+) -> None:
+    context.cursor = 4
+    command = search(pattern)
+
+    result = command(context)
+
+    assert result == Context(3, lines)
+
+
+def test_should_search_lines_changed_after_a_previous_search(
+    context: Context,
+) -> None:
+    search("fifth")(context)
+    substitute("fifth", "sixth")(context)
+    command = search("sixth").in_reverse()
+
+    result = command(context)
+
+    assert result.cursor == 5
+
+
+def test_should_pick_the_last_match_of_a_reverse_search() -> None:
+    context = Context(50, [f"line {i}\n" for i in range(1, 101)])
+    command = search("line 1").in_reverse()
+
+    result = command(context)
+
+    assert result.cursor == 19
+
+
+def test_should_search_a_literal_text(context: Context) -> None:
+    context.lines[0] = "first.line\n"
+    command = search("first.line", literal=True).in_reverse()
+
+    result = command(context)
+
+    assert result.cursor == 1
+
+
+def test_should_search_lines_set_directly_in_the_buffer(
+    context: Context,
+) -> None:
+    search(r"fi\w+h")(context)
+    context.lines[2] = "fifth line again\n"
+    context.cursor = 1
+
+    result = search(r"fi\w+h")(context)
+
+    assert result.cursor == 3
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_should_search_across_blocks_of_lines(reverse: bool) -> None:
+    lines = [f"line {i}\n" for i in range(5000)]
+    lines[3000] = "line 3000"
+    pattern = re.compile(r"\d00\b")
+    matching_lines = [
+        i + 1 for i, line in enumerate(lines) if pattern.search(line)
+    ]
+    command = search(pattern.pattern)
+    if reverse:
+        command = command.in_reverse()
+
+    for cursor in range(1, 5001, 37):
+        result = command(Context(cursor, lines))
+
+        if reverse:
+            earlier = [line for line in matching_lines if line < cursor]
+            expected = (earlier or matching_lines)[-1]
+        else:
+            later = [line for line in matching_lines if line >= cursor]
+            expected = (later or matching_lines)[0]
+        assert result.cursor == expected
@@ -0,0 +1,92 @@
+import pytest
+
+from yaex import Context, InvalidOperation, go_to_last_line, move, sort
+
+
+@pytest.fixture
+def numbers_context() -> Context:
+    lines = ["id=10 b\n", "id=9 c\n", "none\n", "id=-2 a\n", "id=9 a\n"]
+    return Context(1, lines)
+
+
+def test_should_sort_the_whole_buffer(
+    context: Context,
+    lines: list[str],
+) -> None:
+    result = sort()(context)
+
+    assert result == Context(1, sorted(lines))
+
+
+def test_should_sort_a_range(context: Context, lines: list[str]) -> None:
+    command = sort().from_range(move(1), go_to_last_line())
+
+    result = command(context)
+
+    assert result == Context(2, [lines[0], *sorted(lines[1:])])
+
+
+def test_should_sort_in_reverse(context: Context, lines: list[str]) -> None:
+    result = sort().in_reverse()(context)
+
+    assert result.lines == sorted(lines, reverse=True)
+
+
+def test_should_sort_numerically(numbers_context: Context) -> None:
+    result = sort().numerically()(numbers_context)
+
+    assert result.lines == [
+        "none\n",
+        "id=-2 a\n",
+        "id=9 c\n",
+        "id=9 a\n",
+        "id=10 b\n",
+    ]
+
+
+def test_should_sort_by_a_key(numbers_context: Context) -> None:
+    result = sort().by(r" (\w)").in_reverse()(numbers_context)
+
+    assert result.lines == [
+        "id=9 c\n",
+        "id=10 b\n",
+        "id=-2 a\n",
+        "id=9 a\n",
+        "none\n",
+    ]
+
+
+def test_should_sort_numerically_by_a_key(numbers_context: Context) -> None:
+    result = sort().by(b"=[0-9]+").numerically()(numbers_context)
+
+    assert result.lines == [
+        "none\n",
+        "id=-2 a\n",
+        "id=9 c\n",
+        "id=9 a\n",
+        "id=10 b\n",
+    ]
+
+
+def test_should_not_replace_sorted_lines(lines: list[str]) -> None:
+    recorded: list[int] = []
+
+    class Recorder:
+        def lines_replaced(self, index: int, *_: object) -> None:
+            recorded.append(index)
+
+    context = Context(1, sorted(lines), [Recorder()])
+    sort()(context)
+
+    assert recorded == []
+
+
+def test_should_sort_an_empty_buffer(empty_context: Context) -> None:
+    result = sort()(empty_context)
+
+    assert result == Context(1, [])
+
+
+def test_should_reject_an_invalid_range(context: Context) -> None:
+    with pytest.raises(InvalidOperation):
+        sort().from_range(3, 2)(context)
@@ -106,7 +106,7 @@ def test_should_substitute_a_text_from_range(
 ) -> None:
     begin_resolver, end_resolver = make_line_resolver_callbacks(begin, end)
     lines = []
-    for line_number, line_text in enumerate(context.lines.copy(), start=1):
+    for line_number, line_text in enumerate(list(context.lines), start=1):
         new_line = line_text
         begin_line = begin_resolver._resolve_line(context)
         end_line = end_resolver._resolve_line(context)
@@ -121,8 +121,54 @@ def test_should_substitute_a_text_from_range(
     assert result == Context(cursor, lines)
 
 
+@pytest.mark.parametrize(
+    "begin, end",
+    [(go_to(0), go_to_last_line()), (-1, 3), (4, 2), (1, 7)],
+)
+def test_should_raise_error_when_range_is_invalid(
+    begin: LineResolver,
+    end: LineResolver,
+    context: Context,
+    lines: list[str],
+) -> None:
+    command = substitute("line", "row").from_range(begin, end)
+
+    with pytest.raises(InvalidOperation):
+        command(context)
+    assert context.lines == lines
+
+
 def test_should_raise_error_when_text_not_found(context: Context) -> None:
     command = substitute("fourth", "4th")
 
     with pytest.raises(InvalidOperation):
         command(context)
+
+
+@pytest.mark.parametrize("times", [0, 1, 2])
+@pytest.mark.parametrize("search_regex", [r"line \d+", r"\s\d+", "^$"])
+def test_should_substitute_a_text_in_a_large_range(
+    times: int,
+    search_regex: str,
+) -> None:
+    lines = [f"line {i} line {i} line {i}\n" for i in range(1, 1001)]
+    lines[500] = "\n"
+    context = Context(1, lines.copy())
+    expected_lines = [re.sub(search_regex, "X", line, times) for line in lines]
+    expected_lines[:9] = lines[:9]
+    expected_lines[990:] = lines[990:]
+    command = substitute(search_regex, "X").times(times).from_range(10, 990)
+
+    result = command(context)
+
+    cursor = 501 if search_regex == "^$" else 990
+    assert result == Context(cursor, expected_lines)
+
+
+def test_should_substitute_a_literal_text(context: Context) -> None:
+    context.lines[0] = "1.2 1.2 1x2\n"
+    command = substitute("1.2", "one", literal=True).every_time()
+
+    result = command(context)
+
+    assert result.lines[0] == "one one 1x2\n"
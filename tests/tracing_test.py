@@ -0,0 +1,194 @@
+import pytest
+
+from yaex import (
+    CommandHistogram,
+    CommandRecord,
+    Context,
+    InvalidOperation,
+    append,
+    compile,
+    delete,
+    global_,
+    go_to,
+    search,
+    substitute,
+    yaex,
+)
+from yaex.tracing import run_traced
+
+
+class RecordingTracer:
+    def __init__(self) -> None:
+        self.records: list[CommandRecord] = []
+
+    def command_executed(self, record: CommandRecord) -> None:
+        self.records.append(record)
+
+
+@pytest.fixture
+def tracer() -> RecordingTracer:
+    return RecordingTracer()
+
+
+def test_should_record_every_command(
+    tracer: RecordingTracer,
+    lines: list[str],
+) -> None:
+    yaex(
+        append("".join(lines)),
+        go_to(2),
+        search("fifth"),
+        substitute("line", "row").from_range(1, 4),
+        delete().from_range(2, 3),
+        tracer=tracer,
+    )
+
+    records = tracer.records
+    assert [record.command_type for record in records] == [
+        "AppendCommand",
+        "GoToCommand",
+        "SearchCommand",
+        "SubstituteCommand",
+        "DeleteCommand",
+    ]
+    assert [record.pattern for record in records] == [
+        None,
+        None,
+        "fifth",
+        "line",
+        None,
+    ]
+    assert [record.lines_before for record in records] == [0, 6, 6, 6, 6]
+    assert [record.lines_after for record in records] == [6, 6, 6, 6, 4]
+    assert [record.lines_spanned for record in records] == [
+        None,
+        None,
+        4,
+        4,
+        None,
+    ]
+    assert [record.line_range for record in records] == [
+        None,
+        None,
+        None,
+        (1, 4),
+        (2, 3),
+    ]
+    assert all(record.wall_seconds >= 0 for record in records)
+    assert all(record.cpu_seconds >= 0 for record in records)
+
+
+def test_should_count_the_lines_spanned_by_a_wrapping_search(
+    tracer: RecordingTracer,
+    lines: list[str],
+) -> None:
+    program = compile(go_to(5), search("second"), search("sixth").in_reverse())
+
+    program.run("".join(lines), tracer=tracer)
+
+    assert [record.lines_spanned for record in tracer.records] == [
+        None,
+        4,
+        2,
+    ]
+
+
+def test_should_record_the_whole_buffer_range_of_global(
+    tracer: RecordingTracer,
+    lines: list[str],
+) -> None:
+    yaex(append("".join(lines)), global_("f", delete()), tracer=tracer)
+
+    record = tracer.records[-1]
+    assert record.command_type == "GlobalCommand"
+    assert record.line_range == (1, 6)
+    assert record.lines_after == 3
+
+
+def test_should_stop_tracing_at_a_failing_command(
+    tracer: RecordingTracer,
+) -> None:
+    with pytest.raises(InvalidOperation):
+        yaex(append("a"), search("b"), delete(), tracer=tracer)
+
+    assert len(tracer.records) == 2
+    record = tracer.records[-1]
+    assert record.command_type == "SearchCommand"
+    assert record.error == "InvalidOperation: Pattern not found."
+    assert record.lines_spanned is None
+    assert tracer.records[0].error is None
+
+
+def test_should_record_the_range_the_command_resolved(
+    tracer: RecordingTracer,
+    lines: list[str],
+) -> None:
+    begin = search("second")
+    resolved_lines = []
+    resolve_line = begin._resolve_line
+
+    def count_resolved_lines(context: Context) -> int:
+        resolved_lines.append(context.cursor)
+        return resolve_line(context)
+
+    begin._resolve_line = count_resolved_lines  # type: ignore[method-assign]
+    program = compile(
+        substitute("line", "row").from_range(begin, 4),
+        global_("row", substitute("row", "line")),
+    )
+
+    program.run("".join(lines), tracer=tracer)
+
+    assert len(resolved_lines) == 1
+    assert [record.line_range for record in tracer.records] == [
+        (2, 4),
+        (1, 6),
+    ]
+
+
+def test_should_trace_without_observing_the_lines(
+    tracer: RecordingTracer,
+    lines: list[str],
+) -> None:
+    observers = []
+
+    def record_observers(context: Context) -> Context:
+        observers.append(list(context.observers))
+        return context
+
+    context = Context(1, list(lines))
+    run_traced(context, [record_observers, substitute("f", "F")], tracer)
+
+    assert observers == [[]]
+    assert context.observers == []
+    assert context.range_resolved is None
+    assert tracer.records[-1].line_range == (1, 1)
+
+
+def test_should_aggregate_records_by_command_type(lines: list[str]) -> None:
+    histogram = CommandHistogram()
+    program = compile(
+        append("".join(lines)),
+        search("line"),
+        search("line"),
+        substitute("line", "row").from_range(1, 6),
+    )
+
+    program.run(tracer=histogram)
+
+    search_stats = histogram.stats["SearchCommand"]
+    assert search_stats.count == 2
+    assert search_stats.lines_spanned == 2
+    assert sum(search_stats.buckets.values()) == 2
+    assert histogram.stats["SubstituteCommand"].lines_spanned == 6
+    report = histogram.report().splitlines()
+    assert report[0].split() == [
+        "command",
+        "count",
+        "wall",
+        "ms",
+        "cpu",
+        "ms",
+        "spanned",
+    ]
+    assert len(report) == 4
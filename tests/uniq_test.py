@@ -0,0 +1,37 @@
+import pytest
+
+from yaex import Context, InvalidOperation, go_to_last_line, uniq
+
+
+@pytest.fixture
+def repeated_context() -> Context:
+    return Context(1, ["b\n", "a\n", "b\n", "c\n", "a\n", "b\n"])
+
+
+def test_should_keep_the_first_of_equal_lines(
+    repeated_context: Context,
+) -> None:
+    result = uniq()(repeated_context)
+
+    assert result == Context(1, ["b\n", "a\n", "c\n"])
+
+
+def test_should_only_drop_lines_repeated_in_the_range(
+    repeated_context: Context,
+) -> None:
+    command = uniq().from_range(2, go_to_last_line())
+
+    result = command(repeated_context)
+
+    assert result == Context(2, ["b\n", "a\n", "b\n", "c\n"])
+
+
+def test_should_leave_unique_lines(context: Context, lines: list[str]) -> None:
+    result = uniq()(context)
+
+    assert result == Context(1, lines)
+
+
+def test_should_reject_an_invalid_range(context: Context) -> None:
+    with pytest.raises(InvalidOperation):
+        uniq().from_range(1, 7)(context)
@@ -0,0 +1,144 @@
+from collections.abc import Callable
+
+import pytest
+
+from yaex import (
+    Command,
+    InvalidOperation,
+    PieceTable,
+    append,
+    atomic,
+    compile,
+    delete,
+    global_,
+    insert,
+    search,
+    sort,
+    substitute,
+    yaex,
+    yaex_bytes,
+)
+from yaex.commands import TEXT_BLOCK_SIZE
+from yaex.program import BufferType
+from yaex.raw import Text
+
+
+def test_should_return_empty_bytes_when_no_commands() -> None:
+    assert yaex_bytes() == b""
+
+
+def test_should_keep_non_ascii_bytes_unchanged() -> None:
+    data = "first café\nsecond €\n".encode()
+
+    buffer = yaex_bytes(append(data), search(b"first"), delete())
+
+    assert buffer == "second €\n".encode()
+
+
+def test_should_substitute_raw_patterns() -> None:
+    buffer = yaex_bytes(
+        append(b"key = caf\xc3\xa9\nother = 1\n"),
+        substitute(rb"caf\xc3\xa9", b"tea").from_range(1, 2),
+    )
+
+    assert buffer == b"key = tea\nother = 1\n"
+
+
+def test_should_match_classes_like_bytes_patterns() -> None:
+    data = "é\n".encode()
+
+    with pytest.raises(InvalidOperation):
+        yaex_bytes(append(data), global_(rb"\w", delete()))
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        (r"\w+", b"_\xc3\xa9 \xc3\xa0 _\n"),
+        (r"\s+b", b"caf\xc3\xa9 \xc3\xa0_\n"),
+        (r"(?i)\xe3|b", b"caf\xc3\xa9 \xc3\xa0 _\n"),
+    ],
+)
+def test_should_match_str_patterns_like_bytes_patterns(
+    pattern: str,
+    expected: bytes,
+) -> None:
+    data = "café à b\n".encode()
+
+    buffer = yaex_bytes(append(data), substitute(pattern, "_").every_time())
+
+    assert buffer == expected
+
+
+def test_should_sort_by_str_patterns_like_bytes_patterns() -> None:
+    buffer = yaex_bytes(append(b"z\n\xc3\xa9a\n"), sort().by(r"\w+"))
+
+    assert buffer == b"\xc3\xa9a\nz\n"
+
+
+def test_should_split_raw_input_like_bytes() -> None:
+    buffer = yaex_bytes(append(b"a\r\nb\x85c\x0cd"), insert(b"first"))
+
+    assert buffer == b"a\nfirst\nb\x85c\x0cd\n"
+
+
+def test_should_accept_ascii_str_arguments() -> None:
+    buffer = yaex_bytes(append(b"a line\n"), substitute("line", "row"))
+
+    assert buffer == b"a row\n"
+
+
+@pytest.mark.parametrize("buffer_type", [list, PieceTable])
+def test_should_edit_large_raw_input(buffer_type: BufferType) -> None:
+    data = b"".join(b"%07d \xff\n" % i for i in range(TEXT_BLOCK_SIZE // 8))
+
+    buffer = yaex_bytes(
+        append(data),
+        search(b"^0000002 "),
+        delete(),
+        buffer_type=buffer_type,
+    )
+
+    assert buffer == data.replace(b"0000002 \xff\n", b"")
+
+
+def test_should_run_a_program_on_raw_text() -> None:
+    program = compile(search(b"b"), delete())
+
+    assert program.run_bytes(b"a\nb\nc\n") == b"a\nc\n"
+
+
+@pytest.mark.parametrize(
+    "run",
+    [
+        lambda: yaex_bytes(append("café")),
+        lambda: yaex_bytes(append(b"a\n"), substitute("a", "é")),
+        lambda: yaex(append(b"caf\xc3\xa9")),
+        lambda: yaex(append("a"), search(b"\xe9")),
+        lambda: compile(global_("a", delete()), insert(b"\xff")).run("a"),
+    ],
+)
+def test_should_raise_error_when_running_text_of_another_type(
+    run: Callable[[], Text],
+) -> None:
+    with pytest.raises(TypeError, match="cannot run on"):
+        run()
+
+
+@pytest.mark.parametrize(
+    "make_command",
+    [
+        lambda: substitute(b"\xe9", "é"),
+        lambda: global_("é", substitute(b"\xe9", b"e")),
+        lambda: atomic(append("é"), append(b"\xe9")),
+    ],
+)
+def test_should_raise_error_when_mixing_str_and_bytes(
+    make_command: Callable[[], Command],
+) -> None:
+    with pytest.raises(TypeError, match="Cannot mix"):
+        make_command()
+
+
+def test_should_mix_ascii_str_and_bytes() -> None:
+    assert yaex(append(b"a line"), substitute(b"line", "é")) == "a é\n"
@@ -1,35 +1,188 @@
+import os
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from .buffer import InternedLineBuffer, LineBuffer
 from .commands import AppendCommand as append
 from .commands import Command, Context
+from .commands import CopyLinesCommand as copy_lines
 from .commands import DeleteCommand as delete
+from .commands import FindLineCommand as find_line
+from .commands import GlobalCommand as global_
 from .commands import GoToCommand as go_to
 from .commands import GoToFirstLineCommand as go_to_first_line
 from .commands import GoToLastLineCommand as go_to_last_line
+from .commands import IndexLinesCommand as index_lines
+from .commands import IndexTrigramsCommand as index_trigrams
 from .commands import InsertCommand as insert
 from .commands import InvalidOperation
 from .commands import MoveCommand as move
+from .commands import MoveLinesCommand as move_lines
 from .commands import SearchCommand as search
+from .commands import SortCommand as sort
 from .commands import SubstituteCommand as substitute
+from .commands import UniqCommand as uniq
+from .commands import VGlobalCommand as vglobal
+from .output import Stream, iter_chunks, join_lines, write_lines
+from .piece_table import MappedLines, PieceTable, map_file
+from .program import BufferType, Program, check_text_type, compile, run_commands
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .batch import BatchResult, run_batch
+    from .edits import Edits, Hunk
+    from .ex import compile_script, parse_script
+    from .frozen_context import FrozenContext
+    from .in_place import edit_file
+    from .journal import AtomicCommand as atomic
+    from .journal import Journal
+    from .tracing import CommandHistogram, CommandRecord, Tracer
+
+# Names of the modules that are only imported when one of their names is
+# used, to keep the startup of short scripts fast. The batch module pulls
+# in multiprocessing, and the others are not needed to run commands.
+_LAZY_NAMES = {
+    "BatchResult": ("batch", "BatchResult"),
+    "CommandHistogram": ("tracing", "CommandHistogram"),
+    "CommandRecord": ("tracing", "CommandRecord"),
+    "Edits": ("edits", "Edits"),
+    "FrozenContext": ("frozen_context", "FrozenContext"),
+    "Hunk": ("edits", "Hunk"),
+    "Journal": ("journal", "Journal"),
+    "Tracer": ("tracing", "Tracer"),
+    "atomic": ("journal", "AtomicCommand"),
+    "compile_script": ("ex", "compile_script"),
+    "edit_file": ("in_place", "edit_file"),
+    "parse_script": ("ex", "parse_script"),
+    "run_batch": ("batch", "run_batch"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_NAMES[name]
+    module = import_module(f".{module_name}", __name__)
+    value = getattr(module, attribute)
+    globals()[name] = value
+    return value
+
+
+def yaex(
+    *commands: Command,
+    buffer_type: BufferType = list,
+    tracer: "Tracer | None" = None,
+    optimize: bool = False,
+) -> str:
+    program = compile(*commands, buffer_type=buffer_type, optimize=optimize)
+    return program.run(tracer=tracer)
+
+
+def yaex_bytes(
+    *commands: Command,
+    buffer_type: BufferType = list,
+    tracer: "Tracer | None" = None,
+) -> bytes:
+    program = compile(*commands, buffer_type=buffer_type)
+    return program.run_bytes(tracer=tracer)
+
+
+def yaex_to(
+    stream: Stream,
+    *commands: Command,
+    buffer_type: BufferType = list,
+    tracer: "Tracer | None" = None,
+    encoding: str = "utf-8",
+) -> None:
+    program = compile(*commands, buffer_type=buffer_type)
+    program.run_to(stream, tracer=tracer, encoding=encoding)
+
+
+def yaex_file(
+    path: str | os.PathLike[str],
+    *commands: Command,
+    encoding: str = "utf-8",
+    tracer: "Tracer | None" = None,
+) -> str:
+    with _run_on_file(path, commands, encoding, tracer) as context:
+        return join_lines(context.lines)
+
+
+def yaex_file_to(
+    stream: Stream,
+    path: str | os.PathLike[str],
+    *commands: Command,
+    encoding: str = "utf-8",
+    tracer: "Tracer | None" = None,
+) -> None:
+    """Like ``yaex_file``, but write the result to ``stream`` in chunks.
+
+    The result is never joined, so the lines of the file that were not
+    edited are decoded one block at a time while they are written.
+    """
+    with _run_on_file(path, commands, encoding, tracer) as context:
+        write_lines(stream, context.lines, encoding)
 
 
-def yaex(*commands: Command) -> str:
-    context = Context(cursor=0, lines=[])
-    for command in commands:
-        context = command(context)
-    return "".join(context.lines)
+@contextmanager
+def _run_on_file(
+    path: str | os.PathLike[str],
+    commands: Iterable[Command],
+    encoding: str,
+    tracer: "Tracer | None",
+) -> Iterator[Context]:
+    check_text_type(commands, str)
+    with open(path, "rb") as file, map_file(file) as data:
+        lines = PieceTable(MappedLines(data, encoding))
+        context = Context(cursor=len(lines), lines=lines)
+        yield run_commands(context, commands, tracer)
 
 
 __all__ = [
+    "BatchResult",
     "Command",
+    "CommandHistogram",
+    "CommandRecord",
     "Context",
+    "Edits",
+    "FrozenContext",
+    "Hunk",
+    "InternedLineBuffer",
     "InvalidOperation",
+    "Journal",
+    "LineBuffer",
+    "PieceTable",
+    "Program",
+    "Tracer",
     "append",
+    "atomic",
+    "compile",
+    "compile_script",
+    "copy_lines",
     "delete",
+    "edit_file",
+    "find_line",
+    "global_",
     "go_to",
     "go_to_first_line",
     "go_to_last_line",
+    "index_lines",
+    "index_trigrams",
     "insert",
+    "iter_chunks",
     "move",
+    "move_lines",
+    "parse_script",
+    "run_batch",
     "search",
+    "sort",
     "substitute",
+    "uniq",
+    "vglobal",
     "yaex",
+    "yaex_bytes",
+    "yaex_file",
+    "yaex_file_to",
+    "yaex_to",
 ]
@@ -0,0 +1,82 @@
+import argparse
+import sys
+
+from .commands import InvalidOperation
+from .ex import compile_script
+from .program import Program
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m yaex",
+        description="Run an ex script on files or on the standard input.",
+    )
+    scripts = parser.add_mutually_exclusive_group(required=True)
+    scripts.add_argument(
+        "-e",
+        "--expression",
+        action="append",
+        help="ex commands to run, may be given many times",
+    )
+    scripts.add_argument(
+        "-f",
+        "--file",
+        help="read the ex script from this file",
+    )
+    parser.add_argument(
+        "-i",
+        "--in-place",
+        action="store_true",
+        help="replace the files instead of writing to the standard output",
+    )
+    parser.add_argument("--encoding", default="utf-8")
+    parser.add_argument("paths", nargs="*", metavar="FILE")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    if args.file is not None:
+        with open(args.file, encoding=args.encoding) as file:
+            script = file.read()
+    else:
+        script = "\n".join(args.expression)
+
+    try:
+        program = compile_script(script)
+        if not args.paths:
+            program.run_to(sys.stdout, sys.stdin.read())
+            return 0
+        for path in args.paths:
+            run_file(program, path, args.in_place, args.encoding)
+    except (InvalidOperation, OSError, UnicodeError) as error:
+        sys.stderr.write(f"yaex: {error}\n")
+        return 1
+    return 0
+
+
+def run_file(
+    program: Program,
+    path: str,
+    in_place: bool,
+    encoding: str,
+) -> None:
+    with open(path, encoding=encoding) as file:
+        text = file.read()
+        newlines = file.newlines
+
+    if not in_place:
+        program.run_to(sys.stdout, text)
+        return
+
+    from .batch import write_atomically
+
+    result = program.run(text)
+    if result != text:
+        # A file whose lines all end the same way keeps that newline.
+        newline = newlines if isinstance(newlines, str) else None
+        write_atomically(path, result, encoding, newline)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
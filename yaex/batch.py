@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+from .commands import InvalidOperation
+from .program import Program
+
+Path = str | os.PathLike[str]
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    path: Path
+    changed: bool = False
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_batch(
+    program: Program,
+    paths: Iterable[Path],
+    max_workers: int | None = None,
+    chunksize: int = 16,
+    encoding: str = "utf-8",
+) -> list[BatchResult]:
+    """Apply ``program`` to every file in ``paths`` using worker processes.
+
+    Files are sent to the workers in chunks of ``chunksize`` paths and are
+    replaced atomically. A file that fails is reported in its result and
+    does not stop the rest of the batch.
+    """
+    apply = partial(apply_program, program, encoding=encoding)
+    with ProcessPoolExecutor(max_workers) as executor:
+        return list(executor.map(apply, paths, chunksize=chunksize))
+
+
+def apply_program(
+    program: Program,
+    path: Path,
+    encoding: str = "utf-8",
+) -> BatchResult:
+    try:
+        text, newline = read_text(path, encoding)
+        result = program.run(text)
+        if result == text:
+            return BatchResult(path)
+        write_atomically(path, result, encoding, newline)
+    except (InvalidOperation, OSError, UnicodeError) as error:
+        return BatchResult(path, error=error)
+    return BatchResult(path, changed=True)
+
+
+def read_text(path: Path, encoding: str = "utf-8") -> tuple[str, str | None]:
+    """Return the text of the file at ``path`` and the newline it uses.
+
+    The text is read with universal newlines. The newline is ``None``
+    unless all the lines of the file end with the same one.
+    """
+    with open(path, encoding=encoding) as file:
+        text = file.read()
+        newline = file.newlines
+    return text, newline if isinstance(newline, str) else None
+
+
+def write_atomically(
+    path: Path,
+    text: str,
+    encoding: str = "utf-8",
+    newline: str | None = None,
+) -> None:
+    """Replace the file at ``path`` with ``text``.
+
+    Every ``"\\n"`` of the text is written as ``newline``, like ``open``
+    does, so text read with ``read_text`` keeps the newlines of its file.
+    """
+    directory, name = os.path.split(os.fspath(path))
+    descriptor, temporary_path = tempfile.mkstemp(
+        prefix=f".{name}.",
+        dir=directory or None,
+    )
+    try:
+        with open(descriptor, "w", encoding=encoding, newline=newline) as file:
+            file.write(text)
+        shutil.copymode(path, temporary_path)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
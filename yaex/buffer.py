@@ -0,0 +1,340 @@
+from abc import abstractmethod
+from bisect import bisect_right
+from collections import Counter
+from collections.abc import Iterable, Iterator, MutableSequence, Sequence
+from itertools import accumulate, chain, islice
+from typing import overload
+
+LOAD = 512
+
+
+class SplicedBuffer(MutableSequence[str]):
+    """Base class for line stores that are edited through ``splice``."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[str]:
+        ...
+
+    @abstractmethod
+    def splice(self, begin: int, end: int, lines: Iterable[str]) -> None:
+        """Replace the lines in ``[begin, end)`` with ``lines``."""
+
+    @abstractmethod
+    def fork(self) -> "SplicedBuffer":
+        """Return a copy that shares its storage until either is edited."""
+
+    @abstractmethod
+    def _get_line(self, index: int) -> str:
+        ...
+
+    @abstractmethod
+    def _iter_from(self, index: int) -> Iterator[str]:
+        ...
+
+    def _set_line(self, index: int, value: str) -> None:
+        self.splice(index, index + 1, (value,))
+
+    def iter_text(self) -> Iterator[str]:
+        """Yield the text of the buffer in pieces that join into it."""
+        return iter(self)
+
+    @overload
+    def __getitem__(self, index: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            begin, end, step = index.indices(len(self))
+            if step != 1:
+                return list(self)[index]
+            return list(islice(self._iter_from(begin), max(end - begin, 0)))
+
+        return self._get_line(self._normalize_index(index))
+
+    @overload
+    def __setitem__(self, index: int, value: str) -> None:
+        ...
+
+    @overload
+    def __setitem__(self, index: slice, value: Iterable[str]) -> None:
+        ...
+
+    def __setitem__(
+        self,
+        index: int | slice,
+        value: str | Iterable[str],
+    ) -> None:
+        if isinstance(index, slice):
+            begin, end = self._slice_bounds(index)
+            self.splice(begin, end, value)
+            return
+
+        assert isinstance(value, str)  # nosec
+        self._set_line(self._normalize_index(index), value)
+
+    def __delitem__(self, index: int | slice) -> None:
+        if isinstance(index, slice):
+            begin, end = self._slice_bounds(index)
+            self.splice(begin, end, ())
+            return
+
+        index = self._normalize_index(index)
+        self.splice(index, index + 1, ())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (str, bytes)) or not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            a == b for a, b in zip(self, other)
+        )
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+    def insert(self, index: int, value: str) -> None:
+        begin, _, _ = slice(index, None).indices(len(self))
+        self.splice(begin, begin, (value,))
+
+    def _normalize_index(self, index: int) -> int:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError(f"{type(self).__name__} index out of range")
+        return index
+
+    def _slice_bounds(self, index: slice) -> tuple[int, int]:
+        begin, end, step = index.indices(len(self))
+        if step != 1:
+            raise ValueError(
+                f"{type(self).__name__} does not support extended slices",
+            )
+        return begin, max(begin, end)
+
+
+class LineBuffer(SplicedBuffer):
+    """A list of lines stored as a sequence of chunks.
+
+    Each chunk holds at most ``2 * LOAD`` lines, so splicing only moves the
+    lines of the chunks involved instead of the whole buffer. Chunks left
+    with fewer than ``LOAD // 2`` lines are merged with a neighbour. Line
+    numbers are resolved with a binary search over the chunk offsets. An
+    edit only marks the offsets after its chunk as stale, and they are
+    computed again when a line after them is looked up.
+
+    Forked buffers share their chunks and copy one only before editing it.
+    """
+
+    def __init__(self, lines: Iterable[str] = ()) -> None:
+        self._chunks: list[list[str]] = []
+        # The first ``_known`` offsets are the first lines of their chunks.
+        self._offsets = [0]
+        self._known = 1
+        self._shared: set[int] = set()
+        self._size = 0
+        self.splice(0, 0, lines)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        return chain.from_iterable(self._chunks)
+
+    def __reversed__(self) -> Iterator[str]:
+        return chain.from_iterable(map(reversed, reversed(self._chunks)))
+
+    def splice(self, begin: int, end: int, lines: Iterable[str]) -> None:
+        new_lines = list(lines)
+        if not self._chunks:
+            self._chunks.append([])
+
+        begin_chunk, begin_offset = self._locate_edge(begin)
+        end_chunk, end_offset = self._locate_edge(end)
+        if begin_chunk == end_chunk:
+            chunk = self._own_chunk(begin_chunk)
+            chunk[begin_offset:end_offset] = new_lines
+        else:
+            following_chunk = begin_chunk + 1
+            self._own_chunk(begin_chunk)[begin_offset:] = new_lines
+            del self._own_chunk(end_chunk)[:end_offset]
+            del self._chunks[following_chunk:end_chunk]
+
+        self._size += len(new_lines) - (end - begin)
+        if len(new_lines) != end - begin or begin_chunk != end_chunk:
+            self._rebalance(begin_chunk)
+
+    def fork(self) -> "LineBuffer":
+        forked = type(self)()
+        forked._chunks = self._chunks.copy()
+        forked._offsets = self._offsets.copy()
+        forked._known = self._known
+        forked._size = self._size
+        self._shared = set(map(id, self._chunks))
+        forked._shared = self._shared.copy()
+        return forked
+
+    def _get_line(self, index: int) -> str:
+        chunk_index, offset = self._locate(index)
+        return self._chunks[chunk_index][offset]
+
+    def _set_line(self, index: int, value: str) -> None:
+        chunk_index, offset = self._locate(index)
+        self._own_chunk(chunk_index)[offset] = value
+
+    def _own_chunk(self, chunk_index: int) -> list[str]:
+        """Return the chunk at ``chunk_index``, copied first if it is shared."""
+        chunk = self._chunks[chunk_index]
+        if id(chunk) in self._shared:
+            self._shared.discard(id(chunk))
+            chunk = self._chunks[chunk_index] = chunk.copy()
+        return chunk
+
+    def _iter_from(self, index: int) -> Iterator[str]:
+        if index >= self._size:
+            return iter(())
+        chunk_index, offset = self._locate(index)
+        following_chunk = chunk_index + 1
+        first = islice(self._chunks[chunk_index], offset, None)
+        rest = chain.from_iterable(self._chunks[following_chunk:])
+        return chain(first, rest)
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        offsets = self._offsets
+        last_known = self._known - 1
+        if last_known < len(self._chunks):
+            known_end = offsets[last_known] + len(self._chunks[last_known])
+            if index >= known_end:
+                self._update_offsets()
+        chunk_index = bisect_right(offsets, index, 0, self._known) - 1
+        return chunk_index, index - offsets[chunk_index]
+
+    def _locate_edge(self, index: int) -> tuple[int, int]:
+        if index >= self._size:
+            last = len(self._chunks) - 1
+            return last, len(self._chunks[last])
+        return self._locate(index)
+
+    def _update_offsets(self) -> None:
+        offsets = self._offsets
+        last_known = self._known - 1
+        lengths = map(len, islice(self._chunks, last_known, None))
+        following = accumulate(lengths, initial=offsets[last_known])
+        offsets[last_known:] = following
+        self._known = len(offsets)
+
+    def _rebalance(self, chunk_index: int) -> None:
+        chunks = self._chunks
+        following_chunk = chunk_index + 1
+        if following_chunk < len(chunks) and not chunks[following_chunk]:
+            del chunks[following_chunk]
+
+        if len(chunks[chunk_index]) < LOAD // 2 and len(chunks) > 1:
+            if following_chunk == len(chunks):
+                chunk_index -= 1
+            self._merge_following(chunk_index)
+
+        chunk = chunks[chunk_index]
+        if len(chunk) > 2 * LOAD:
+            size = len(chunk)
+            count = size // LOAD
+            bounds = [size * piece // count for piece in range(count + 1)]
+            pieces = map(chunk.__getitem__, map(slice, bounds, bounds[1:]))
+            following_chunk = chunk_index + 1
+            chunks[chunk_index:following_chunk] = pieces
+        self._known = min(self._known, chunk_index + 1)
+
+    def _merge_following(self, chunk_index: int) -> None:
+        following_chunk = chunk_index + 1
+        following = self._chunks.pop(following_chunk)
+        if following:
+            self._own_chunk(chunk_index).extend(following)
+
+
+class InternTable:
+    """Canonical copies of strings, counted by the references held to them.
+
+    Equal strings added to the table are replaced by the first one added,
+    and a string is dropped once every reference to it has been removed.
+    """
+
+    def __init__(self) -> None:
+        self._strings: dict[str, str] = {}
+        self._counts: Counter[str] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __contains__(self, string: object) -> bool:
+        return string in self._strings
+
+    def add(self, strings: Iterable[str]) -> list[str]:
+        """Take a reference to each of ``strings`` and return their copies."""
+        canonical = self._strings.setdefault
+        interned = [canonical(string, string) for string in strings]
+        self._counts.update(interned)
+        return interned
+
+    def remove(self, strings: Iterable[str]) -> None:
+        counts = self._counts
+        for string in strings:
+            count = counts[string] - 1
+            if count:
+                counts[string] = count
+            else:
+                del counts[string]
+                del self._strings[string]
+
+    def copy(self) -> "InternTable":
+        table = InternTable()
+        table._strings = self._strings.copy()
+        table._counts = self._counts.copy()
+        return table
+
+
+class InternedLineBuffer(LineBuffer):
+    """A ``LineBuffer`` whose equal lines are all one object.
+
+    Lines are interned as they are stored, so the memory for their text
+    grows with the distinct lines of the buffer rather than with its
+    length. Every buffer has its own table, copied when it is forked.
+    """
+
+    def __init__(self, lines: Iterable[str] = ()) -> None:
+        self._table = InternTable()
+        super().__init__(lines)
+
+    @property
+    def distinct_lines(self) -> int:
+        return len(self._table)
+
+    @property
+    def dedup_ratio(self) -> float:
+        """The number of lines for each distinct line, ``1.0`` if empty."""
+        if not self._table:
+            return 1.0
+        return len(self) / len(self._table)
+
+    def splice(self, begin: int, end: int, lines: Iterable[str]) -> None:
+        new_lines = self._table.add(lines)
+        if begin < end:
+            self._table.remove(self[begin:end])
+        super().splice(begin, end, new_lines)
+
+    def fork(self) -> "InternedLineBuffer":
+        forked = super().fork()
+        assert isinstance(forked, InternedLineBuffer)  # nosec
+        forked._table = self._table.copy()
+        return forked
+
+    def _set_line(self, index: int, value: str) -> None:
+        (line,) = self._table.add((value,))
+        self._table.remove((self._get_line(index),))
+        super()._set_line(index, line)
@@ -1,8 +1,27 @@
 import re
-from collections.abc import Iterable
-from dataclasses import dataclass
-from itertools import cycle, islice
-from typing import Protocol
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, MutableSequence, Sequence
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import compress, islice
+from operator import not_
+from typing import Protocol, TypeVar
+
+from .indexes import ExactLineIndex, TrigramIndex
+from .matchers import (
+    ExactLineMatcher,
+    Matcher,
+    PerMode,
+    compile_pattern,
+    make_matchers,
+)
+from .piece_table import TextLines, split_text
+from .raw import Text, TextType, common_text_type, text_type, to_str
+from .text_view import iter_matching_lines, search_lines
+
+TEXT_BLOCK_SIZE = 1 << 16
+OTHER_LINE_BOUNDARIES = "\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"
+NUMBER = re.compile(r"-?[0-9]+")
 
 
 class InvalidOperation(Exception):
@@ -13,11 +32,36 @@ LineNumber = int
 LineIndex = int
 LineOffset = int
 
+T = TypeVar("T")
+
+
+class LinesObserver(Protocol):
+    def lines_replaced(
+        self,
+        index: LineIndex,
+        old_lines: Sequence[str],
+        new_lines: Sequence[str],
+    ) -> None:
+        ...
+
 
 @dataclass
 class Context:
     cursor: LineNumber
-    lines: list[str]
+    lines: MutableSequence[str]
+    observers: list[LinesObserver] = field(
+        default_factory=list,
+        compare=False,
+        repr=False,
+    )
+    # Whether the lines are bytes mapped to characters, see ``raw.to_str``.
+    raw: bool = field(default=False, compare=False)
+    # Called with every line range a command resolves, see ``tracing``.
+    range_resolved: Callable[[LineNumber, LineNumber], None] | None = field(
+        default=None,
+        compare=False,
+        repr=False,
+    )
 
 
 class Command(Protocol):
@@ -70,53 +114,43 @@ class GoToCommand:
 class MoveCommand:
     def __init__(self, offset: LineOffset) -> None:
         self.offset = offset
-        self._context: Context
 
     def __call__(self, context: Context) -> Context:
-        self._context = context
-        line = self._move()
-        raise_for_line_number(line, self._context)
-        self._context.cursor = line
-        return self._context
-
-    def _move(self) -> LineNumber:
-        return self._context.cursor + self.offset
+        line = self._resolve_line(context)
+        raise_for_line_number(line, context)
+        context.cursor = line
+        return context
 
     def _resolve_line(self, context: Context) -> LineNumber:
-        self._context = context
-        return self._move()
+        return context.cursor + self.offset
 
 
 class InsertCommand:
-    def __init__(self, input_string: str) -> None:
+    def __init__(self, input_string: Text) -> None:
         self.input_string = input_string
+        self._text_type = text_type(input_string)
 
     def __call__(self, context: Context) -> Context:
         if not context.lines:
             raise InvalidOperation("Cannot insert into an empty buffer")
 
-        input_lines = split_lines(self.input_string)
-        lines_before, lines_after = split_lines_at_cursor(
-            context.lines,
-            context.cursor,
-        )
-        context.lines = lines_before + input_lines + lines_after
-        context.cursor = len(lines_before) + len(input_lines)
+        input_lines = split_input(self.input_string)
+        pivot = clamp_index(to_index(context.cursor), context)
+        replace_lines(context, pivot, pivot, input_lines)
+        context.cursor = pivot + len(input_lines)
         return context
 
 
 class AppendCommand:
-    def __init__(self, input_string: str) -> None:
+    def __init__(self, input_string: Text) -> None:
         self.input_string = input_string
+        self._text_type = text_type(input_string)
 
     def __call__(self, context: Context) -> Context:
-        input_lines = split_lines(self.input_string)
-        lines_before, lines_after = split_lines_at_cursor(
-            context.lines,
-            context.cursor + 1,
-        )
-        context.lines = lines_before + input_lines + lines_after
-        context.cursor = len(lines_before) + len(input_lines)
+        input_lines = split_input(self.input_string)
+        pivot = clamp_index(context.cursor, context)
+        replace_lines(context, pivot, pivot, input_lines)
+        context.cursor = pivot + len(input_lines)
         return context
 
 
@@ -136,80 +170,406 @@ class DeleteCommand:
         if not context.lines:
             raise InvalidOperation("Cannot delete to an empty buffer.")
 
-        begin_resolver, end_resolver = self._range
-        begin = begin_resolver._resolve_line(context)
-        end = end_resolver._resolve_line(context)
-        if begin > end:
-            raise InvalidOperation("The end range comes before begin.")
+        begin, end = resolve_line_range(context, self._range)
+        begin_index = to_index(begin)
+        replace_lines(context, begin_index, end, [])
+        context.cursor = begin
+        return context
+
+
+class CopyLinesCommand:
+    """Copy lines after the ``destination`` line, like the ex ``t`` command.
+
+    A ``destination`` of 0 copies the lines before the first one. The
+    cursor ends on the last copied line.
+    """
+
+    def __init__(self, destination: LineResolver) -> None:
+        self._destination = make_line_resolver_callback(destination)
+        self._range = make_default_line_resolver_callbacks()
+
+    def from_range(
+        self,
+        begin: LineResolver,
+        end: LineResolver,
+    ) -> "CopyLinesCommand":
+        self._range = make_line_resolver_callbacks(begin, end)
+        return self
+
+    def __call__(self, context: Context) -> Context:
+        begin, end, destination = resolve_transfer(
+            context,
+            self._range,
+            self._destination,
+        )
+        begin_index = to_index(begin)
+        copied_lines = context.lines[begin_index:end]
+        replace_lines(context, destination, destination, copied_lines)
+        context.cursor = destination + len(copied_lines)
+        return context
+
+
+class MoveLinesCommand:
+    """Move lines after the ``destination`` line, like the ex ``m`` command.
+
+    The moved lines and the ones they pass over are swapped in a single
+    splice. The cursor ends on the last moved line.
+    """
+
+    def __init__(self, destination: LineResolver) -> None:
+        self._destination = make_line_resolver_callback(destination)
+        self._range = make_default_line_resolver_callbacks()
+
+    def from_range(
+        self,
+        begin: LineResolver,
+        end: LineResolver,
+    ) -> "MoveLinesCommand":
+        self._range = make_line_resolver_callbacks(begin, end)
+        return self
 
-        raise_for_line_number(begin, context)
-        raise_for_line_number(end, context)
+    def __call__(self, context: Context) -> Context:
+        begin, end, destination = resolve_transfer(
+            context,
+            self._range,
+            self._destination,
+        )
         begin_index = to_index(begin)
-        del context.lines[begin_index:end]
+        if begin_index < destination < end:
+            raise InvalidOperation("Cannot move lines into themselves.")
+        if destination in (begin_index, end):
+            context.cursor = end
+            return context
+
+        moved_lines = context.lines[begin_index:end]
+        if find_observer(context, LineMarks) is not None:
+            # Marks of a global command only follow lines that are deleted
+            # and added, so the lines passed over keep theirs.
+            replace_lines(context, begin_index, end, [])
+            if destination > end:
+                destination -= len(moved_lines)
+            replace_lines(context, destination, destination, moved_lines)
+        elif destination > end:
+            passed_lines = context.lines[end:destination]
+            new_lines = [*passed_lines, *moved_lines]
+            replace_lines(context, begin_index, destination, new_lines)
+            destination -= len(moved_lines)
+        else:
+            passed_lines = context.lines[destination:begin_index]
+            new_lines = [*moved_lines, *passed_lines]
+            replace_lines(context, destination, end, new_lines)
+        context.cursor = destination + len(moved_lines)
+        return context
+
+
+class SortCommand:
+    """Sort the lines of a range, the whole buffer by default.
+
+    Lines compare as text, or by a key: the match of ``by()``'s pattern,
+    its first group when it has one, and with ``numerically()`` the first
+    integer of the line or key. Lines without a key come first, or last in
+    reverse, in their order. The sort is stable and computes every key
+    once.
+    """
+
+    def __init__(self) -> None:
+        self._range = make_whole_buffer_line_resolver_callbacks()
+        self._key_patterns: PerMode[re.Pattern[str]] | None = None
+        self._text_type: TextType | None = None
+        self._numeric = False
+        self._reverse = False
+
+    def from_range(
+        self,
+        begin: LineResolver,
+        end: LineResolver,
+    ) -> "SortCommand":
+        self._range = make_line_resolver_callbacks(begin, end)
+        return self
+
+    def by(self, key_regex: Text) -> "SortCommand":
+        raw = isinstance(key_regex, bytes)
+        self._key_patterns = PerMode(partial(compile_pattern, key_regex), raw)
+        self._text_type = text_type(key_regex)
+        return self
+
+    def numerically(self) -> "SortCommand":
+        self._numeric = True
+        return self
+
+    def in_reverse(self) -> "SortCommand":
+        self._reverse = True
+        return self
+
+    def __call__(self, context: Context) -> Context:
+        if not context.lines:
+            return context
+
+        begin, end = resolve_line_range(context, self._range)
+        begin_index = to_index(begin)
+        range_lines = context.lines[begin_index:end]
+        if self._key_patterns is None and not self._numeric:
+            sorted_lines = sorted(range_lines, reverse=self._reverse)
+        else:
+            key_pattern = None
+            if self._key_patterns is not None:
+                key_pattern = self._key_patterns.get(context.raw)
+            sorted_lines = sorted(
+                range_lines,
+                key=partial(self._sort_key, key_pattern),
+                reverse=self._reverse,
+            )
+
+        if sorted_lines != range_lines:
+            replace_lines(context, begin_index, end, sorted_lines)
+        context.cursor = begin
+        return context
+
+    def _sort_key(
+        self,
+        key_pattern: re.Pattern[str] | None,
+        line: str,
+    ) -> tuple[str] | tuple[int] | tuple[()]:
+        key = line
+        if key_pattern is not None:
+            match = key_pattern.search(line)
+            if match is None:
+                return ()
+            key = match.group(1 if key_pattern.groups else 0) or ""
+        if not self._numeric:
+            return (key,)
+
+        number = NUMBER.search(key)
+        if number is None:
+            return ()
+        return (int(number.group()),)
+
+
+class UniqCommand:
+    """Drop repeated lines of a range, the whole buffer by default.
+
+    The first of equal lines is kept, wherever they are in the range, and
+    the lines are hashed in a single pass.
+    """
+
+    def __init__(self) -> None:
+        self._range = make_whole_buffer_line_resolver_callbacks()
+
+    def from_range(
+        self,
+        begin: LineResolver,
+        end: LineResolver,
+    ) -> "UniqCommand":
+        self._range = make_line_resolver_callbacks(begin, end)
+        return self
+
+    def __call__(self, context: Context) -> Context:
+        if not context.lines:
+            return context
+
+        begin, end = resolve_line_range(context, self._range)
+        begin_index = to_index(begin)
+        range_lines = context.lines[begin_index:end]
+        unique_lines = list(dict.fromkeys(range_lines))
+        if len(unique_lines) < len(range_lines):
+            replace_lines(context, begin_index, end, unique_lines)
         context.cursor = begin
         return context
 
 
 class SearchCommand:
-    def __init__(self, input_regex: str) -> None:
+    def __init__(self, input_regex: Text, literal: bool = False) -> None:
+        self._set_up(
+            to_str(input_regex),
+            make_matchers(input_regex, literal),
+            text_type(input_regex),
+        )
+
+    def _set_up(
+        self,
+        input_regex: str,
+        matchers: PerMode[Matcher],
+        input_type: TextType | None,
+    ) -> None:
         self._input_regex = input_regex
-        self._pattern = re.compile(input_regex)
+        self._matchers = matchers
         self._reverse = False
-        self._context: Context
+        self._text_type = input_type
 
     def in_reverse(self) -> "SearchCommand":
         self._reverse = True
         return self
 
     def __call__(self, context: Context) -> Context:
-        self._context = context
-        self._context.cursor = self._search_line()
-        return self._context
-
-    def _search_line(self) -> LineNumber:
-        for line_number, line_text in self._make_lines_iterator():
-            if self._match_pattern(line_text):
-                return self._to_valid_line(line_number)
+        context.cursor = self._search_line(context)
+        return context
+
+    def _search_line(self, context: Context) -> LineNumber:
+        size = len(context.lines)
+        if size > 0:
+            cursor_index = to_index(self._start_line(context)) % size
+            positions = self._find_exact_positions(context)
+            if positions is not None:
+                line_index = find_position(
+                    positions,
+                    cursor_index,
+                    self._reverse,
+                )
+            else:
+                ranges = self._make_search_ranges(cursor_index, size)
+                line_index = self._find_line_index(context, ranges)
+            if line_index is not None:
+                return to_line(line_index)
         raise InvalidOperation("Pattern not found.")
 
-    def _make_lines_iterator(self) -> Iterable[tuple[LineNumber, str]]:
+    def _start_line(self, context: Context) -> LineNumber:
+        return context.cursor
+
+    def _find_exact_positions(
+        self,
+        context: Context,
+    ) -> Sequence[LineIndex] | None:
+        text = self._get_matcher(context).exact_line
+        if text is None:
+            return None
+        index = find_observer(context, ExactLineIndex)
+        if index is None:
+            return None
+        return index.positions(text)
+
+    def _make_search_ranges(
+        self,
+        cursor_index: LineIndex,
+        size: int,
+    ) -> list[tuple[LineIndex, LineIndex]]:
         if self._reverse:
-            return self._make_reverse_lines_iterator()
+            return [(0, cursor_index), (cursor_index, size)]
         else:
-            return self._make_forward_lines_iterator()
-
-    def _make_reverse_lines_iterator(self) -> Iterable[tuple[LineNumber, str]]:
-        iterator = self._make_forward_lines_iterator()
-        return reversed(list(iterator))
-
-    def _make_forward_lines_iterator(self) -> Iterable[tuple[LineNumber, str]]:
-        cursor = self._context.cursor
-        index = to_index(cursor)
-        size = len(self._context.lines)
-        return enumerate(
-            islice(cycle(self._context.lines), index, index + size),
-            cursor,
+            return [(cursor_index, size), (0, cursor_index)]
+
+    def _find_line_index(
+        self,
+        context: Context,
+        ranges: list[tuple[LineIndex, LineIndex]],
+    ) -> LineIndex | None:
+        candidates = self._find_candidates(context)
+        if candidates is not None:
+            return self._search_candidates(context, candidates, ranges)
+        if self._get_matcher(context).line_local:
+            return self._search_text(context, ranges)
+        return self._search_lines(context, ranges)
+
+    def _search_text(
+        self,
+        context: Context,
+        ranges: list[tuple[LineIndex, LineIndex]],
+    ) -> LineIndex | None:
+        for begin, end in ranges:
+            line_index = search_lines(
+                context.lines,
+                self._get_matcher(context),
+                begin,
+                end,
+                self._reverse,
+            )
+            if line_index is not None:
+                return line_index
+        return None
+
+    def _search_lines(
+        self,
+        context: Context,
+        ranges: list[tuple[LineIndex, LineIndex]],
+    ) -> LineIndex | None:
+        lines = context.lines
+        matches = self._get_matcher(context).matches
+        for begin, end in ranges:
+            indexes = range(begin, end)
+            for line_index in reversed(indexes) if self._reverse else indexes:
+                if matches(lines[line_index]):
+                    return line_index
+        return None
+
+    def _find_candidates(
+        self,
+        context: Context,
+    ) -> Sequence[LineIndex] | None:
+        index = find_observer(context, TrigramIndex)
+        literal = self._get_matcher(context).required_literal
+        if index is None or literal is None:
+            return None
+        return index.candidate_positions(literal)
+
+    def _search_candidates(
+        self,
+        context: Context,
+        candidates: Sequence[LineIndex],
+        ranges: list[tuple[LineIndex, LineIndex]],
+    ) -> LineIndex | None:
+        lines = context.lines
+        matches = self._get_matcher(context).matches
+        for begin, end in ranges:
+            first = bisect_left(candidates, begin)
+            last = bisect_left(candidates, end, first)
+            positions = range(first, last)
+            for position in reversed(positions) if self._reverse else positions:
+                line_index = candidates[position]
+                if matches(lines[line_index]):
+                    return line_index
+        return None
+
+    def _get_matcher(self, context: Context) -> Matcher:
+        return self._matchers.get(context.raw)
+
+    def _resolve_line(self, context: Context) -> LineNumber:
+        return self._search_line(context)
+
+
+class FindLineCommand(SearchCommand):
+    """Go to the next line that is exactly ``text``, like ``search`` would.
+
+    ``text`` is the line without its newline. With ``index_lines`` run
+    first, the line is looked up in O(log n) instead of searched.
+    """
+
+    def __init__(self, text: Text) -> None:
+        # Lines are compared with the text, so the pattern is never parsed.
+        line = to_str(text)
+        matcher: Matcher = ExactLineMatcher(line)
+        self._set_up(
+            "^" + re.escape(line) + "$",
+            PerMode(lambda raw: matcher),
+            text_type(text),
         )
 
-    def _match_pattern(self, line: str) -> bool:
-        return bool(self._pattern.search(line))
 
-    def _to_valid_line(self, line: LineNumber) -> LineNumber:
-        return to_line(to_index(line) % len(self._context.lines))
+class IndexLinesCommand:
+    def __call__(self, context: Context) -> Context:
+        if find_observer(context, ExactLineIndex) is None:
+            context.observers.append(ExactLineIndex(context.lines))
+        return context
+
 
-    def _resolve_line(self, context: Context) -> LineNumber:
-        self._context = context
-        return self._search_line()
+class IndexTrigramsCommand:
+    def __call__(self, context: Context) -> Context:
+        if find_observer(context, TrigramIndex) is None:
+            context.observers.append(TrigramIndex(context.lines))
+        return context
 
 
 class SubstituteCommand:
-    def __init__(self, search_regex: str, replace_regex: str) -> None:
-        self._search_regex = search_regex
-        self._replace_regex = replace_regex
+    def __init__(
+        self,
+        search_regex: Text,
+        replace_regex: Text,
+        literal: bool = False,
+    ) -> None:
+        self._search_regex = to_str(search_regex)
+        self._replace_regex = to_str(replace_regex)
+        self._text_type = text_type(search_regex, replace_regex)
         self._replace_times = 1
-        self._pattern = re.compile(search_regex)
+        self._matchers = make_matchers(search_regex, literal)
         self._range = make_default_line_resolver_callbacks()
-        self._context: Context
 
     def every_time(self) -> "SubstituteCommand":
         return self.times(0)
@@ -227,38 +587,192 @@ class SubstituteCommand:
         return self
 
     def __call__(self, context: Context) -> Context:
-        self._context = context
         match_found = False
-        for line_number, line_text in self._make_lines_iterator():
-            new_line, changes = self._substitute(line_text)
+        matcher = self._matchers.get(context.raw)
+        lines = self._make_lines_iterator(context, matcher)
+        for line_index, line_text in lines:
+            new_line, changes = self._substitute(matcher, line_text)
             if changes > 0:
-                line_index = to_index(line_number)
-                self._context.cursor = line_number
-                self._context.lines[line_index] = new_line
+                context.cursor = to_line(line_index)
+                replace_line(context, line_index, new_line)
                 match_found = True
 
         if match_found:
-            return self._context
+            return context
 
         raise InvalidOperation("Substitute pattern not found.")
 
-    def _make_lines_iterator(self) -> Iterable[tuple[LineNumber, str]]:
-        begin_resolver, end_resolver = self._range
-        begin = begin_resolver._resolve_line(self._context)
-        end = end_resolver._resolve_line(self._context)
-        return enumerate(
-            islice(self._context.lines, to_index(begin), end),
-            begin,
-        )
-
-    def _substitute(self, line: str) -> tuple[str, int]:
-        return self._pattern.subn(
+    def _make_lines_iterator(
+        self,
+        context: Context,
+        matcher: Matcher,
+    ) -> Iterable[tuple[LineIndex, str]]:
+        begin, end = resolve_line_range(context, self._range)
+        begin_index = to_index(begin)
+        if matcher.line_local and begin_index < end - 1:
+            return iter_matching_lines(
+                context.lines,
+                matcher,
+                begin_index,
+                end,
+            )
+        # A copy of the range, so that lines edited while it is iterated
+        # cannot shift the ones still to come.
+        return enumerate(context.lines[begin_index:end], begin_index)
+
+    def _substitute(self, matcher: Matcher, line: str) -> tuple[str, int]:
+        return matcher.subn(
             self._replace_regex,
             line,
             self._replace_times,
         )
 
 
+class GlobalCommand:
+    def __init__(
+        self,
+        input_regex: Text,
+        command: Command,
+        literal: bool = False,
+    ) -> None:
+        self._input_regex = to_str(input_regex)
+        self._matchers = make_matchers(input_regex, literal)
+        self._command = check_command(command)
+        self._text_type = common_text_type(
+            [text_type(input_regex), get_text_type(command)],
+        )
+        self._invert = False
+        self._range = make_whole_buffer_line_resolver_callbacks()
+
+    def from_range(
+        self,
+        begin: LineResolver,
+        end: LineResolver,
+    ) -> "GlobalCommand":
+        self._range = make_line_resolver_callbacks(begin, end)
+        return self
+
+    def __call__(self, context: Context) -> Context:
+        marks = self._mark_lines(context)
+        if not marks:
+            raise InvalidOperation("Pattern not found.")
+
+        if is_delete_current_line_command(self._command):
+            return self._delete_lines(context, marks)
+        return self._run_command(context, marks)
+
+    def _mark_lines(self, context: Context) -> list[LineIndex]:
+        if not context.lines:
+            return []
+
+        begin, end = resolve_line_range(context, self._range)
+        begin_index = to_index(begin)
+        matcher = self._matchers.get(context.raw)
+
+        if matcher.line_local and not self._invert:
+            matching_lines = iter_matching_lines(
+                context.lines,
+                matcher,
+                begin_index,
+                end,
+            )
+            return [line_index for line_index, _ in matching_lines]
+
+        lines = islice(context.lines, begin_index, end)
+        selectors = map(matcher.matches, lines)
+        if self._invert:
+            selectors = map(not_, selectors)
+        return list(compress(range(begin_index, end), selectors))
+
+    def _delete_lines(
+        self,
+        context: Context,
+        marks: list[LineIndex],
+    ) -> Context:
+        first_mark = marks[0]
+        marked = set(marks)
+        lines_after = islice(context.lines, first_mark, None)
+        kept_lines = [
+            line
+            for line_index, line in enumerate(lines_after, first_mark)
+            if line_index not in marked
+        ]
+        size = len(context.lines)
+        replace_lines(context, first_mark, size, kept_lines)
+        context.cursor = to_line(marks[-1] - len(marks) + 1)
+        return context
+
+    def _run_command(
+        self,
+        context: Context,
+        marks: list[LineIndex],
+    ) -> Context:
+        line_marks = LineMarks(marks)
+        context.observers.append(line_marks)
+        try:
+            while (line_index := line_marks.pop()) is not None:
+                context.cursor = to_line(line_index)
+                context = self._command(context)
+        finally:
+            context.observers.remove(line_marks)
+        return context
+
+
+class VGlobalCommand(GlobalCommand):
+    def __init__(
+        self,
+        input_regex: Text,
+        command: Command,
+        literal: bool = False,
+    ) -> None:
+        super().__init__(input_regex, command, literal)
+        self._invert = True
+
+
+class LineMarks:
+    """The lines a global command has yet to run on, kept current by edits.
+
+    Marks are sorted and read from the front, and an offset is added to
+    all of the pending ones, so an edit before them or at the front of
+    them costs a bisection, and only an edit among them moves the marks
+    after it one by one.
+    """
+
+    def __init__(self, indexes: Iterable[LineIndex]) -> None:
+        self._marks = list(indexes)
+        self._next = 0
+        self._offset = 0
+
+    def pop(self) -> LineIndex | None:
+        """Return the next pending mark and remove it, or ``None``."""
+        if self._next == len(self._marks):
+            return None
+        self._next += 1
+        return self._marks[self._next - 1] + self._offset
+
+    def lines_replaced(
+        self,
+        index: LineIndex,
+        old_lines: Sequence[str],
+        new_lines: Sequence[str],
+    ) -> None:
+        if len(old_lines) == len(new_lines):
+            return
+
+        marks = self._marks
+        end = index - self._offset + len(old_lines)
+        delta = len(new_lines) - len(old_lines)
+        first = bisect_left(marks, index - self._offset, self._next)
+        after = bisect_left(marks, end, first)
+        if first == self._next:
+            self._next = after
+            self._offset += delta
+        else:
+            marks[first:] = [
+                mark + delta for mark in islice(marks, after, None)
+            ]
+
+
 def make_default_line_resolver_callbacks() -> tuple[
     LineResolverCallback,
     LineResolverCallback,
@@ -266,23 +780,165 @@ def make_default_line_resolver_callbacks() -> tuple[
     return MoveCommand(0), MoveCommand(0)
 
 
+def make_whole_buffer_line_resolver_callbacks() -> tuple[
+    LineResolverCallback,
+    LineResolverCallback,
+]:
+    return GoToFirstLineCommand(), GoToLastLineCommand()
+
+
+def is_current_line_range(
+    line_range: tuple[LineResolverCallback, LineResolverCallback],
+) -> bool:
+    return all(
+        isinstance(resolver, MoveCommand) and resolver.offset == 0
+        for resolver in line_range
+    )
+
+
+def is_delete_current_line_command(command: Command) -> bool:
+    return isinstance(command, DeleteCommand) and is_current_line_range(
+        command._range,
+    )
+
+
 def make_line_resolver_callbacks(
     begin: LineResolver,
     end: LineResolver,
 ) -> tuple[LineResolverCallback, LineResolverCallback]:
-    if isinstance(begin, LineNumber):
-        begin = GoToCommand(begin)
-    if isinstance(end, LineNumber):
-        end = GoToCommand(end)
+    return make_line_resolver_callback(begin), make_line_resolver_callback(end)
+
+
+def make_line_resolver_callback(line: LineResolver) -> LineResolverCallback:
+    if isinstance(line, LineNumber):
+        return GoToCommand(line)
+    if isinstance(line, type) or not hasattr(line, "_resolve_line"):
+        raise TypeError(f"{line!r} is not a line number or an address.")
+    return line
+
+
+def check_command(command: Command) -> Command:
+    """Return ``command``, or raise ``TypeError`` if it cannot be run.
+
+    Command types are callable too, so passing ``delete`` instead of
+    ``delete()`` is caught here rather than when the program runs.
+    """
+    if isinstance(command, type):
+        raise TypeError(f"{command.__name__} must be called to be a command.")
+    if not callable(command):
+        raise TypeError(f"{command!r} is not a command.")
+    return command
+
+
+def get_text_type(command: Command) -> TextType | None:
+    """Return whether the non-ASCII text of ``command`` is str or bytes."""
+    return getattr(command, "_text_type", None)
+
+
+def resolve_transfer(
+    context: Context,
+    line_range: tuple[LineResolverCallback, LineResolverCallback],
+    destination: LineResolverCallback,
+) -> tuple[LineNumber, LineNumber, LineNumber]:
+    """Resolve the lines to copy or move and the line to put them after."""
+    if not context.lines:
+        raise InvalidOperation("Cannot transfer lines of an empty buffer.")
+
+    begin, end = resolve_line_range(context, line_range)
+    line = destination._resolve_line(context)
+    if not 0 <= line <= len(context.lines):
+        raise InvalidOperation("The requested line does not exist.")
+    return begin, end, line
+
+
+def resolve_line_range(
+    context: Context,
+    line_range: tuple[LineResolverCallback, LineResolverCallback],
+) -> tuple[LineNumber, LineNumber]:
+    begin, end = resolve_lines(context, line_range)
+    if begin > end:
+        raise InvalidOperation("The end range comes before begin.")
+
+    raise_for_line_number(begin, context)
+    raise_for_line_number(end, context)
+    return begin, end
+
+
+def resolve_lines(
+    context: Context,
+    line_range: tuple[LineResolverCallback, LineResolverCallback],
+) -> tuple[LineNumber, LineNumber]:
+    """Resolve both ends of ``line_range`` without checking them."""
+    begin_resolver, end_resolver = line_range
+    begin = begin_resolver._resolve_line(context)
+    end = end_resolver._resolve_line(context)
+    if context.range_resolved is not None:
+        context.range_resolved(begin, end)
     return begin, end
 
 
+def replace_lines(
+    context: Context,
+    begin: LineIndex,
+    end: LineIndex,
+    new_lines: Sequence[str],
+) -> None:
+    if not context.observers:
+        context.lines[begin:end] = new_lines
+        return
+
+    old_lines = context.lines[begin:end]
+    context.lines[begin:end] = new_lines
+    for observer in context.observers:
+        observer.lines_replaced(begin, old_lines, new_lines)
+
+
+def replace_line(context: Context, index: LineIndex, new_line: str) -> None:
+    if not context.observers:
+        context.lines[index] = new_line
+        return
+
+    old_line = context.lines[index]
+    context.lines[index] = new_line
+    for observer in context.observers:
+        observer.lines_replaced(index, [old_line], [new_line])
+
+
+def find_observer(context: Context, observer_type: type[T]) -> T | None:
+    for observer in context.observers:
+        if isinstance(observer, observer_type):
+            return observer
+    return None
+
+
 def raise_for_line_number(line: LineNumber, context: Context) -> None:
     if 1 <= line <= len(context.lines):
         return
     raise InvalidOperation("The requested line does not exist.")
 
 
+def find_position(
+    positions: Sequence[LineIndex],
+    cursor_index: LineIndex,
+    reverse: bool,
+) -> LineIndex | None:
+    """Pick the index ``search`` would reach first among sorted ``positions``.
+
+    Searches start at the cursor line and wrap around, and reverse ones
+    start at the line before it.
+    """
+    if not positions:
+        return None
+    following = bisect_left(positions, cursor_index)
+    if not reverse:
+        return positions[following % len(positions)]
+    return positions[following - 1]
+
+
+def clamp_index(index: LineIndex, context: Context) -> LineIndex:
+    return min(max(index, 0), len(context.lines))
+
+
 def split_lines_at_cursor(
     lines: list[str],
     cursor: LineNumber,
@@ -295,6 +951,31 @@ def split_lines(input_string: str) -> list[str]:
     return [line + "\n" for line in input_string.splitlines()]
 
 
+def split_input(input_string: Text) -> Sequence[str]:
+    """Split ``input_string`` like ``split_lines``, lazily if it is large.
+
+    Large inputs stay as one ``TextLines`` block unless they hold a line
+    boundary other than ``"\\n"``, which only ``str.splitlines`` handles.
+    Raw inputs are split like ``bytes.splitlines``.
+    """
+    if isinstance(input_string, bytes):
+        return split_raw_input(input_string)
+    if len(input_string) < TEXT_BLOCK_SIZE:
+        return split_lines(input_string)
+    if any(map(input_string.__contains__, OTHER_LINE_BOUNDARIES)):
+        return split_lines(input_string)
+    return TextLines(input_string)
+
+
+def split_raw_input(data: bytes) -> Sequence[str]:
+    if b"\r" in data:
+        return [to_str(line) + "\n" for line in data.splitlines()]
+    text = to_str(data)
+    if len(text) < TEXT_BLOCK_SIZE:
+        return split_text(text)
+    return TextLines(text)
+
+
 def to_line(index: LineIndex) -> LineNumber:
     return index + 1
 
@@ -0,0 +1,280 @@
+from bisect import bisect_right
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+
+from .commands import LineIndex
+
+DIFF_CONTEXT = 3
+
+
+@dataclass
+class Hunk:
+    """Lines of the original buffer replaced by new lines.
+
+    ``begin`` is the index of the first replaced line in the original
+    buffer.
+    """
+
+    begin: LineIndex
+    old_lines: list[str] = field(default_factory=list)
+    new_lines: list[str] = field(default_factory=list)
+
+    @property
+    def end(self) -> LineIndex:
+        return self.begin + len(self.old_lines)
+
+
+class EditRecorder:
+    """Collect the edits made to a buffer as hunks of the original buffer.
+
+    Edits that overlap or touch a hunk are merged into it, so the recorder
+    holds one hunk per changed region however many commands touched it.
+    """
+
+    def __init__(self) -> None:
+        self._hunks: list[Hunk] = []
+        self._starts: list[LineIndex] = []
+
+    def lines_replaced(
+        self,
+        index: LineIndex,
+        old_lines: Sequence[str],
+        new_lines: Sequence[str],
+    ) -> None:
+        end = index + len(old_lines)
+        last = bisect_right(self._starts, end)
+        first = last
+        while first > 0 and self._current_end(first - 1) >= index:
+            first -= 1
+
+        if last - first == 1 and self._starts[first] <= index:
+            if end <= self._current_end(first):
+                offset = index - self._starts[first]
+                offset_end = offset + len(old_lines)
+                self._hunks[first].new_lines[offset:offset_end] = new_lines
+                self._shift_after(first, len(new_lines) - len(old_lines))
+                return
+
+        merged, start = self._merge(first, last, index, old_lines, new_lines)
+        self._hunks[first:last] = [merged]
+        self._starts[first:last] = [start]
+        self._shift_after(first, len(new_lines) - len(old_lines))
+
+    def hunks(self) -> list[Hunk]:
+        """Return the recorded hunks, without the lines that did not change."""
+        return [hunk for merged in self._hunks for hunk in split_hunk(merged)]
+
+    def _merge(
+        self,
+        first: int,
+        last: int,
+        index: LineIndex,
+        old_lines: Sequence[str],
+        new_lines: Sequence[str],
+    ) -> tuple[Hunk, LineIndex]:
+        touched = self._hunks[first:last]
+        starts = self._starts[first:last]
+        start = min(index, starts[0]) if starts else index
+        delta = 0
+        if first > 0:
+            previous = self._hunks[first - 1]
+            delta = self._current_end(first - 1) - previous.end
+
+        merged = Hunk(start - delta)
+        # Positions relative to ``index``, where ``old_lines`` start.
+        gap_begin = start - index
+        for hunk, hunk_start in zip(touched, starts):
+            gap_end = hunk_start - index
+            merged.old_lines.extend(old_lines[gap_begin:gap_end])
+            merged.old_lines.extend(hunk.old_lines)
+            gap_begin = gap_end + len(hunk.new_lines)
+        merged.old_lines.extend(old_lines[gap_begin:])
+
+        if touched and starts[0] < index:
+            merged.new_lines.extend(touched[0].new_lines[: index - start])
+        merged.new_lines.extend(new_lines)
+        if gap_begin > len(old_lines):
+            kept = len(old_lines) + index - starts[-1]
+            merged.new_lines.extend(touched[-1].new_lines[kept:])
+        return merged, start
+
+    def _current_end(self, position: int) -> LineIndex:
+        return self._starts[position] + len(self._hunks[position].new_lines)
+
+    def _shift_after(self, position: int, shift: int) -> None:
+        if shift:
+            starts = self._starts
+            for following in range(position + 1, len(starts)):
+                starts[following] += shift
+
+
+def split_hunk(hunk: Hunk) -> Iterator[Hunk]:
+    """Yield the parts of ``hunk`` where its old and new lines differ.
+
+    Equal leading and trailing lines are dropped. When one side only
+    deletes or only inserts lines, the hunk is split into one hunk per run
+    of deleted or inserted lines.
+    """
+    old_lines, new_lines = hunk.old_lines, hunk.new_lines
+    prefix = 0
+    limit = min(len(old_lines), len(new_lines))
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    limit -= prefix
+    while (
+        suffix < limit
+        and old_lines[len(old_lines) - suffix - 1]
+        == new_lines[len(new_lines) - suffix - 1]
+    ):
+        suffix += 1
+
+    old_end, new_end = len(old_lines) - suffix, len(new_lines) - suffix
+    old_lines = old_lines[prefix:old_end]
+    new_lines = new_lines[prefix:new_end]
+    begin = hunk.begin + prefix
+    if not old_lines and not new_lines:
+        return
+
+    if len(new_lines) < len(old_lines):
+        runs = _find_runs(old_lines, new_lines)
+        if runs is not None:
+            for run_begin, run_end in runs:
+                yield Hunk(begin + run_begin, old_lines[run_begin:run_end])
+            return
+    elif len(old_lines) < len(new_lines):
+        runs = _find_runs(new_lines, old_lines)
+        if runs is not None:
+            shift = 0
+            for run_begin, run_end in runs:
+                inserted = new_lines[run_begin:run_end]
+                yield Hunk(begin + run_begin - shift, [], inserted)
+                shift += run_end - run_begin
+            return
+
+    yield Hunk(begin, old_lines, new_lines)
+
+
+def _find_runs(
+    longer: list[str],
+    shorter: list[str],
+) -> list[tuple[int, int]] | None:
+    """Return the runs of ``longer`` left after matching ``shorter`` in it.
+
+    ``None`` means ``shorter`` is not a subsequence of ``longer``.
+    """
+    runs: list[tuple[int, int]] = []
+    position = 0
+    for line in shorter:
+        run_begin = position
+        while position < len(longer) and longer[position] != line:
+            position += 1
+        if position == len(longer):
+            return None
+        if position > run_begin:
+            runs.append((run_begin, position))
+        position += 1
+    if position < len(longer):
+        runs.append((position, len(longer)))
+    return runs
+
+
+@dataclass(frozen=True)
+class Edits:
+    """The hunks that turn the original buffer into ``lines``."""
+
+    hunks: list[Hunk]
+    lines: Sequence[str]
+
+    def unified_diff(
+        self,
+        fromfile: str = "a",
+        tofile: str = "b",
+        n: int = DIFF_CONTEXT,
+    ) -> str:
+        return "".join(
+            iter_unified_diff(self.hunks, self.lines, fromfile, tofile, n),
+        )
+
+
+def iter_unified_diff(
+    hunks: Sequence[Hunk],
+    lines: Sequence[str],
+    fromfile: str = "a",
+    tofile: str = "b",
+    n: int = DIFF_CONTEXT,
+) -> Iterator[str]:
+    """Yield a unified diff of ``hunks`` with ``n`` lines of context.
+
+    The context is read from ``lines``, the buffer after the edits.
+    """
+    if not hunks:
+        return
+    yield f"--- {fromfile}\n"
+    yield f"+++ {tofile}\n"
+
+    new_starts = []
+    delta = 0
+    for hunk in hunks:
+        new_starts.append(hunk.begin + delta)
+        delta += len(hunk.new_lines) - len(hunk.old_lines)
+
+    group_begin = 0
+    for position in range(1, len(hunks) + 1):
+        if position < len(hunks):
+            previous = hunks[position - 1]
+            gap = hunks[position].begin - previous.end
+            if gap <= 2 * n:
+                continue
+        yield from _format_group(
+            hunks[group_begin:position],
+            new_starts[group_begin:position],
+            lines,
+            n,
+        )
+        group_begin = position
+
+
+def _format_group(
+    hunks: Sequence[Hunk],
+    new_starts: Sequence[LineIndex],
+    lines: Sequence[str],
+    n: int,
+) -> Iterator[str]:
+    first_new = new_starts[0]
+    context_begin = max(first_new - n, 0)
+    last_new_end = new_starts[-1] + len(hunks[-1].new_lines)
+    context_end = min(last_new_end + n, len(lines))
+
+    body = []
+    old_length = new_length = 0
+    cursor = context_begin
+    for hunk, new_start in zip(hunks, new_starts):
+        for line in lines[cursor:new_start]:
+            body.append(" " + line)
+        old_length += new_start - cursor
+        new_length += new_start - cursor
+        body.extend("-" + line for line in hunk.old_lines)
+        body.extend("+" + line for line in hunk.new_lines)
+        old_length += len(hunk.old_lines)
+        new_length += len(hunk.new_lines)
+        cursor = new_start + len(hunk.new_lines)
+    for line in lines[cursor:context_end]:
+        body.append(" " + line)
+    old_length += context_end - cursor
+    new_length += context_end - cursor
+
+    old_begin = hunks[0].begin - (first_new - context_begin)
+    old_range = _format_range(old_begin, old_length)
+    new_range = _format_range(context_begin, new_length)
+    yield f"@@ -{old_range} +{new_range} @@\n"
+    yield from body
+
+
+def _format_range(begin: LineIndex, length: int) -> str:
+    line = begin + 1
+    if length == 1:
+        return str(line)
+    if length == 0:
+        line -= 1
+    return f"{line},{length}"
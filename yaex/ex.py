@@ -0,0 +1,412 @@
+import re
+from collections.abc import Callable
+from functools import lru_cache, partial
+
+from .commands import (
+    AppendCommand,
+    Command,
+    Context,
+    CopyLinesCommand,
+    DeleteCommand,
+    GlobalCommand,
+    GoToCommand,
+    GoToLastLineCommand,
+    InsertCommand,
+    InvalidOperation,
+    LineNumber,
+    LineOffset,
+    LineResolverCallback,
+    MoveCommand,
+    MoveLinesCommand,
+    SearchCommand,
+    SubstituteCommand,
+    VGlobalCommand,
+    raise_for_line_number,
+)
+from .program import BufferType, Program, compile
+
+SCRIPT_CACHE_SIZE = 256
+SEPARATORS = "\n|"
+COMMAND_ALIASES = {"co": "t", "mo": "m"}
+NUMBER = re.compile(r"[0-9]+")
+EX_REPLACEMENT = re.compile(r"\\(.)|&", re.DOTALL)
+
+
+class OffsetCommand:
+    """Go to the line ``offset`` lines away from the one ``base`` resolves."""
+
+    def __init__(self, base: LineResolverCallback, offset: LineOffset) -> None:
+        self.base = base
+        self.offset = offset
+
+    def __call__(self, context: Context) -> Context:
+        line = self._resolve_line(context)
+        raise_for_line_number(line, context)
+        context.cursor = line
+        return context
+
+    def _resolve_line(self, context: Context) -> LineNumber:
+        return self.base._resolve_line(context) + self.offset
+
+
+class ExSearchCommand(SearchCommand):
+    """Search like an ex address, never starting on the current line.
+
+    ``/re/`` looks from the next line on and ``?re?`` from the previous
+    one, wrapping around, so the current line is tried last.
+    """
+
+    def _start_line(self, context: Context) -> LineNumber:
+        if self._reverse:
+            return context.cursor
+        return context.cursor + 1
+
+
+Address = (
+    GoToCommand
+    | GoToLastLineCommand
+    | MoveCommand
+    | SearchCommand
+    | OffsetCommand
+)
+# Parsed scripts are kept as builders, so every caller gets new commands.
+Build = Callable[[], Command]
+BuildAddress = Callable[[], Address]
+BuildRange = tuple[BuildAddress, BuildAddress]
+TransferCommand = CopyLinesCommand | MoveLinesCommand
+RangeCommand = (
+    DeleteCommand | SubstituteCommand | GlobalCommand | TransferCommand
+)
+
+
+def parse_script(script: str) -> tuple[Command, ...]:
+    """Translate an ex script into commands.
+
+    Commands are separated by newlines or ``|`` and take the usual ex
+    addresses: numbers, ``.``, ``$``, ``/re/``, ``?re?``, ``+n``/``-n``
+    offsets and ``%``. The supported commands are ``d``, ``s``, ``g``,
+    ``v``, ``a``, ``i``, ``t`` (or ``co``) and ``m`` (or ``mo``), and a
+    bare address moves the cursor. Patterns use Python regex syntax, and
+    ``/re/`` and ``?re?`` start searching on the next and previous line
+    like in ex. ``|`` cannot delimit a pattern and, as in ex, ends a
+    replacement unless escaped as ``\\|``.
+
+    Parsing is cached, so running the same text again skips it, but the
+    commands are new on every call and can be changed freely.
+    """
+    return tuple(build() for build in _parse_script(script))
+
+
+@lru_cache(maxsize=SCRIPT_CACHE_SIZE)
+def _parse_script(script: str) -> tuple[Build, ...]:
+    return tuple(_Parser(script).parse())
+
+
+def compile_script(script: str, buffer_type: BufferType = list) -> Program:
+    return compile(*parse_script(script), buffer_type=buffer_type)
+
+
+class _Parser:
+    def __init__(self, script: str) -> None:
+        self._script = script
+        self._position = 0
+
+    def parse(self) -> list[Build]:
+        commands: list[Build] = []
+        while not self._at_end():
+            if self._peek() in SEPARATORS or self._peek().isspace():
+                self._position += 1
+                continue
+            commands.extend(self._parse_command(in_global=False))
+            self._expect_separator()
+        return commands
+
+    def _parse_command(self, in_global: bool) -> list[Build]:
+        line_range = self._parse_range()
+        name = self._parse_name()
+        if name == "d":
+            return [partial(_with_range, DeleteCommand, line_range)]
+        if name == "s":
+            return [self._parse_substitute(line_range)]
+        if name in ("g", "v"):
+            if in_global:
+                raise self._error("Cannot nest global commands")
+            return [self._parse_global(name, line_range)]
+        if name in ("a", "i"):
+            return self._parse_text_command(name, line_range)
+        if name in ("t", "m"):
+            return [self._parse_transfer(name, line_range)]
+        if name:
+            raise self._error(f"Unknown command {name!r}")
+        if line_range is None:
+            raise self._error("Expected an address or a command")
+
+        _, end = line_range
+        return [end]
+
+    def _parse_name(self) -> str:
+        self._skip_blanks()
+        name = self._peek()
+        if not name or name in SEPARATORS:
+            return ""
+        self._position += 1
+        alias = COMMAND_ALIASES.get(name + self._peek())
+        if alias is not None:
+            self._position += 1
+            return alias
+        return name
+
+    def _parse_range(self) -> BuildRange | None:
+        self._skip_blanks()
+        if self._peek() == "%":
+            self._position += 1
+            return partial(GoToCommand, 1), GoToLastLineCommand
+
+        begin = self._parse_address()
+        self._skip_blanks()
+        if self._peek() != ",":
+            return None if begin is None else (begin, begin)
+
+        self._position += 1
+        end = self._parse_address()
+        current_line = partial(MoveCommand, 0)
+        return begin or current_line, end or current_line
+
+    def _parse_address(self) -> BuildAddress | None:
+        self._skip_blanks()
+        base: BuildAddress | None = None
+        char = self._peek()
+        if char.isdigit():
+            base = partial(GoToCommand, self._parse_number())
+        elif char == ".":
+            self._position += 1
+            base = partial(MoveCommand, 0)
+        elif char == "$":
+            self._position += 1
+            base = GoToLastLineCommand
+        elif char in ("/", "?"):
+            self._position += 1
+            pattern = self._parse_delimited(char)
+            base = partial(_make_search, pattern, char == "?")
+
+        offset = self._parse_offsets()
+        if offset is None:
+            return base
+        return partial(_make_offset, base, offset)
+
+    def _parse_offsets(self) -> LineOffset | None:
+        offset = None
+        while self._peek() in ("+", "-"):
+            sign = 1 if self._peek() == "+" else -1
+            self._position += 1
+            count = self._parse_number() if self._peek().isdigit() else 1
+            offset = (offset or 0) + sign * count
+        return offset
+
+    def _parse_substitute(self, line_range: BuildRange | None) -> Build:
+        delimiter = self._parse_pattern_delimiter()
+        pattern = self._parse_delimited(delimiter)
+        replacement = _to_python_replacement(
+            self._parse_delimited(delimiter, allow_end=True),
+        )
+
+        every_time = False
+        while self._peek() in ("g", "i", "I"):
+            flag = self._peek()
+            self._position += 1
+            if flag == "g":
+                every_time = True
+            elif flag == "i":
+                pattern = f"(?i:{pattern})"
+
+        make_command = partial(
+            _make_substitute,
+            pattern,
+            replacement,
+            every_time,
+        )
+        return partial(_with_range, make_command, line_range)
+
+    def _parse_global(
+        self,
+        name: str,
+        line_range: BuildRange | None,
+    ) -> Build:
+        delimiter = self._parse_pattern_delimiter()
+        pattern = self._parse_delimited(delimiter)
+
+        commands = self._parse_command(in_global=True)
+        if len(commands) != 1:
+            raise self._error("Global commands take a single command")
+        global_type = GlobalCommand if name == "g" else VGlobalCommand
+        make_command = partial(_make_global, global_type, pattern, commands[0])
+        return partial(_with_range, make_command, line_range)
+
+    def _parse_transfer(
+        self,
+        name: str,
+        line_range: BuildRange | None,
+    ) -> Build:
+        destination = self._parse_address()
+        if destination is None:
+            raise self._error("Expected a destination address")
+        command_type = CopyLinesCommand if name == "t" else MoveLinesCommand
+        make_command = partial(_make_transfer, command_type, destination)
+        return partial(_with_range, make_command, line_range)
+
+    def _parse_text_command(
+        self,
+        name: str,
+        line_range: BuildRange | None,
+    ) -> list[Build]:
+        self._skip_blanks()
+        if self._peek() != "\n":
+            raise self._error(f"Expected the text of {name!r} on next lines")
+        self._position += 1
+
+        text_lines = []
+        while True:
+            if self._at_end():
+                raise self._error("Expected a line with a single '.'")
+            end = self._script.find("\n", self._position)
+            if end == -1:
+                end = len(self._script)
+            start, self._position = self._position, end
+            line = self._script[start:end]
+            if line == ".":
+                break
+            text_lines.append(line)
+            self._position += 1
+
+        text = "\n".join(text_lines)
+        command_type = AppendCommand if name == "a" else InsertCommand
+        command = partial(command_type, text)
+        if line_range is None:
+            return [command]
+        _, end_line = line_range
+        return [end_line, command]
+
+    def _parse_pattern_delimiter(self) -> str:
+        delimiter = self._peek()
+        if not delimiter or delimiter.isalnum() or delimiter in "\\\n |":
+            raise self._error("Expected a pattern delimiter")
+        self._position += 1
+        return delimiter
+
+    def _parse_delimited(self, delimiter: str, allow_end: bool = False) -> str:
+        # A replacement ends at ``|``, so ``\|`` stands for a bar in it.
+        escaped_end = "|" if allow_end else delimiter
+        parts = []
+        while True:
+            char = self._peek()
+            if not char or char == "\n" or allow_end and char == "|":
+                if allow_end:
+                    break
+                raise self._error(f"Expected a closing {delimiter!r}")
+            self._position += 1
+            if char == delimiter:
+                break
+            if char == "\\" and self._peek() in (delimiter, escaped_end):
+                char = self._peek()
+                self._position += 1
+            elif char == "\\" and self._peek():
+                char += self._peek()
+                self._position += 1
+            parts.append(char)
+
+        if not parts and not allow_end:
+            raise self._error("Empty patterns are not supported")
+        return "".join(parts)
+
+    def _parse_number(self) -> int:
+        match = NUMBER.match(self._script, self._position)
+        assert match is not None  # nosec
+        self._position = match.end()
+        return int(match.group())
+
+    def _expect_separator(self) -> None:
+        self._skip_blanks()
+        if not self._at_end() and self._peek() not in SEPARATORS:
+            raise self._error(f"Unexpected {self._peek()!r}")
+
+    def _skip_blanks(self) -> None:
+        while self._peek() in (" ", "\t"):
+            self._position += 1
+
+    def _peek(self) -> str:
+        if self._at_end():
+            return ""
+        return self._script[self._position]
+
+    def _at_end(self) -> bool:
+        return self._position >= len(self._script)
+
+    def _error(self, message: str) -> InvalidOperation:
+        return InvalidOperation(f"{message} at column {self._position + 1}.")
+
+
+def _make_search(pattern: str, reverse: bool) -> SearchCommand:
+    search = ExSearchCommand(pattern)
+    return search.in_reverse() if reverse else search
+
+
+def _make_offset(base: BuildAddress | None, offset: LineOffset) -> Address:
+    if base is None:
+        return MoveCommand(offset)
+    address = base()
+    if isinstance(address, GoToCommand):
+        return GoToCommand(address.line + offset)
+    if isinstance(address, MoveCommand):
+        return MoveCommand(address.offset + offset)
+    return OffsetCommand(address, offset)
+
+
+def _make_substitute(
+    pattern: str,
+    replacement: str,
+    every_time: bool,
+) -> SubstituteCommand:
+    command = SubstituteCommand(pattern, replacement)
+    if every_time:
+        command.every_time()
+    return command
+
+
+def _make_global(
+    global_type: type[GlobalCommand],
+    pattern: str,
+    make_command: Build,
+) -> GlobalCommand:
+    return global_type(pattern, make_command())
+
+
+def _make_transfer(
+    command_type: type[TransferCommand],
+    destination: BuildAddress,
+) -> TransferCommand:
+    return command_type(destination())
+
+
+def _with_range(
+    make_command: Callable[[], RangeCommand],
+    line_range: BuildRange | None,
+) -> Command:
+    command = make_command()
+    if line_range is not None:
+        make_begin, make_end = line_range
+        command.from_range(make_begin(), make_end())
+    return command
+
+
+def _to_python_replacement(replacement: str) -> str:
+    """Turn the ``&`` and ``\\&`` of an ex replacement into Python syntax."""
+    return EX_REPLACEMENT.sub(_translate_replacement, replacement)
+
+
+def _translate_replacement(match: re.Match[str]) -> str:
+    escaped = match.group(1)
+    if escaped is None:
+        return r"\g<0>"
+    if escaped == "&":
+        return "&"
+    return match.group()
@@ -0,0 +1,45 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from .buffer import LineBuffer, SplicedBuffer
+from .commands import Command, Context, LineNumber, split_input
+from .output import join_lines
+from .program import run_commands
+
+
+@dataclass(frozen=True)
+class FrozenContext:
+    """A cursor and lines that commands never edit in place.
+
+    ``apply`` runs the commands on a fork of the lines and returns the result
+    as a new frozen context, so every variant derived from the same base
+    shares the lines that none of its commands touched.
+    """
+
+    cursor: LineNumber
+    lines: SplicedBuffer
+
+    @classmethod
+    def from_text(cls, text: str) -> "FrozenContext":
+        lines = LineBuffer(split_input(text))
+        return cls(len(lines), lines)
+
+    @classmethod
+    def from_lines(
+        cls,
+        lines: Sequence[str],
+        cursor: LineNumber = 1,
+    ) -> "FrozenContext":
+        return cls(cursor, LineBuffer(lines))
+
+    def apply(self, *commands: Command) -> "FrozenContext":
+        lines = self.lines.fork()
+        context = run_commands(Context(self.cursor, lines), commands)
+        return FrozenContext(context.cursor, lines)
+
+    def thaw(self) -> Context:
+        return Context(self.cursor, self.lines.fork())
+
+    @property
+    def text(self) -> str:
+        return join_lines(self.lines)
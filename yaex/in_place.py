@@ -0,0 +1,84 @@
+import os
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from .commands import Command, Context, LineIndex
+from .output import join_lines
+from .piece_table import MappedLines, PieceTable, map_file
+from .program import check_text_type, run_commands
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .tracing import Tracer
+
+REWRITE_RATIO = 0.5
+
+
+class FirstEdit:
+    """Remember the lowest line index touched by any edit.
+
+    Every line before it is still the line of the original buffer.
+    """
+
+    def __init__(self) -> None:
+        self.index: LineIndex | None = None
+
+    def lines_replaced(
+        self,
+        index: LineIndex,
+        old_lines: Sequence[str],
+        new_lines: Sequence[str],
+    ) -> None:
+        if self.index is None or index < self.index:
+            self.index = index
+
+
+def edit_file(
+    path: str | os.PathLike[str],
+    *commands: Command,
+    encoding: str = "utf-8",
+    tracer: "Tracer | None" = None,
+    rewrite_ratio: float = REWRITE_RATIO,
+) -> bool:
+    """Run ``commands`` on the file at ``path`` and save the result to it.
+
+    Only the bytes from the first edited line on are written, over the old
+    ones, when they are at most ``rewrite_ratio`` of the file. Otherwise
+    the file is replaced atomically by a new one. Writing in place is not
+    atomic, so a crash in the middle of it leaves the file cut short.
+
+    Return whether the file changed.
+    """
+    check_text_type(commands, str)
+    first_edit = FirstEdit()
+    with open(path, "rb") as file, map_file(file) as data:
+        original = MappedLines(data, encoding)
+        lines = PieceTable(original)
+        context = Context(len(lines), lines, [first_edit])
+        context = run_commands(context, commands, tracer)
+        first = first_edit.index
+        if first is None:
+            return False
+
+        size = len(data)
+        if first == len(original) and size and data[size - 1] != ord("\n"):
+            # The last line gets a newline when written out.
+            first -= 1
+        offset = original.offsets[first]
+        if size - offset > size * rewrite_ratio:
+            from .batch import write_atomically
+
+            text = join_lines(context.lines)
+            if text.encode(encoding) == data[:size]:
+                return False
+            write_atomically(path, text, encoding, newline="")
+            return True
+
+        tail = "".join(context.lines[first:]).encode(encoding)
+        if tail == data[offset:size]:
+            return False
+
+    with open(path, "r+b") as output:
+        output.seek(offset)
+        output.write(tail)
+        output.truncate()
+    return True
@@ -0,0 +1,212 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from heapq import merge
+from itertools import compress, count, islice
+
+
+class TrigramIndex:
+    """Map every trigram to the distinct lines that contain it.
+
+    Lines are indexed by content and reference counted, so repeated lines
+    are indexed once and the index follows the buffer through the
+    ``lines_replaced`` notifications of its context. The indexes of the
+    lines are kept too, so candidates can be visited by line number.
+    """
+
+    def __init__(self, lines: Sequence[str] = ()) -> None:
+        self._line_counts: Counter[str] = Counter()
+        self._postings: dict[str, set[str]] = {}
+        self._line_index = ExactLineIndex(lines)
+        self._add_lines(lines)
+
+    def lines_replaced(
+        self,
+        index: int,
+        old_lines: Sequence[str],
+        new_lines: Sequence[str],
+    ) -> None:
+        self._remove_lines(old_lines)
+        self._add_lines(new_lines)
+        self._line_index.lines_replaced(index, old_lines, new_lines)
+
+    def candidates(self, literal: str) -> set[str] | None:
+        """Return the lines that may contain ``literal``.
+
+        ``None`` means the literal is too short to be looked up.
+        """
+        grams = trigrams(literal)
+        if not grams:
+            return None
+
+        postings = sorted(
+            (self._postings.get(gram, set()) for gram in grams),
+            key=len,
+        )
+        return postings[0].intersection(*postings[1:])
+
+    def candidate_positions(self, literal: str) -> list[int] | None:
+        """Return the sorted indexes of the lines that may hold ``literal``.
+
+        ``None`` means the literal is too short to be looked up.
+        """
+        lines = self.candidates(literal)
+        if lines is None:
+            return None
+        return self._line_index.lines_positions(lines)
+
+    def _add_lines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self._line_counts[line] += 1
+            if self._line_counts[line] == 1:
+                for gram in trigrams(line):
+                    self._postings.setdefault(gram, set()).add(line)
+
+    def _remove_lines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self._line_counts[line] -= 1
+            if self._line_counts[line] == 0:
+                del self._line_counts[line]
+                for gram in trigrams(line):
+                    posting = self._postings[gram]
+                    posting.discard(line)
+                    if not posting:
+                        del self._postings[gram]
+
+
+Positions = int | list[int]
+
+
+class ExactLineIndex:
+    """Map every line of a buffer to the sorted indexes of its copies.
+
+    The index is built from the buffer on its first lookup, and then
+    follows the ``lines_replaced`` notifications of its context. An edit
+    that changes the number of lines shifts the indexes of the lines after
+    it: lines found once map to their index alone, and are moved together
+    by one ``dict.update``, so only the copies of repeated lines are moved
+    one at a time.
+    """
+
+    def __init__(self, lines: Sequence[str]) -> None:
+        self._lines = lines
+        self._positions: dict[str, Positions] | None = None
+        self._repeated: set[str] = set()
+
+    def lines_replaced(
+        self,
+        index: int,
+        old_lines: Sequence[str],
+        new_lines: Sequence[str],
+    ) -> None:
+        if self._positions is None:
+            return
+
+        for line_index, line in enumerate(old_lines, index):
+            self._remove_position(line, line_index)
+        delta = len(new_lines) - len(old_lines)
+        following = index + len(new_lines)
+        if delta and following < len(self._lines):
+            self._shift_positions(following, delta)
+        for line_index, line in enumerate(new_lines, index):
+            self._add_position(line, line_index)
+
+    def positions(self, text: str) -> Sequence[int]:
+        """Return the sorted indexes of the lines that are ``text``.
+
+        Lines match with or without a newline at their end.
+        """
+        positions = self._get_positions()
+        with_newline = _as_sequence(positions.get(text + "\n"))
+        without_newline = _as_sequence(positions.get(text))
+        if not without_newline:
+            return with_newline
+        return list(merge(with_newline, without_newline))
+
+    def lines_positions(self, lines: Iterable[str]) -> list[int]:
+        """Return the sorted indexes of the lines found in ``lines``."""
+        positions = self._get_positions()
+        found: list[int] = []
+        for line in lines:
+            found.extend(_as_sequence(positions.get(line)))
+        found.sort()
+        return found
+
+    def _get_positions(self) -> dict[str, Positions]:
+        if self._positions is None:
+            self._positions = index_positions(self._lines)
+            self._repeated = {
+                line
+                for line, positions in self._positions.items()
+                if isinstance(positions, list)
+            }
+        return self._positions
+
+    def _shift_positions(self, following: int, delta: int) -> None:
+        # The lines from ``following`` on moved by ``delta``. Setting their
+        # positions again from the buffer also overwrites the lists of the
+        # repeated lines, so those are put back and shifted one by one.
+        positions = self._get_positions()
+        repeated = {line: positions[line] for line in self._repeated}
+        following_lines = islice(self._lines, following, None)
+        positions.update(zip(following_lines, count(following)))
+        positions.update(repeated)
+        end = following - delta
+        for line_positions in repeated.values():
+            assert isinstance(line_positions, list)  # nosec
+            shifted = bisect_left(line_positions, end)
+            line_positions[shifted:] = [
+                position + delta
+                for position in islice(line_positions, shifted, None)
+            ]
+
+    def _add_position(self, line: str, line_index: int) -> None:
+        positions = self._get_positions()
+        current = positions.get(line)
+        if current is None:
+            positions[line] = line_index
+        elif isinstance(current, int):
+            positions[line] = sorted((current, line_index))
+            self._repeated.add(line)
+        else:
+            insort(current, line_index)
+
+    def _remove_position(self, line: str, line_index: int) -> None:
+        positions = self._get_positions()
+        current = positions[line]
+        if isinstance(current, int):
+            del positions[line]
+            return
+
+        del current[bisect_left(current, line_index)]
+        if len(current) == 1:
+            positions[line] = current[0]
+            self._repeated.discard(line)
+
+
+def index_positions(lines: Sequence[str]) -> dict[str, Positions]:
+    positions: dict[str, Positions] = dict(zip(lines, count()))
+    if len(positions) == len(lines):
+        return positions
+
+    counts = Counter(lines)
+    repeated: dict[str, list[int]] = {
+        line: [] for line, line_count in counts.items() if line_count > 1
+    }
+    is_repeated = map(repeated.__contains__, lines)
+    for line_index, line in compress(enumerate(lines), is_repeated):
+        repeated[line].append(line_index)
+    positions.update(repeated)
+    return positions
+
+
+def _as_sequence(positions: Positions | None) -> Sequence[int]:
+    if positions is None:
+        return ()
+    if isinstance(positions, int):
+        return (positions,)
+    return positions
+
+
+def trigrams(text: str) -> set[str]:
+    return set(map("".join, zip(text, text[1:], text[2:])))
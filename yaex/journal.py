@@ -0,0 +1,94 @@
+from collections.abc import Sequence
+
+from .commands import (
+    Command,
+    Context,
+    InvalidOperation,
+    LineIndex,
+    LineNumber,
+    check_command,
+    find_observer,
+    get_text_type,
+    replace_lines,
+)
+from .program import run_commands
+from .raw import common_text_type
+
+Edit = tuple[LineIndex, Sequence[str], int]
+
+
+class Journal:
+    """Record the lines replaced in a buffer so they can be restored.
+
+    Every edit keeps only the lines it removed and the number of lines it
+    added, so checkpoints are free and rolling back costs as much as the
+    edits made since the checkpoint.
+    """
+
+    def __init__(self) -> None:
+        self._edits: list[Edit] = []
+        self._checkpoints: list[tuple[int, LineNumber]] = []
+        self._replaying = False
+
+    def lines_replaced(
+        self,
+        index: LineIndex,
+        old_lines: Sequence[str],
+        new_lines: Sequence[str],
+    ) -> None:
+        if self._checkpoints and not self._replaying:
+            self._edits.append((index, old_lines, len(new_lines)))
+
+    def checkpoint(self, context: Context) -> None:
+        self._checkpoints.append((len(self._edits), context.cursor))
+
+    def release(self) -> None:
+        """Forget the last checkpoint and keep the edits made since it."""
+        self._checkpoints.pop()
+        if not self._checkpoints:
+            self._edits.clear()
+
+    def rollback(self, context: Context) -> None:
+        """Restore the buffer and cursor saved by the last checkpoint."""
+        edit_count, cursor = self._checkpoints.pop()
+        self._replaying = True
+        try:
+            while len(self._edits) > edit_count:
+                index, old_lines, new_line_count = self._edits.pop()
+                end = index + new_line_count
+                replace_lines(context, index, end, old_lines)
+        finally:
+            self._replaying = False
+        context.cursor = cursor
+
+
+class AtomicCommand:
+    def __init__(self, *commands: Command) -> None:
+        self._commands = tuple(map(check_command, commands))
+        self._text_type = common_text_type(map(get_text_type, commands))
+        self._ignore_errors = False
+
+    def ignore_errors(self) -> "AtomicCommand":
+        self._ignore_errors = True
+        return self
+
+    def __call__(self, context: Context) -> Context:
+        journal = find_observer(context, Journal)
+        attached = journal is None
+        if journal is None:
+            journal = Journal()
+            context.observers.append(journal)
+
+        journal.checkpoint(context)
+        try:
+            context = run_commands(context, self._commands)
+        except InvalidOperation:
+            journal.rollback(context)
+            if not self._ignore_errors:
+                raise
+        else:
+            journal.release()
+        finally:
+            if attached:
+                context.observers.remove(journal)
+        return context
@@ -0,0 +1,249 @@
+import re
+from collections.abc import Callable
+from functools import cached_property, lru_cache, partial
+from typing import Generic, Protocol, TypeVar
+
+from .patterns import PatternInfo, analyze, make_multiline
+from .raw import Text, to_str
+
+REVERSE_WINDOW = 4096
+MATCHER_CACHE_SIZE = 256
+
+T = TypeVar("T")
+
+
+class Matcher(Protocol):
+    line_local: bool
+    required_literal: str | None
+    exact_line: str | None
+
+    def matches(self, line: str) -> bool:
+        ...
+
+    def find(self, text: str, pos: int, endpos: int) -> int:
+        """Return where the first match in ``text[pos:endpos]`` starts."""
+
+    def rfind(self, text: str, pos: int, endpos: int) -> int:
+        """Return where the last match in ``text[pos:endpos]`` starts."""
+
+    def subn(self, replacement: str, line: str, count: int) -> tuple[str, int]:
+        ...
+
+
+class RegexMatcher:
+    """Match a regex, skipping the text without its required literal.
+
+    Lines that do not contain the literal every match needs are rejected
+    with ``in`` before the regex runs. In joined text, only the lines
+    holding the literal are searched, which line local patterns allow.
+    """
+
+    def __init__(
+        self,
+        pattern: re.Pattern[str],
+        info: PatternInfo | None = None,
+    ) -> None:
+        if info is None:
+            info = analyze(pattern)
+        self.pattern = pattern
+        self.line_local = info.line_local
+        self.required_literal = info.required_literal
+        self.exact_line = info.exact_line
+
+    @cached_property
+    def _text_pattern(self) -> re.Pattern[str]:
+        return make_multiline(self.pattern)
+
+    def matches(self, line: str) -> bool:
+        literal = self.required_literal
+        if literal is not None and literal not in line:
+            return False
+        return self.pattern.search(line) is not None
+
+    def find(self, text: str, pos: int, endpos: int) -> int:
+        literal = self.required_literal
+        if literal is None or not self.line_local:
+            return self._find(text, pos, endpos)
+
+        offset = text.find(literal, pos, endpos)
+        while offset != -1:
+            begin, end = _line_bounds(text, offset, pos, endpos)
+            found = self._find(text, begin, end)
+            if found != -1:
+                return found
+            offset = text.find(literal, end, endpos)
+        return -1
+
+    def rfind(self, text: str, pos: int, endpos: int) -> int:
+        literal = self.required_literal
+        if literal is None or not self.line_local:
+            return self._rfind(text, pos, endpos)
+
+        offset = text.rfind(literal, pos, endpos)
+        while offset != -1:
+            begin, end = _line_bounds(text, offset, pos, endpos)
+            found = self._rfind(text, begin, end)
+            if found != -1:
+                return found
+            offset = text.rfind(literal, pos, begin)
+        return -1
+
+    def subn(self, replacement: str, line: str, count: int) -> tuple[str, int]:
+        literal = self.required_literal
+        if literal is not None and literal not in line:
+            return line, 0
+        return self.pattern.subn(replacement, line, count)
+
+    def _find(self, text: str, pos: int, endpos: int) -> int:
+        match = self._text_pattern.search(text, pos, endpos)
+        return -1 if match is None else match.start()
+
+    def _rfind(self, text: str, pos: int, endpos: int) -> int:
+        window = REVERSE_WINDOW
+        end = endpos
+        while end > pos:
+            start = max(pos, end - window)
+            found = -1
+            for match in self._text_pattern.finditer(text, start, endpos):
+                found = match.start()
+            if found != -1:
+                return found
+            end = start
+            window *= 2
+        return -1
+
+
+class LiteralMatcher:
+    def __init__(self, literal: str) -> None:
+        self.literal = literal
+        self.line_local = bool(literal) and "\n" not in literal
+        self.required_literal = literal or None
+        self.exact_line: str | None = None
+
+    @cached_property
+    def _regex(self) -> RegexMatcher:
+        return RegexMatcher(re.compile(re.escape(self.literal)))
+
+    def matches(self, line: str) -> bool:
+        return self.literal in line
+
+    def find(self, text: str, pos: int, endpos: int) -> int:
+        return text.find(self.literal, pos, endpos)
+
+    def rfind(self, text: str, pos: int, endpos: int) -> int:
+        return text.rfind(self.literal, pos, endpos)
+
+    def subn(self, replacement: str, line: str, count: int) -> tuple[str, int]:
+        if "\\" in replacement or not self.literal:
+            return self._regex.subn(replacement, line, count)
+
+        changes = line.count(self.literal)
+        if count > 0:
+            changes = min(changes, count)
+        if changes == 0:
+            return line, 0
+        return line.replace(self.literal, replacement, changes), changes
+
+
+class ExactLineMatcher:
+    """Match the lines that are ``text``, with or without a newline.
+
+    Lines are compared with ``text`` directly, so no pattern is compiled
+    unless text is searched or substituted.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.line_local = bool(text) and "\n" not in text
+        self.required_literal = text or None
+        self.exact_line: str | None = text
+        self._lines = (text + "\n", text)
+
+    @cached_property
+    def _regex(self) -> RegexMatcher:
+        return RegexMatcher(re.compile("^" + re.escape(self.text) + "$"))
+
+    def matches(self, line: str) -> bool:
+        return line in self._lines
+
+    def find(self, text: str, pos: int, endpos: int) -> int:
+        return self._regex.find(text, pos, endpos)
+
+    def rfind(self, text: str, pos: int, endpos: int) -> int:
+        return self._regex.rfind(text, pos, endpos)
+
+    def subn(self, replacement: str, line: str, count: int) -> tuple[str, int]:
+        return self._regex.subn(replacement, line, count)
+
+
+def _line_bounds(
+    text: str,
+    offset: int,
+    pos: int,
+    endpos: int,
+) -> tuple[int, int]:
+    """Return where the line around ``offset`` starts and ends in the text.
+
+    The end is past the newline, and both are kept within ``pos`` and
+    ``endpos``.
+    """
+    begin = max(text.rfind("\n", pos, offset) + 1, pos)
+    end = text.find("\n", offset, endpos)
+    return begin, endpos if end == -1 else end + 1
+
+
+@lru_cache(maxsize=MATCHER_CACHE_SIZE)
+def make_matcher(
+    input_regex: Text,
+    literal: bool = False,
+    raw: bool = False,
+) -> Matcher:
+    """Return a matcher for ``input_regex`` on decoded or on ``raw`` text.
+
+    Matchers hold no state that a search changes, so like ``re.compile``
+    the recent ones are cached and shared by the commands that use them.
+    """
+    if literal:
+        return LiteralMatcher(to_str(input_regex))
+
+    pattern = compile_pattern(input_regex, raw)
+    info = analyze(pattern)
+    if info.literal is not None:
+        return LiteralMatcher(info.literal)
+    return RegexMatcher(pattern, info)
+
+
+def make_matchers(
+    input_regex: Text, literal: bool = False
+) -> "PerMode[Matcher]":
+    raw = isinstance(input_regex, bytes)
+    return PerMode(partial(make_matcher, input_regex, literal), raw)
+
+
+def compile_pattern(input_regex: Text, raw: bool = False) -> re.Pattern[str]:
+    """Compile ``input_regex`` for decoded or for ``raw`` text.
+
+    Raw text is bytes mapped to characters, so its patterns are compiled
+    with ``re.ASCII`` to keep the classes and case folding of a bytes
+    pattern, whether they are given as ``str`` or as ``bytes``.
+    """
+    return re.compile(to_str(input_regex), re.ASCII if raw else 0)
+
+
+class PerMode(Generic[T]):
+    """A value built for decoded text, and another one for raw text.
+
+    The value for the mode its arguments are meant for is built at once,
+    so their errors are raised when the command is made, and the other
+    one on first use.
+    """
+
+    def __init__(self, build: Callable[[bool], T], raw: bool = False) -> None:
+        self._build = build
+        self._values = {raw: build(raw)}
+
+    def get(self, raw: bool) -> T:
+        value = self._values.get(raw)
+        if value is None:
+            value = self._values[raw] = self._build(raw)
+        return value
@@ -0,0 +1,343 @@
+import reprlib
+from collections.abc import Callable, Iterable, Sequence
+
+from .commands import (
+    TEXT_BLOCK_SIZE,
+    AppendCommand,
+    Command,
+    Context,
+    DeleteCommand,
+    GlobalCommand,
+    GoToCommand,
+    GoToFirstLineCommand,
+    GoToLastLineCommand,
+    InsertCommand,
+    InvalidOperation,
+    LineNumber,
+    LineOffset,
+    LineResolverCallback,
+    MoveCommand,
+    SearchCommand,
+    SubstituteCommand,
+    VGlobalCommand,
+    clamp_index,
+    replace_lines,
+    split_input,
+    to_index,
+)
+from .raw import Text, text_type
+
+LineRange = tuple[LineResolverCallback, LineResolverCallback]
+
+
+class FusedAppendCommand:
+    """Appends run back to back, done as one splice."""
+
+    def __init__(self, input_strings: Sequence[Text]) -> None:
+        self.input_strings = tuple(input_strings)
+        self._text_type = text_type(*self.input_strings)
+
+    def __call__(self, context: Context) -> Context:
+        input_lines = [
+            line
+            for input_string in self.input_strings
+            for line in split_input(input_string)
+        ]
+        pivot = clamp_index(context.cursor, context)
+        replace_lines(context, pivot, pivot, input_lines)
+        context.cursor = pivot + len(input_lines)
+        return context
+
+
+class FusedInsertCommand:
+    """Inserts run back to back, done as one splice.
+
+    Every insert goes before the last line of the one before it, so the
+    inputs must not be empty for the block to stay in one piece.
+    """
+
+    def __init__(self, input_strings: Sequence[Text]) -> None:
+        self.input_strings = tuple(input_strings)
+        self._text_type = text_type(*self.input_strings)
+
+    def __call__(self, context: Context) -> Context:
+        if not context.lines:
+            raise InvalidOperation("Cannot insert into an empty buffer")
+
+        block: list[str] = []
+        cursor = 0
+        for input_string in self.input_strings:
+            input_lines = split_input(input_string)
+            pivot = max(cursor - 1, 0)
+            block[pivot:pivot] = input_lines
+            cursor = pivot + len(input_lines)
+
+        pivot = clamp_index(to_index(context.cursor), context)
+        replace_lines(context, pivot, pivot, block)
+        context.cursor = pivot + cursor
+        return context
+
+
+def optimize(commands: Iterable[Command]) -> tuple[Command, ...]:
+    """Rewrite ``commands`` into fewer commands with the same results.
+
+    Consecutive appends and inserts are fused into one splice, adjacent
+    deletes whose ranges meet are merged, and cursor moves that cannot
+    fail and are overwritten are dropped. Moves that can fail are kept,
+    so the rewritten commands raise whenever the original ones do.
+    """
+    return tuple(command for command, _ in plan(commands))
+
+
+def plan(commands: Iterable[Command]) -> list[tuple[Command, list[Command]]]:
+    """Return the optimized commands with the commands each one replaces."""
+    steps: list[tuple[Command, list[Command]]] = []
+    for command in commands:
+        sources = [command]
+        while steps:
+            previous, previous_sources = steps[-1]
+            combined = combine(previous, command)
+            if combined is None:
+                break
+            steps.pop()
+            command = combined
+            sources = previous_sources + sources
+        steps.append((command, sources))
+    return steps
+
+
+def explain(commands: Iterable[Command]) -> str:
+    """Describe the optimized commands, one per line."""
+    descriptions = []
+    for command, sources in plan(commands):
+        description = describe(command)
+        if len(sources) > 1:
+            replaced = "; ".join(map(describe, sources))
+            description = f"{description}  # from {replaced}"
+        descriptions.append(description + "\n")
+    return "".join(descriptions)
+
+
+def combine(previous: Command, command: Command) -> Command | None:
+    """Return one command doing what ``previous`` then ``command`` do."""
+    for rule in RULES:
+        combined = rule(previous, command)
+        if combined is not None:
+            return combined
+    return None
+
+
+def drop_overwritten_move(
+    previous: Command,
+    command: Command,
+) -> Command | None:
+    if not isinstance(
+        command,
+        GoToCommand | GoToFirstLineCommand | GoToLastLineCommand,
+    ):
+        return None
+    if isinstance(previous, GoToFirstLineCommand | GoToLastLineCommand):
+        return command
+    if isinstance(previous, GoToCommand) and isinstance(command, GoToCommand):
+        # Going to a later line fails whenever the earlier one does.
+        if 1 <= previous.line <= command.line:
+            return command
+    return None
+
+
+def drop_current_line_check(
+    previous: Command,
+    command: Command,
+) -> Command | None:
+    if _is_offset(command, 0) and leaves_cursor_on_line(previous):
+        return previous
+    return None
+
+
+def fuse_appends(previous: Command, command: Command) -> Command | None:
+    if not isinstance(command, AppendCommand) or not is_small(command):
+        return None
+    if isinstance(previous, AppendCommand) and is_small(previous):
+        inputs = [previous.input_string, command.input_string]
+        return FusedAppendCommand(inputs)
+    if isinstance(previous, FusedAppendCommand):
+        return FusedAppendCommand(
+            [*previous.input_strings, command.input_string]
+        )
+    return None
+
+
+def fuse_inserts(previous: Command, command: Command) -> Command | None:
+    if not isinstance(command, InsertCommand) or not is_small(command):
+        return None
+    if not command.input_string:
+        return None
+    if isinstance(previous, InsertCommand) and is_small(previous):
+        if previous.input_string:
+            inputs = [previous.input_string, command.input_string]
+            return FusedInsertCommand(inputs)
+    if isinstance(previous, FusedInsertCommand):
+        return FusedInsertCommand(
+            [*previous.input_strings, command.input_string]
+        )
+    return None
+
+
+def merge_deletes(previous: Command, command: Command) -> Command | None:
+    """Merge two deletes when the lines they remove are contiguous.
+
+    The first range must be absolute or relative to the cursor. The second
+    must be absolute too and meet the first, or start at the line the
+    first leaves the cursor on. Both must be in order, so they can only
+    fail when the merged range is out of the buffer.
+    """
+    if not isinstance(previous, DeleteCommand):
+        return None
+    if not isinstance(command, DeleteCommand):
+        return None
+
+    (first_begin, first_end), second = previous._range, command._range
+    if isinstance(first_begin, GoToCommand):
+        if isinstance(first_end, GoToCommand):
+            return _merge_absolute_range(
+                first_begin.line, first_end.line, second
+            )
+    if isinstance(first_begin, MoveCommand):
+        if isinstance(first_end, MoveCommand):
+            return _merge_relative_range(
+                first_begin.offset, first_end.offset, second
+            )
+    return None
+
+
+RULES: tuple[Callable[[Command, Command], Command | None], ...] = (
+    drop_overwritten_move,
+    drop_current_line_check,
+    fuse_appends,
+    fuse_inserts,
+    merge_deletes,
+)
+
+
+def leaves_cursor_on_line(command: Command) -> bool:
+    """Whether ``command`` always leaves the cursor on a line when it ends."""
+    if isinstance(
+        command,
+        GoToCommand | MoveCommand | SearchCommand | SubstituteCommand,
+    ):
+        return True
+    if isinstance(command, AppendCommand | InsertCommand):
+        return bool(command.input_string)
+    if isinstance(command, FusedAppendCommand | FusedInsertCommand):
+        return any(command.input_strings)
+    return False
+
+
+def is_small(command: AppendCommand | InsertCommand) -> bool:
+    """Large inputs are spliced in whole, so fusing them would copy them."""
+    return len(command.input_string) < TEXT_BLOCK_SIZE
+
+
+def describe(command: object) -> str:
+    """Describe ``command`` the way it is built with the yaex functions."""
+    description = _describe_move(command) or _describe_edit(command)
+    return description or type(command).__name__
+
+
+def _describe_move(command: object) -> str | None:
+    if isinstance(command, GoToCommand):
+        return f"go_to({command.line})"
+    if isinstance(command, GoToFirstLineCommand):
+        return "go_to_first_line()"
+    if isinstance(command, GoToLastLineCommand):
+        return "go_to_last_line()"
+    if isinstance(command, MoveCommand):
+        return f"move({command.offset})"
+    if isinstance(command, SearchCommand):
+        description = f"search({reprlib.repr(command._input_regex)})"
+        if command._reverse:
+            description += ".in_reverse()"
+        return description
+    return None
+
+
+def _describe_edit(command: object) -> str | None:
+    if isinstance(command, SubstituteCommand):
+        search, replace = command._search_regex, command._replace_regex
+        return f"substitute({reprlib.repr(search)}, {reprlib.repr(replace)})"
+    if isinstance(command, AppendCommand | InsertCommand):
+        command = _fuse_one(command)
+    if isinstance(command, FusedAppendCommand | FusedInsertCommand):
+        name = "append" if isinstance(command, FusedAppendCommand) else "insert"
+        inputs = ", ".join(map(reprlib.repr, command.input_strings))
+        return f"{name}({inputs})"
+    if isinstance(command, DeleteCommand):
+        begin, end = command._range
+        if _is_offset(begin, 0) and _is_offset(end, 0):
+            return "delete()"
+        return f"delete().from_range({describe(begin)}, {describe(end)})"
+    if isinstance(command, GlobalCommand):
+        name = "vglobal" if isinstance(command, VGlobalCommand) else "global_"
+        pattern = reprlib.repr(command._input_regex)
+        return f"{name}({pattern}, {describe(command._command)})"
+    return None
+
+
+def _fuse_one(
+    command: AppendCommand | InsertCommand,
+) -> FusedAppendCommand | FusedInsertCommand:
+    if isinstance(command, AppendCommand):
+        return FusedAppendCommand([command.input_string])
+    return FusedInsertCommand([command.input_string])
+
+
+def _merge_absolute_range(
+    begin: LineNumber,
+    end: LineNumber,
+    second: LineRange,
+) -> Command | None:
+    if not 1 <= begin <= end:
+        return None
+    second_begin, second_end = second
+    if _is_offset(second_begin, 0) and isinstance(second_end, MoveCommand):
+        # The cursor is on the line after the deleted ones.
+        if second_end.offset < 0:
+            return None
+        merged_end = end + 1 + second_end.offset
+        return _delete(GoToCommand(begin), GoToCommand(merged_end))
+    if isinstance(second_begin, GoToCommand):
+        if isinstance(second_end, GoToCommand):
+            other_begin, other_end = second_begin.line, second_end.line
+            if other_begin > other_end:
+                return None
+            if 1 <= other_begin <= begin <= other_end + 1:
+                merged_end = other_end + end - begin + 1
+                return _delete(
+                    GoToCommand(other_begin), GoToCommand(merged_end)
+                )
+    return None
+
+
+def _merge_relative_range(
+    begin: LineOffset,
+    end: LineOffset,
+    second: LineRange,
+) -> Command | None:
+    second_begin, second_end = second
+    if begin > end or not _is_offset(second_begin, 0):
+        return None
+    if isinstance(second_end, MoveCommand) and second_end.offset >= 0:
+        merged_end = end + 1 + second_end.offset
+        return _delete(MoveCommand(begin), MoveCommand(merged_end))
+    return None
+
+
+def _is_offset(resolver: object, offset: LineOffset) -> bool:
+    return isinstance(resolver, MoveCommand) and resolver.offset == offset
+
+
+def _delete(
+    begin: LineResolverCallback,
+    end: LineResolverCallback,
+) -> DeleteCommand:
+    return DeleteCommand().from_range(begin, end)
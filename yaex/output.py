@@ -0,0 +1,87 @@
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import islice
+from typing import Protocol
+
+from .buffer import SplicedBuffer
+
+CHUNK_SIZE = 1 << 16
+IOV_MAX = 1024
+
+
+class TextStream(Protocol):
+    def write(self, text: str, /) -> object:
+        ...
+
+
+Stream = TextStream | int
+
+
+def iter_text(lines: Iterable[str]) -> Iterator[str]:
+    """Yield strings that join into ``lines``, blocks of text left whole."""
+    if isinstance(lines, SplicedBuffer):
+        return lines.iter_text()
+    return iter(lines)
+
+
+def join_lines(lines: Iterable[str]) -> str:
+    if isinstance(lines, SplicedBuffer):
+        return "".join(lines.iter_text())
+    return "".join(lines)
+
+
+def iter_chunks(
+    lines: Iterable[str],
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[str]:
+    """Join ``lines`` into strings of about ``chunk_size`` characters."""
+    batch: list[str] = []
+    size = 0
+    for line in lines:
+        batch.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(batch)
+            batch.clear()
+            size = 0
+    if batch:
+        yield "".join(batch)
+
+
+def write_lines(
+    stream: Stream,
+    lines: Iterable[str],
+    encoding: str = "utf-8",
+) -> None:
+    """Write ``lines`` to a text stream or a file descriptor.
+
+    Text streams get chunks of ``CHUNK_SIZE`` characters. File descriptors
+    get the encoded lines in groups of ``IOV_MAX`` buffers per ``writev``,
+    so the text is never joined into one copy.
+    """
+    if not isinstance(stream, int):
+        for chunk in iter_chunks(iter_text(lines)):
+            stream.write(chunk)
+        return
+
+    iterator = iter(lines)
+    while batch := list(islice(iterator, IOV_MAX)):
+        buffers = [line.encode(encoding) for line in batch]
+        write_buffers(stream, buffers)
+
+
+def write_buffers(descriptor: int, buffers: Iterable[bytes]) -> None:
+    pending = deque(memoryview(buffer) for buffer in buffers if buffer)
+    while pending:
+        written = _writev(descriptor, pending)
+        while written and written >= len(pending[0]):
+            written -= len(pending.popleft())
+        if written:
+            pending[0] = pending[0][written:]
+
+
+def _writev(descriptor: int, buffers: Sequence[memoryview]) -> int:
+    if hasattr(os, "writev"):
+        return os.writev(descriptor, buffers)
+    return os.write(descriptor, buffers[0])  # pragma: no cover
@@ -0,0 +1,211 @@
+import re
+import sys
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+if sys.version_info >= (3, 11):
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+else:  # pragma: no cover
+    import sre_parse
+
+NEWLINE = ord("\n")
+NEWLINE_CATEGORIES = {
+    sre_parse.CATEGORY_SPACE,
+    sre_parse.CATEGORY_NOT_DIGIT,
+    sre_parse.CATEGORY_NOT_WORD,
+    sre_parse.CATEGORY_LINEBREAK,
+}
+STRING_ANCHORS = {sre_parse.AT_BEGINNING_STRING, sre_parse.AT_END_STRING}
+REPEATS = {
+    sre_parse.MAX_REPEAT,
+    sre_parse.MIN_REPEAT,
+    getattr(sre_parse, "POSSESSIVE_REPEAT", sre_parse.MAX_REPEAT),
+}
+
+
+@dataclass(frozen=True)
+class PatternInfo:
+    """What the analyses below find in a pattern, from a single parse."""
+
+    line_local: bool
+    literal: str | None
+    exact_line: str | None
+    required_literal: str | None
+
+
+NOT_ANALYZED = PatternInfo(False, None, None, None)
+
+
+def analyze(pattern: re.Pattern[str]) -> PatternInfo:
+    """Parse ``pattern`` once and run every analysis on its tree."""
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except re.error:  # pragma: no cover
+        return NOT_ANALYZED
+
+    flags = pattern.flags
+    return PatternInfo(
+        line_local=_is_line_local(parsed, flags),
+        literal=_literal_text(parsed, flags),
+        exact_line=_exact_line_text(parsed, flags),
+        required_literal=_required_literal(parsed, flags),
+    )
+
+
+def is_line_local(pattern: re.Pattern[Any]) -> bool:
+    """Tell if ``pattern`` finds the same matches on joined lines.
+
+    A pattern is line local when it always consumes at least one character,
+    can never match or look at a newline and does not use ``\\A`` or ``\\Z``.
+    Such a pattern, compiled with ``re.MULTILINE``, matches the text of every
+    line of a joined buffer exactly like it matches each line on its own.
+    """
+    return analyze(pattern).line_local
+
+
+def literal_text(pattern: re.Pattern[str]) -> str | None:
+    """Return the text matched by ``pattern`` if it has no metacharacters."""
+    return analyze(pattern).literal
+
+
+def exact_line_text(pattern: re.Pattern[str]) -> str | None:
+    """Return ``text`` if ``pattern`` is ``^text$`` with a literal ``text``.
+
+    Such a pattern matches a line exactly when the line is ``text``, with
+    or without a newline at its end.
+    """
+    return analyze(pattern).exact_line
+
+
+def required_literal(pattern: re.Pattern[str]) -> str | None:
+    """Return the longest text that every match of ``pattern`` contains.
+
+    Only runs of literals that are always matched one after the other are
+    found, in the pattern itself, its groups and the repeats that match at
+    least once. Alternatives are not looked into.
+    """
+    return analyze(pattern).required_literal
+
+
+def make_multiline(pattern: re.Pattern[Any]) -> re.Pattern[Any]:
+    return re.compile(pattern.pattern, pattern.flags | re.MULTILINE)
+
+
+def _is_line_local(parsed: Any, flags: int) -> bool:
+    if parsed.getwidth()[0] == 0:
+        return False
+    return not _can_cross_lines(parsed, flags)
+
+
+def _can_cross_lines(items: Any, flags: int) -> bool:
+    return any(_item_can_cross_lines(op, av, flags) for op, av in items)
+
+
+def _item_can_cross_lines(  # noqa: C901
+    op: Any,
+    av: Any,
+    flags: int,
+) -> bool:
+    if op is sre_parse.LITERAL:
+        return bool(av == NEWLINE)
+    if op is sre_parse.NOT_LITERAL:
+        return bool(av != NEWLINE)
+    if op is sre_parse.ANY:
+        return bool(flags & re.DOTALL)
+    if op is sre_parse.IN:
+        return _set_contains_newline(av)
+    if op is sre_parse.AT:
+        return av in STRING_ANCHORS
+    if op is sre_parse.BRANCH:
+        return any(_can_cross_lines(branch, flags) for branch in av[1])
+    if op is sre_parse.SUBPATTERN:
+        _, add_flags, del_flags, items = av
+        return _can_cross_lines(items, (flags | add_flags) & ~del_flags)
+    if op in REPEATS:
+        return _can_cross_lines(av[2], flags)
+    if op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+        return _can_cross_lines(av[1], flags)
+    if op is getattr(sre_parse, "ATOMIC_GROUP", None):
+        return _can_cross_lines(av, flags)
+    if op is sre_parse.GROUPREF:
+        return False
+    if op is sre_parse.GROUPREF_EXISTS:
+        _, yes, no = av
+        return _can_cross_lines(yes, flags) or (
+            no is not None and _can_cross_lines(no, flags)
+        )
+    return True
+
+
+def _set_contains_newline(items: Any) -> bool:
+    negate = False
+    contains = False
+    for op, av in items:
+        if op is sre_parse.NEGATE:
+            negate = True
+        elif op is sre_parse.LITERAL:
+            contains = contains or av == NEWLINE
+        elif op is sre_parse.RANGE:
+            contains = contains or av[0] <= NEWLINE <= av[1]
+        elif op is sre_parse.CATEGORY:
+            contains = contains or av in NEWLINE_CATEGORIES
+        else:
+            return True
+    return contains != negate
+
+
+def _literal_text(parsed: Any, flags: int) -> str | None:
+    if flags & re.IGNORECASE:
+        return None
+    if not all(op is sre_parse.LITERAL for op, _ in parsed):
+        return None
+    return "".join(chr(av) for _, av in parsed)
+
+
+def _exact_line_text(parsed: Any, flags: int) -> str | None:
+    if flags & (re.IGNORECASE | re.MULTILINE):
+        return None
+    items = list(parsed)
+    if len(items) < 2:
+        return None
+    if items[0] != (sre_parse.AT, sre_parse.AT_BEGINNING):
+        return None
+    if items[-1] != (sre_parse.AT, sre_parse.AT_END):
+        return None
+    inner = items[1:-1]
+    if not all(op is sre_parse.LITERAL for op, _ in inner):
+        return None
+    return "".join(chr(av) for _, av in inner)
+
+
+def _required_literal(parsed: Any, flags: int) -> str | None:
+    if flags & re.IGNORECASE:
+        return None
+    return max(_iter_required_literals(parsed), key=len, default=None)
+
+
+def _iter_required_literals(items: Any) -> Iterator[str]:
+    run: list[str] = []
+    for op, av in _flatten_groups(items):
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+        elif op is not sre_parse.AT:
+            # Anchors match no text, so the literals around them still meet.
+            if run:
+                yield "".join(run)
+                run = []
+            if op in REPEATS and av[0] >= 1:
+                yield from _iter_required_literals(av[2])
+    if run:
+        yield "".join(run)
+
+
+def _flatten_groups(items: Any) -> Iterator[tuple[Any, Any]]:
+    for op, av in items:
+        if op is sre_parse.SUBPATTERN and not av[1] & re.IGNORECASE:
+            yield from _flatten_groups(av[3])
+        elif op is getattr(sre_parse, "ATOMIC_GROUP", None):
+            yield from _flatten_groups(av)
+        else:
+            yield op, av
@@ -0,0 +1,322 @@
+import os
+from abc import abstractmethod
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from itertools import accumulate, chain, islice, repeat
+from mmap import ACCESS_READ, mmap
+from operator import add
+from typing import BinaryIO, overload
+
+from .buffer import SplicedBuffer
+
+INDEX_BLOCK_SIZE = 1 << 20
+DECODE_BLOCK_LINES = 1024
+
+
+class IndexedLines(Sequence[str]):
+    """Lines split out of one block of text only when they are accessed.
+
+    ``offsets`` holds where every line starts in the block plus its end and
+    is built on first use. A last line without a trailing newline gets one
+    when split.
+    """
+
+    _offsets: "array[int] | None" = None
+
+    @abstractmethod
+    def _index(self) -> "array[int]":
+        ...
+
+    @abstractmethod
+    def _raw_text(self, begin: int, end: int) -> str:
+        """Return the text of the lines in ``[begin, end)`` as stored."""
+
+    @property
+    def offsets(self) -> "array[int]":
+        if self._offsets is None:
+            self._offsets = self._index()
+        return self._offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            begin, end, step = index.indices(len(self))
+            if step != 1:
+                return list(self)[index]
+            return list(self.iter_range(begin, end))
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"{type(self).__name__} index out of range")
+        return self.split_range(index, index + 1)[0]
+
+    def __iter__(self) -> Iterator[str]:
+        return self.iter_range(0, len(self))
+
+    def iter_range(self, begin: int, end: int) -> Iterator[str]:
+        return chain.from_iterable(
+            self.split_range(block, block_end)
+            for block, block_end in _iter_blocks(begin, end)
+        )
+
+    def iter_text(self, begin: int, end: int) -> Iterator[str]:
+        """Yield the text of the lines in ``[begin, end)`` in large blocks."""
+        for block, block_end in _iter_blocks(begin, end):
+            text = self._raw_text(block, block_end)
+            yield text
+            if text and not text.endswith("\n"):
+                yield "\n"
+
+    def split_range(self, begin: int, end: int) -> list[str]:
+        if begin >= end:
+            return []
+        return split_text(self._raw_text(begin, end))
+
+
+class MappedLines(IndexedLines):
+    """The lines of a bytes-like object, decoded only when accessed.
+
+    Lines are split on ``b"\\n"``, so the encoding must be ASCII compatible.
+    """
+
+    def __init__(
+        self,
+        data: bytes | mmap,
+        encoding: str = "utf-8",
+    ) -> None:
+        self.data = data
+        self.encoding = encoding
+
+    def _index(self) -> "array[int]":
+        return index_lines(self.data)
+
+    def _raw_text(self, begin: int, end: int) -> str:
+        start, stop = self.offsets[begin], self.offsets[end]
+        return self.data[start:stop].decode(self.encoding)
+
+
+class TextLines(IndexedLines):
+    """The lines of one string, kept as a single block until accessed.
+
+    Its length comes from counting newlines, so a block that is only
+    inserted whole and written back out is never indexed.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self._size = text.count("\n")
+        if text and not text.endswith("\n"):
+            self._size += 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        if self._offsets is None:
+            return iter(split_text(self.text))
+        return super().__iter__()
+
+    def _index(self) -> "array[int]":
+        return index_lines(self.text)
+
+    def _raw_text(self, begin: int, end: int) -> str:
+        start, stop = self.offsets[begin], self.offsets[end]
+        return self.text[start:stop]
+
+    def iter_text(self, begin: int, end: int) -> Iterator[str]:
+        if begin > 0 or end < len(self):
+            return super().iter_text(begin, end)
+        if not self.text or self.text.endswith("\n"):
+            return iter((self.text,))
+        return iter((self.text, "\n"))
+
+
+class InsertedLines(list[str]):
+    """Lines inserted into a ``PieceTable``, owned by the pieces over them."""
+
+
+Piece = tuple[Sequence[str], int, int]
+
+
+class PieceTable(SplicedBuffer):
+    """A line store that records edits as pieces over its original lines.
+
+    The table starts as one piece covering ``original``; every splice only
+    rearranges pieces and keeps the inserted lines in a new piece, so lines
+    of the original that are never looked at are never copied.
+    """
+
+    def __init__(self, original: Sequence[str] = ()) -> None:
+        self._pieces: list[Piece] = []
+        self._starts: list[int] | None = None
+        self._size = len(original)
+        if original:
+            self._pieces.append((original, 0, len(original)))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        # The pieces are copied, so editing the lines already read while
+        # iterating does not move the ones still to come.
+        return chain.from_iterable(map(_iter_piece, self._pieces.copy()))
+
+    def splice(self, begin: int, end: int, lines: Iterable[str]) -> None:
+        new_lines: Sequence[str]
+        if isinstance(lines, IndexedLines):
+            new_lines = lines
+        else:
+            new_lines = InsertedLines(lines)
+        begin_piece = self._split_at(begin)
+        end_piece = self._split_at(end)
+        new_pieces: list[Piece] = []
+        if new_lines and not self._extend_piece(begin_piece, new_lines):
+            new_pieces.append((new_lines, 0, len(new_lines)))
+        self._pieces[begin_piece:end_piece] = new_pieces
+
+        shift = len(new_lines) - (end - begin)
+        self._size += shift
+        starts = self._get_starts()
+        following_starts = starts[end_piece:]
+        if shift:
+            following_starts = [start + shift for start in following_starts]
+        starts[begin_piece:] = [begin] * len(new_pieces) + following_starts
+
+    def fork(self) -> "PieceTable":
+        forked = PieceTable()
+        forked._pieces = self._pieces.copy()
+        forked._starts = None if self._starts is None else self._starts.copy()
+        forked._size = self._size
+        return forked
+
+    def iter_text(self) -> Iterator[str]:
+        for source, start, stop in self._pieces:
+            if isinstance(source, IndexedLines):
+                yield from source.iter_text(start, stop)
+            else:
+                yield from source[start:stop]
+
+    def _get_line(self, index: int) -> str:
+        piece_index, offset = self._locate(index)
+        source, start, _ = self._pieces[piece_index]
+        return source[start + offset]
+
+    def _iter_from(self, index: int) -> Iterator[str]:
+        if index >= self._size:
+            return iter(())
+        piece_index, offset = self._locate(index)
+        source, start, stop = self._pieces[piece_index]
+        following_piece = piece_index + 1
+        first = _iter_piece((source, start + offset, stop))
+        rest = map(_iter_piece, self._pieces[following_piece:])
+        return chain(first, chain.from_iterable(rest))
+
+    def _split_at(self, index: int) -> int:
+        """Make a piece start at ``index`` and return its position."""
+        if index >= self._size:
+            return len(self._pieces)
+
+        piece_index, offset = self._locate(index)
+        if offset == 0:
+            return piece_index
+
+        source, start, stop = self._pieces[piece_index]
+        middle = start + offset
+        following_piece = piece_index + 1
+        self._pieces[piece_index:following_piece] = [
+            (source, start, middle),
+            (source, middle, stop),
+        ]
+        self._get_starts().insert(following_piece, index)
+        return following_piece
+
+    def _extend_piece(self, piece_index: int, lines: Sequence[str]) -> bool:
+        """Add ``lines`` to the end of the piece before ``piece_index``.
+
+        Only the inserted lines ending with that piece are extended,
+        so lines set one after the other stay in one piece. Forks may
+        share the list, but each only reads up to the end of its pieces.
+        """
+        if piece_index == 0 or isinstance(lines, IndexedLines):
+            return False
+        previous_index = piece_index - 1
+        source, start, stop = self._pieces[previous_index]
+        if not isinstance(source, InsertedLines) or stop != len(source):
+            return False
+        source.extend(lines)
+        self._pieces[previous_index] = (source, start, stop + len(lines))
+        return True
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        starts = self._get_starts()
+        piece_index = bisect_right(starts, index) - 1
+        return piece_index, index - starts[piece_index]
+
+    def _get_starts(self) -> list[int]:
+        if self._starts is None:
+            lengths = (stop - start for _, start, stop in self._pieces)
+            self._starts = list(accumulate(lengths, initial=0))
+        return self._starts
+
+
+def _iter_piece(piece: Piece) -> Iterator[str]:
+    source, start, stop = piece
+    if isinstance(source, IndexedLines):
+        return source.iter_range(start, stop)
+    return iter(source[start:stop])
+
+
+@contextmanager
+def map_file(file: BinaryIO) -> Iterator[bytes | mmap]:
+    """Map ``file`` read-only into memory for the duration of the block."""
+    if os.fstat(file.fileno()).st_size == 0:
+        yield b""
+        return
+
+    with mmap(file.fileno(), 0, access=ACCESS_READ) as data:
+        yield data
+
+
+def split_text(text: str) -> list[str]:
+    """Split ``text`` on newlines, keeping one at the end of every line."""
+    parts = text.split("\n")
+    if not parts[-1]:
+        parts.pop()
+    return [part + "\n" for part in parts]
+
+
+def _iter_blocks(begin: int, end: int) -> Iterator[tuple[int, int]]:
+    for block in range(begin, end, DECODE_BLOCK_LINES):
+        yield block, min(block + DECODE_BLOCK_LINES, end)
+
+
+def index_lines(data: bytes | mmap | str) -> "array[int]":
+    """Return the offset of every line start plus the end of ``data``."""
+    offsets = array("Q", [0])
+    size = len(data)
+    for block_start in range(0, size, INDEX_BLOCK_SIZE):
+        block_end = block_start + INDEX_BLOCK_SIZE
+        block = data[block_start:block_end]
+        if isinstance(block, str):
+            parts: list[str] | list[bytes] = block.split("\n")
+        else:
+            parts = block.split(b"\n")
+        steps = map(add, map(len, parts[:-1]), repeat(1))
+        line_starts = accumulate(steps, initial=block_start)
+        offsets.extend(islice(line_starts, 1, None))
+    if offsets[-1] != size:
+        offsets.append(size)
+    return offsets
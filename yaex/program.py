@@ -0,0 +1,151 @@
+from collections.abc import Callable, Iterable, Iterator, MutableSequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .commands import (
+    Command,
+    Context,
+    check_command,
+    get_text_type,
+    replace_lines,
+    split_input,
+)
+from .output import Stream, join_lines, write_lines
+from .raw import Text, TextType, common_text_type, to_bytes
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .edits import Edits
+    from .tracing import Tracer
+
+BufferType = Callable[[], MutableSequence[str]]
+
+
+@dataclass(frozen=True)
+class Program:
+    """A validated sequence of commands that can run on many inputs.
+
+    Commands keep no state between runs, so a program can run again
+    while it is running, from one of its commands or another thread.
+    """
+
+    commands: tuple[Command, ...]
+    buffer_type: BufferType = list
+
+    def run(self, text: str = "", tracer: "Tracer | None" = None) -> str:
+        context = self.execute(self.load(text), tracer)
+        return join_lines(context.lines)
+
+    def run_bytes(
+        self,
+        data: bytes = b"",
+        tracer: "Tracer | None" = None,
+    ) -> bytes:
+        """Run the program on raw text, without decoding or encoding it.
+
+        Every byte is kept as one character, so ``str`` arguments of the
+        commands must only hold ASCII, or be given as ``bytes``: others
+        raise ``TypeError``.
+        """
+        context = self.execute(self.load(data), tracer)
+        return to_bytes(join_lines(context.lines))
+
+    def run_to(
+        self,
+        stream: Stream,
+        text: str = "",
+        tracer: "Tracer | None" = None,
+        encoding: str = "utf-8",
+    ) -> None:
+        """Run the program and write the result to ``stream`` in chunks."""
+        context = self.execute(self.load(text), tracer)
+        write_lines(stream, context.lines, encoding)
+
+    def run_edits(
+        self,
+        text: str = "",
+        tracer: "Tracer | None" = None,
+    ) -> "Edits":
+        """Run the program and return the hunks it changed in ``text``.
+
+        The result is never joined, so a few edits to a large text cost
+        no more than the edits themselves.
+        """
+        from .edits import EditRecorder, Edits
+
+        context = self.load(text)
+        recorder = EditRecorder()
+        context.observers.append(recorder)
+        context = self.execute(context, tracer)
+        return Edits(recorder.hunks(), context.lines)
+
+    def run_many(self, texts: Iterable[str]) -> Iterator[str]:
+        return map(self.run, texts)
+
+    def load(self, text: Text) -> Context:
+        check_text_type(self.commands, type(text))
+        raw = isinstance(text, bytes)
+        context = Context(cursor=0, lines=self.buffer_type(), raw=raw)
+        if text:
+            input_lines = split_input(text)
+            replace_lines(context, 0, 0, input_lines)
+            context.cursor = len(input_lines)
+        return context
+
+    def explain(self) -> str:
+        """Describe the commands the optimizer would run instead, one per line.
+
+        Steps that replace several commands list them after a ``#``.
+        """
+        from .optimizer import explain
+
+        return explain(self.commands)
+
+    def optimized(self) -> "Program":
+        from .optimizer import optimize
+
+        return Program(optimize(self.commands), self.buffer_type)
+
+    def execute(
+        self,
+        context: Context,
+        tracer: "Tracer | None" = None,
+    ) -> Context:
+        return run_commands(context, self.commands, tracer)
+
+
+def compile(
+    *commands: Command,
+    buffer_type: BufferType = list,
+    optimize: bool = False,
+) -> Program:
+    program = Program(tuple(map(check_command, commands)), buffer_type)
+    return program.optimized() if optimize else program
+
+
+def check_text_type(commands: Iterable[Command], expected: TextType) -> None:
+    """Raise ``TypeError`` if ``commands`` take text of another type.
+
+    Only non-ASCII arguments have a type: raw text is edited as latin-1, so
+    a non-ASCII ``str`` would not match the same characters in raw text,
+    and non-ASCII ``bytes`` would not match them in decoded text.
+    """
+    actual = common_text_type(map(get_text_type, commands))
+    if actual is not None and not issubclass(expected, actual):
+        raise TypeError(
+            f"Commands with non-ASCII {actual.__name__} arguments cannot run"
+            f" on {expected.__name__}.",
+        )
+
+
+def run_commands(
+    context: Context,
+    commands: Iterable[Command],
+    tracer: "Tracer | None" = None,
+) -> Context:
+    if tracer is not None:
+        from .tracing import run_traced
+
+        return run_traced(context, commands, tracer)
+    for command in commands:
+        context = command(context)
+    return context
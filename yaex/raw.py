@@ -0,0 +1,45 @@
+from collections.abc import Iterable
+
+RAW_ENCODING = "latin-1"
+
+Text = str | bytes
+
+
+def to_str(value: Text) -> str:
+    """Return ``value``, with the bytes of a raw value mapped to characters.
+
+    Latin-1 maps every byte to the character with the same code, so raw
+    text can be edited as ``str`` and encoded back to the same bytes.
+    """
+    if isinstance(value, bytes):
+        return value.decode(RAW_ENCODING)
+    return value
+
+
+def to_bytes(value: str) -> bytes:
+    return value.encode(RAW_ENCODING)
+
+
+TextType = type[str] | type[bytes]
+
+
+def text_type(*values: Text) -> TextType | None:
+    """Return whether the non-ASCII ``values`` are ``str`` or ``bytes``.
+
+    ASCII means the same as ``str`` or as ``bytes``, so it has no type.
+    Non-ASCII ``str`` and ``bytes`` cannot be mixed: the bytes of one are
+    not the characters of the other, so ``TypeError`` is raised.
+    """
+    return common_text_type(
+        bytes if isinstance(value, bytes) else str
+        for value in values
+        if not value.isascii()
+    )
+
+
+def common_text_type(types: Iterable[TextType | None]) -> TextType | None:
+    """Return the type shared by ``types``, ignoring ``None``."""
+    found = {value for value in types if value is not None}
+    if len(found) > 1:
+        raise TypeError("Cannot mix non-ASCII str and bytes arguments.")
+    return found.pop() if found else None
@@ -0,0 +1,123 @@
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import compress
+from operator import itemgetter
+
+from .matchers import Matcher
+
+MIN_BLOCK_LINES = 64
+MAX_BLOCK_LINES = 1 << 14
+
+_last_character = itemgetter(slice(-1, None))
+
+
+def search_lines(
+    lines: Sequence[str],
+    matcher: Matcher,
+    begin: int,
+    end: int,
+    reverse: bool = False,
+) -> int | None:
+    """Return the index of the first line in ``[begin, end)`` to match.
+
+    With ``reverse``, return the last one. The lines are joined one block
+    at a time from the side the search starts on, and every block is
+    searched with one regex call. Blocks grow as the search goes on, so a
+    match near the start costs little more than the lines before it, and
+    the whole text is never held at once.
+
+    The matcher must be line local.
+    """
+    for block_begin, block_end in iter_blocks(begin, end, reverse):
+        block = lines[block_begin:block_end]
+        line_index = _search_block(block, matcher, reverse)
+        if line_index is not None:
+            return block_begin + line_index
+    return None
+
+
+def iter_matching_lines(
+    lines: Sequence[str],
+    matcher: Matcher,
+    begin: int,
+    end: int,
+) -> Iterator[tuple[int, str]]:
+    """Yield the index and text of every line in ``[begin, end)`` to match.
+
+    Every block is copied before its matches are yielded, so lines can be
+    replaced by others while iterating. The matcher must be line local.
+    """
+    for block_begin, block_end in iter_blocks(begin, end):
+        block = lines[block_begin:block_end]
+        for line_index in _match_block(block, matcher):
+            yield block_begin + line_index, block[line_index]
+
+
+def iter_blocks(
+    begin: int,
+    end: int,
+    reverse: bool = False,
+) -> Iterator[tuple[int, int]]:
+    """Split ``[begin, end)`` into blocks that double up to a maximum size."""
+    size = MIN_BLOCK_LINES
+    while begin < end:
+        if reverse:
+            block_begin = max(begin, end - size)
+            yield block_begin, end
+            end = block_begin
+        else:
+            block_end = min(end, begin + size)
+            yield begin, block_end
+            begin = block_end
+        size = min(2 * size, MAX_BLOCK_LINES)
+
+
+def join_aligned(lines: Sequence[str]) -> str | None:
+    """Join ``lines`` if every one of them ends with its only newline.
+
+    In such a text, the index of the line at an offset is the number of
+    newlines before it, and a line local match never spans two lines.
+    """
+    text = "".join(lines)
+    size = len(lines)
+    if text.count("\n") != size:
+        return None
+    if "".join(map(_last_character, lines)).count("\n") != size:
+        return None
+    return text
+
+
+def _search_block(
+    block: Sequence[str],
+    matcher: Matcher,
+    reverse: bool,
+) -> int | None:
+    text = join_aligned(block)
+    if text is None:
+        indexes = range(len(block))
+        for line_index in reversed(indexes) if reverse else indexes:
+            if matcher.matches(block[line_index]):
+                return line_index
+        return None
+
+    find = matcher.rfind if reverse else matcher.find
+    offset = find(text, 0, len(text))
+    return None if offset == -1 else text.count("\n", 0, offset)
+
+
+def _match_block(block: Sequence[str], matcher: Matcher) -> Iterable[int]:
+    text = join_aligned(block)
+    if text is None:
+        return compress(range(len(block)), map(matcher.matches, block))
+    return _iter_matching_indexes(text, matcher)
+
+
+def _iter_matching_indexes(text: str, matcher: Matcher) -> Iterator[int]:
+    line_index = 0
+    line_start = 0
+    offset = matcher.find(text, 0, len(text))
+    while offset != -1:
+        line_index += text.count("\n", line_start, offset)
+        yield line_index
+        line_index += 1
+        line_start = text.index("\n", offset) + 1
+        offset = matcher.find(text, line_start, len(text))
@@ -0,0 +1,204 @@
+import time
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from .commands import (
+    Command,
+    Context,
+    GlobalCommand,
+    LineNumber,
+    SearchCommand,
+    SubstituteCommand,
+)
+
+LineRange = tuple[LineNumber, LineNumber]
+
+
+@dataclass(frozen=True)
+class CommandRecord:
+    """What happened during one execution of a command.
+
+    ``lines_spanned`` is the number of lines from the cursor to the line a
+    search moved to, or in the range of a substitute or global command.
+    It is not the number of lines the command read: indexes and required
+    literals let a command skip most of the lines it spans, so two runs
+    that span as many lines can read very different amounts of text.
+    ``line_range`` is the first range the command resolved, which is its
+    own when it runs other commands. ``error`` describes the exception the
+    command raised, if any.
+    """
+
+    command_type: str
+    pattern: str | None
+    wall_seconds: float
+    cpu_seconds: float
+    lines_before: int
+    lines_after: int
+    lines_spanned: int | None
+    line_range: LineRange | None
+    error: str | None = None
+
+
+class Tracer(Protocol):
+    def command_executed(self, record: CommandRecord) -> None:
+        ...
+
+
+def run_traced(
+    context: Context,
+    commands: Iterable[Command],
+    tracer: Tracer,
+) -> Context:
+    """Run ``commands`` and send a record of each one to ``tracer``.
+
+    Only the given commands are traced, not the commands they run. A
+    command that raises is recorded with its error before the error goes
+    on.
+    """
+    for command in commands:
+        context = trace_command(context, command, tracer)
+    return context
+
+
+def trace_command(
+    context: Context,
+    command: Command,
+    tracer: Tracer,
+) -> Context:
+    cursor = context.cursor
+    lines_before = len(context.lines)
+    line_range: LineRange | None = None
+
+    def record_range(begin: LineNumber, end: LineNumber) -> None:
+        nonlocal line_range
+        if line_range is None:
+            line_range = begin, end
+
+    range_resolved = context.range_resolved
+    context.range_resolved = record_range
+    result = context
+    error: BaseException | None = None
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        result = command(context)
+    except BaseException as exception:
+        error = exception
+        raise
+    finally:
+        cpu_seconds = time.process_time() - cpu_start
+        wall_seconds = time.perf_counter() - wall_start
+        context.range_resolved = range_resolved
+
+        lines_spanned = None
+        if error is None:
+            lines_spanned = count_spanned_lines(
+                command,
+                cursor,
+                result.cursor,
+                lines_before,
+                line_range,
+            )
+        record = CommandRecord(
+            command_type=type(command).__name__,
+            pattern=get_pattern(command),
+            wall_seconds=wall_seconds,
+            cpu_seconds=cpu_seconds,
+            lines_before=lines_before,
+            lines_after=len(result.lines),
+            lines_spanned=lines_spanned,
+            line_range=line_range,
+            error=None if error is None else describe_error(error),
+        )
+        tracer.command_executed(record)
+    return result
+
+
+def get_pattern(command: Command) -> str | None:
+    if isinstance(command, (SearchCommand, GlobalCommand)):
+        return command._input_regex
+    if isinstance(command, SubstituteCommand):
+        return command._search_regex
+    return None
+
+
+def describe_error(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+def count_spanned_lines(
+    command: Command,
+    cursor_before: LineNumber,
+    cursor_after: LineNumber,
+    size: int,
+    line_range: LineRange | None,
+) -> int | None:
+    if isinstance(command, SearchCommand):
+        if command._reverse:
+            return (cursor_before - cursor_after - 1) % size + 1
+        return (cursor_after - cursor_before) % size + 1
+    if isinstance(command, (SubstituteCommand, GlobalCommand)):
+        if line_range is None:
+            return None
+        begin, end = line_range
+        return end - begin + 1
+    return None
+
+
+@dataclass
+class CommandStats:
+    """Totals of one command type and how its wall times spread.
+
+    ``buckets`` counts executions by the power of two, in microseconds, just
+    above their wall time: bucket 10 holds the ones under 1024 µs.
+    """
+
+    count: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    lines_spanned: int = 0
+    errors: int = 0
+    buckets: Counter[int] = field(default_factory=Counter)
+
+    def add(self, record: CommandRecord) -> None:
+        self.count += 1
+        self.wall_seconds += record.wall_seconds
+        self.cpu_seconds += record.cpu_seconds
+        self.lines_spanned += record.lines_spanned or 0
+        self.errors += record.error is not None
+        microseconds = int(record.wall_seconds * 1_000_000)
+        self.buckets[microseconds.bit_length()] += 1
+
+
+class CommandHistogram:
+    """A tracer that aggregates the records of every command type."""
+
+    def __init__(self) -> None:
+        self.stats: dict[str, CommandStats] = {}
+
+    def command_executed(self, record: CommandRecord) -> None:
+        stats = self.stats.setdefault(record.command_type, CommandStats())
+        stats.add(record)
+
+    def report(self) -> str:
+        rows = sorted(
+            self.stats.items(),
+            key=lambda item: item[1].wall_seconds,
+            reverse=True,
+        )
+        header = (
+            f"{'command':<24} {'count':>8} {'wall ms':>12}"
+            f" {'cpu ms':>12} {'spanned':>12}"
+        )
+        lines = [header]
+        for command_type, stats in rows:
+            lines.append(
+                f"{command_type:<24} {stats.count:>8}"
+                f" {stats.wall_seconds * 1000:>12.3f}"
+                f" {stats.cpu_seconds * 1000:>12.3f}"
+                f" {stats.lines_spanned:>12}",
+            )
+        return "\n".join(lines) + "\n"